@@ -1,25 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_session
 from app.services.user_service import UserService
 from app.services.auth_service import AuthService
 from app.schemas.user import UserCreate, UserLogin
-from app.schemas.token import Token
+from app.schemas.token import Token, TokenRefresh
+from app.api.deps import get_current_user_id
 from app.core.exceptions import (
     UserAlreadyExistsError,
     InvalidCredentialsError,
     RefreshTokenExpiredError,
-    DatabaseError
+    DatabaseError,
+    PasswordHasherBusyError
 )
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-def get_user_service(db: Session = Depends(get_session)) -> UserService:
+async def get_user_service(db: AsyncSession = Depends(get_session)) -> UserService:
     """Provides an instance of UserService with a database session."""
     return UserService(db)
 
-def get_auth_service(
-    db: Session = Depends(get_session),
+async def get_auth_service(
+    db: AsyncSession = Depends(get_session),
     user_service: UserService = Depends(get_user_service)
 ) -> AuthService:
     """Provides an instance of AuthService with a database session and a UserService instance."""
@@ -32,7 +34,7 @@ def get_auth_service(
     status_code=status.HTTP_201_CREATED,
     summary="Register a new user"
 )
-def register_user(
+async def register_user(
     user_data: UserCreate,
     auth_service: AuthService = Depends(get_auth_service)
 ):
@@ -40,14 +42,20 @@ def register_user(
     Registers a new user, creates a refresh token, and returns an access token.
     """
     try:
-        user = auth_service.register_user(user_data)
-        tokens = auth_service.create_tokens_for_user(user.id)
+        user = await auth_service.register_user(user_data)
+        tokens = await auth_service.create_tokens_for_user(user.id)
         return tokens
     except UserAlreadyExistsError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(e)
         )
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -60,7 +68,7 @@ def register_user(
     response_model=Token,
     summary="Log in an existing user"
 )
-def login_for_access_token(
+async def login_for_access_token(
     user_data: UserLogin,
     auth_service: AuthService = Depends(get_auth_service)
 ):
@@ -68,8 +76,8 @@ def login_for_access_token(
     Authenticates a user and returns access and refresh tokens.
     """
     try:
-        user = auth_service.authenticate_user(user_data.email, user_data.password)
-        tokens = auth_service.create_tokens_for_user(user.id)
+        user = await auth_service.authenticate_user(user_data.email, user_data.password)
+        tokens = await auth_service.create_tokens_for_user(user.id)
         return tokens
     except InvalidCredentialsError as e:
         raise HTTPException(
@@ -77,6 +85,12 @@ def login_for_access_token(
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
         )
+    except PasswordHasherBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except DatabaseError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -88,20 +102,46 @@ def login_for_access_token(
     response_model=Token,
     summary="Refresh an access token"
 )
-def refresh_access_token(
-    refresh_token: str,
+async def refresh_access_token(
+    token_in: TokenRefresh,
     auth_service: AuthService = Depends(get_auth_service)
 ):
     """
-    Refreshes the access token using a refresh token.
+    Exchanges a refresh token for a new access and refresh token pair.
+    The presented refresh token is revoked and cannot be used again.
     """
     try:
-        user_id = auth_service.verify_refresh_token(refresh_token)
-        tokens = auth_service.create_tokens_for_user(user_id)
-        return tokens
+        return await auth_service.rotate_refresh_token(token_in.refresh_token)
     except RefreshTokenExpiredError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@router.post(
+    "/logout-all",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke all sessions of the current user"
+)
+async def logout_all_sessions(
+    user_id: int = Depends(get_current_user_id),
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """
+    Revokes every refresh token of the current user, signing out all devices.
+    Access tokens already issued remain valid until they expire.
+    """
+    try:
+        await auth_service.revoke_all_refresh_tokens(user_id)
+    except DatabaseError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
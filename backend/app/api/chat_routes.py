@@ -1,29 +1,33 @@
+import json
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_session
 from app.services.chat_service import ChatService
 from app.services.ai_engine import AIEngineService
 from app.services.document_service import DocumentService
-from app.api.deps import get_current_user, get_document_service, get_ai_engine_service
-from app.models.user import User
+from app.api.deps import get_current_user_id, get_document_service, get_ai_engine_service
 from app.schemas.ai_chat import ChatRequest, ChatResponse
 from app.core.exceptions import DocumentNotFoundError, AIEngineError
+from app.core.metrics import record_error
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ai/chat", tags=["chat"])
 
 @router.post("/", response_model=ChatResponse)
-def get_chat_response(
+async def get_chat_response(
     request: ChatRequest,
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_session),
+    http_response: Response,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_session),
     ai_engine_service: AIEngineService = Depends(get_ai_engine_service),
     document_service: DocumentService = Depends(get_document_service),
 ):
     """
     Retrieves a contextual response from the AI for a given document.
+    The X-Cache header reports whether the answer came from the answer cache.
     """
     chat_service = ChatService(
         db=db,
@@ -32,11 +36,12 @@ def get_chat_response(
     )
     
     try:
-        response = chat_service.get_chat_response(
+        response = await chat_service.get_chat_response(
             document_id=request.document_id,
-            user_id=current_user.id,
+            user_id=user_id,
             message=request.message
         )
+        http_response.headers["X-Cache"] = "HIT" if response["cached"] else "MISS"
         return ChatResponse(response=response["response"])
     except DocumentNotFoundError as e:
         raise HTTPException(
@@ -54,3 +59,53 @@ def get_chat_response(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred."
         )
+
+
+@router.post("/stream", summary="Stream a chat response as server-sent events")
+async def stream_chat_response(
+    request: ChatRequest,
+    user_id: int = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_session),
+    ai_engine_service: AIEngineService = Depends(get_ai_engine_service),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """
+    Streams the AI's answer as `text/event-stream`: one `data: {"token": ...}` event per chunk,
+    then an `event: done` (or `event: error`) event. Ownership is checked before streaming starts.
+    """
+    chat_service = ChatService(
+        db=db,
+        ai_engine_service=ai_engine_service,
+        document_service=document_service
+    )
+
+    try:
+        prepared = await chat_service.prepare_chat(request.document_id, user_id, request.message)
+    except DocumentNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    async def event_stream():
+        try:
+            async for token in chat_service.stream_chat_response(prepared, request.message):
+                yield f"data: {json.dumps({'token': token})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except AIEngineError as e:
+            record_error(e)
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+        except Exception as e:
+            record_error(e)
+            logger.error(f"Unexpected error in chat stream: {e}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'detail': 'An unexpected error occurred.'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Cache": "HIT" if prepared["cached"] is not None else "MISS",
+        }
+    )
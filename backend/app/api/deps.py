@@ -1,63 +1,95 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose.exceptions import ExpiredSignatureError, JWTError
 
-from app.db.session import get_session
+from app.db.session import get_read_session, get_session
+from app.core.http_client import get_http_client
 from app.services.jwt import jwt_service
 from app.services.user_service import UserService
 from app.services.document_service import DocumentService
 from app.services.ai_engine import AIEngineService
 from app.services.pdf_parser import PDFParserService
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.ingestion_service import IngestionService
+from app.services.search_service import AsyncSearchService
+from app.services.user_cache_service import UserCacheService
 from app.models.user import User
 from app.models.document import Document
 from app.core.exceptions import DatabaseError, DocumentNotFoundError
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_user_service(db: Session = Depends(get_session)) -> UserService:
+async def get_user_service(db: AsyncSession = Depends(get_session)) -> UserService:
     """Provides an instance of the UserService."""
     return UserService(db)
 
-def get_ai_engine_service() -> AIEngineService:
-    """Provides an instance of the AIEngineService."""
-    return AIEngineService()
+async def get_ai_engine_service() -> AIEngineService:
+    """Provides an instance of the AIEngineService bound to the shared HTTP client."""
+    return AIEngineService(http_client=get_http_client())
 
-def get_pdf_parser_service() -> PDFParserService:
+async def get_pdf_parser_service() -> PDFParserService:
     """Provides an instance of the PDFParserService."""
     return PDFParserService()
 
-def get_document_service(
-    db: Session = Depends(get_session),
+async def get_analysis_cache_service(db: AsyncSession = Depends(get_session)) -> AnalysisCacheService:
+    """Provides an instance of the AnalysisCacheService."""
+    return AnalysisCacheService(db)
+
+async def get_document_service(
+    db: AsyncSession = Depends(get_session),
     pdf_parser_service: PDFParserService = Depends(get_pdf_parser_service),
-    ai_engine_service: AIEngineService = Depends(get_ai_engine_service)
+    ai_engine_service: AIEngineService = Depends(get_ai_engine_service),
+    analysis_cache_service: AnalysisCacheService = Depends(get_analysis_cache_service)
 ) -> DocumentService:
     """Provides an instance of the DocumentService."""
+    return DocumentService(db, pdf_parser_service, ai_engine_service, analysis_cache_service)
+
+async def get_read_document_service(
+    db: AsyncSession = Depends(get_read_session),
+    pdf_parser_service: PDFParserService = Depends(get_pdf_parser_service),
+    ai_engine_service: AIEngineService = Depends(get_ai_engine_service)
+) -> DocumentService:
+    """
+    Provides a DocumentService for read-only routes, backed by the read replica session.
+    Its caches share that session, so no primary connection is checked out.
+    """
     return DocumentService(db, pdf_parser_service, ai_engine_service)
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    user_service: UserService = Depends(get_user_service)
-) -> User:
+async def get_ingestion_service(db: AsyncSession = Depends(get_session)) -> IngestionService:
+    """Provides an instance of the IngestionService."""
+    return IngestionService(db)
+
+async def get_search_service(db: AsyncSession = Depends(get_read_session)) -> AsyncSearchService:
+    """Provides a search service backed by the read replica session."""
+    return AsyncSearchService(db)
+
+def _token_subject(token: str) -> int:
     """
-    FastAPI dependency to get the current user from a JWT token.
+    Verifies an access token, or reuses a cached verification, and returns its user id.
     """
     try:
-        payload = jwt_service.verify_access_token(token)
-        user_id: str = payload.get("sub")
+        payload = UserCacheService.get_token_payload(token)
+        if payload is None:
+            payload = jwt_service.verify_access_token(token)
+            UserCacheService.put_token_payload(token, payload)
+        user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        return int(user_id)
+    except HTTPException:
+        raise
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except JWTError:
+    except (JWTError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
@@ -69,8 +101,34 @@ def get_current_user(
             detail="An unexpected error occurred during token validation."
         )
 
+async def get_current_user_id(
+    token: str = Depends(oauth2_scheme),
+    user_service: UserService = Depends(get_user_service)
+) -> int:
+    """
+    FastAPI dependency for endpoints that only need the caller's id. The account is confirmed
+    through the user cache, with a database lookup on a miss, so a user deleted by another
+    process loses access within USER_CACHE_TTL_SECONDS rather than when the token expires.
+    """
+    user = await get_current_user(token, user_service)
+    return user.id
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    user_service: UserService = Depends(get_user_service)
+) -> User:
+    """
+    FastAPI dependency to get the current user from a JWT token.
+    User records are served from the per-process user cache when possible.
+    """
+    user_id = _token_subject(token)
+
+    user = UserCacheService.get_user(user_id)
+    if user is not None:
+        return user
+
     try:
-        user = user_service.get_user_by_id(user_id)
+        user = await user_service.get_user_by_id(user_id)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -83,18 +141,19 @@ def get_current_user(
             detail=str(e)
         )
 
+    UserCacheService.put_user(user)
     return user
 
-def document_or_404(
+async def document_or_404(
     doc_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
     doc_service: DocumentService = Depends(get_document_service)
 ) -> Document:
     """
     FastAPI dependency to get a user's document or raise a 404 error.
     """
     try:
-        document = doc_service.get_document_by_id(doc_id, current_user.id)
+        document = await doc_service.get_document_by_id(doc_id, user_id)
         return document
     except DocumentNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -1,54 +1,88 @@
 import logging
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 
-from app.db.session import get_session
-from app.api.deps import get_current_user
+from app.api.deps import (
+    get_current_user_id,
+    get_document_service,
+    get_ingestion_service,
+    get_read_document_service,
+    get_search_service,
+)
 from app.services.document_service import DocumentService
-from app.services.pdf_parser import PDFParserService
-from app.services.ai_engine import AIEngineService
-from app.schemas.document import DocumentSummary, DocumentListItem, DocumentCreate
-from app.models.user import User
+from app.services.ingestion_service import IngestionService
+from app.services.search_service import AsyncSearchService
+from app.services.ingestion_worker import ingestion_pool
+from app.schemas.document import DocumentSummary, DocumentListItem, DocumentSearchResult
+from app.schemas.ingestion_job import IngestionJobRead, BatchUploadItem, BatchUploadResponse
+from app.models.ingestion_job import IngestionJobStatus
+from app.config import settings
+from app.core.compression import strip_etag_encoding
 from app.core.exceptions import (
     DocumentNotFoundError,
     DatabaseError,
     UnsupportedFileTypeError,
-    PDFParseError,
-    AIEngineError,
+    FileTooLargeError,
+    IngestionJobNotFoundError,
+    IngestionQueueFullError,
+    InvalidCursorError,
 )
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/documents", tags=["documents"])
 
-def get_document_service(
-    db: Session = Depends(get_session),
-    pdf_parser_service: PDFParserService = Depends(PDFParserService),
-    ai_engine_service: AIEngineService = Depends(AIEngineService)
-) -> DocumentService:
-    """Provides an instance of DocumentService with its dependencies."""
-    return DocumentService(db, pdf_parser_service, ai_engine_service)
+
+def document_etag(doc_id: int, content_hash: str, include_content: bool) -> str:
+    """
+    Builds a strong ETag for a document representation. Documents never change once
+    created, so the id and content hash identify every byte of the response.
+    """
+    variant = "-content" if include_content else ""
+    return f'"doc-{doc_id}-{content_hash[:32]}{variant}"'
+
+
+def matching_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """
+    Returns the If-None-Match entry that matches etag, including any content-coding suffix
+    added by CompressionMiddleware, so a 304 echoes the validator the client holds.
+    """
+    if not if_none_match:
+        return None
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or strip_etag_encoding(tag) == etag:
+            return etag if tag == "*" else tag
+    return None
 
 @router.post(
     "/",
-    response_model=DocumentSummary,
-    status_code=status.HTTP_201_CREATED,
-    summary="Add an analyzed document"
+    response_model=IngestionJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue a document for analysis"
 )
-def add_document(
+async def add_document(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    doc_service: DocumentService = Depends(get_document_service)
+    user_id: int = Depends(get_current_user_id),
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
 ):
     """
-    Processes a PDF document, analyzes it, and saves it for the current user.
+    Stores an uploaded PDF and queues it for parsing and analysis.
+    Poll GET /documents/jobs/{job_id} for the resulting document id.
     """
+    if not ingestion_pool.has_capacity():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="The ingestion queue is full. Please retry later.")
+
     try:
-        document = doc_service.create_document(file, current_user.id)
-        return DocumentSummary.model_validate(document)
+        job = await ingestion_service.create_job(file, user_id)
+        ingestion_pool.submit(job.id, user_id)
+        return IngestionJobRead.model_validate(job)
     except UnsupportedFileTypeError as e:
         raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
-    except (PDFParseError, AIEngineError) as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except IngestionQueueFullError as e:
+        await ingestion_service.mark_job(job, IngestionJobStatus.FAILED, None, str(e))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except DatabaseError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
     except Exception as e:
@@ -56,22 +90,132 @@ def add_document(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected error occurred.")
 
 
+@router.post(
+    "/batch",
+    response_model=BatchUploadResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue many documents for analysis"
+)
+async def add_documents_batch(
+    files: list[UploadFile] = File(...),
+    user_id: int = Depends(get_current_user_id),
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
+):
+    """
+    Stores and queues every uploaded PDF, reporting a job or an error per file.
+    A rejected file does not affect the rest of the batch; analyses then run under
+    the ingestion pool's global and per-user concurrency limits.
+    """
+    if len(files) > settings.BATCH_UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"A batch may contain at most {settings.BATCH_UPLOAD_MAX_FILES} files."
+        )
+    if not ingestion_pool.has_capacity(len(files)):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="The ingestion queue is full. Please retry later.")
+
+    items = []
+    for file in files:
+        try:
+            job = await ingestion_service.create_job(file, user_id)
+            ingestion_pool.submit(job.id, user_id)
+            items.append(BatchUploadItem(filename=file.filename, job=IngestionJobRead.model_validate(job)))
+        except (UnsupportedFileTypeError, FileTooLargeError) as e:
+            items.append(BatchUploadItem(filename=file.filename, error=str(e)))
+        except IngestionQueueFullError as e:
+            await ingestion_service.mark_job(job, IngestionJobStatus.FAILED, None, str(e))
+            items.append(BatchUploadItem(filename=file.filename, error=str(e)))
+        except DatabaseError:
+            items.append(BatchUploadItem(filename=file.filename, error="Internal server error"))
+        except Exception as e:
+            logger.error(f"Unexpected error in add_documents_batch for {file.filename}: {e}", exc_info=True)
+            items.append(BatchUploadItem(filename=file.filename, error="An unexpected error occurred."))
+
+    accepted = sum(1 for item in items if item.job is not None)
+    return BatchUploadResponse(accepted=accepted, rejected=len(items) - accepted, items=items)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=IngestionJobRead,
+    summary="Get ingestion job status"
+)
+async def read_ingestion_job(
+    job_id: str,
+    user_id: int = Depends(get_current_user_id),
+    ingestion_service: IngestionService = Depends(get_ingestion_service)
+):
+    """
+    Returns the state of an upload job (queued, running, done or failed) owned by the current user.
+    """
+    try:
+        job = await ingestion_service.get_job(job_id, user_id)
+        return IngestionJobRead.model_validate(job)
+    except IngestionJobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except DatabaseError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+
+@router.get(
+    "/search",
+    response_model=list[DocumentSearchResult],
+    summary="Search user documents"
+)
+async def search_documents(
+    q: str = Query(..., min_length=1, max_length=500, description="Words or phrases to find."),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results to return."),
+    user_id: int = Depends(get_current_user_id),
+    search_service: AsyncSearchService = Depends(get_search_service)
+):
+    """
+    Full-text search over the user's documents: content, summary, clauses and red flags.
+    Results are ranked best first, with matches in `snippet` wrapped in <mark> tags.
+    """
+    try:
+        return await search_service.search(user_id, q, limit)
+    except DatabaseError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
+
+
 @router.get(
     "/{doc_id}",
     response_model=DocumentSummary,
     summary="Get document details"
 )
-def read_document(
+async def read_document(
     doc_id: int,
-    current_user: User = Depends(get_current_user),
-    doc_service: DocumentService = Depends(get_document_service)
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description="Set to `content` to also return the full document text."),
+    user_id: int = Depends(get_current_user_id),
+    doc_service: DocumentService = Depends(get_read_document_service)
 ):
     """
     Retrieves a single document by its ID if it belongs to the current user.
+    The full text is only loaded and returned with `?include=content`.
+    Responses carry an ETag; a matching If-None-Match gets a 304 without loading the document.
     """
+    include_content = bool(include) and "content" in include.split(",")
     try:
-        document = doc_service.get_document_by_id(doc_id, current_user.id)
-        return DocumentSummary.model_validate(document)
+        content_hash = await doc_service.get_document_content_hash(doc_id, user_id)
+        cache_headers = {
+            "Cache-Control": f"private, max-age={settings.DOCUMENT_CACHE_MAX_AGE_SECONDS}, must-revalidate",
+            "Vary": "Authorization",
+        }
+        if content_hash:
+            cache_headers["ETag"] = document_etag(doc_id, content_hash, include_content)
+            matched = matching_etag(request.headers.get("if-none-match"), cache_headers["ETag"])
+            if matched:
+                cache_headers["ETag"] = matched
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+        document = await doc_service.get_document_by_id(doc_id, user_id)
+        summary = DocumentSummary.model_validate(document)
+        if include_content:
+            summary.content = await doc_service.get_document_content(document)
+        response.headers.update(cache_headers)
+        return summary
     except DocumentNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DatabaseError as e:
@@ -83,16 +227,25 @@ def read_document(
     response_model=list[DocumentListItem],
     summary="List user documents"
 )
-def list_documents(
-    current_user: User = Depends(get_current_user),
-    doc_service: DocumentService = Depends(get_document_service)
+async def list_documents(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of documents to return."),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page."),
+    order: Literal["desc", "asc"] = Query("desc", description="Sort by creation time, newest first by default."),
+    user_id: int = Depends(get_current_user_id),
+    doc_service: DocumentService = Depends(get_read_document_service)
 ):
     """
-    Lists all documents belonging to the current user.
+    Lists one page of the current user's documents.
+    When more documents exist, the X-Next-Cursor header carries the cursor for the next page.
     """
     try:
-        documents = doc_service.list_documents_for_user(current_user.id)
+        documents, next_cursor = await doc_service.list_documents_for_user(user_id, limit, cursor, order)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return [DocumentListItem.model_validate(doc) for doc in documents]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except DatabaseError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error")
 
@@ -102,16 +255,16 @@ def list_documents(
     status_code=status.HTTP_204_NO_CONTENT, 
     summary="Delete document"
 )
-def delete_document_by_id(
+async def delete_document_by_id(
     doc_id: int,
-    current_user: User = Depends(get_current_user),
+    user_id: int = Depends(get_current_user_id),
     doc_service: DocumentService = Depends(get_document_service)
 ):
     """
     Deletes a document by its ID if it belongs to the current user.
     """
     try:
-        doc_service.delete_document(doc_id, current_user.id)
+        await doc_service.delete_document(doc_id, user_id)
     except DocumentNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DatabaseError as e:
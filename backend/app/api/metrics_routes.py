@@ -0,0 +1,97 @@
+import hmac
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.config import settings
+from app.core.metrics import CONTENT_TYPE, histogram_lines, registry
+from app.db.pool import WAIT_BUCKETS
+from app.db.session import pool_stats
+from app.services.analysis_cache_service import AnalysisCacheService
+from app.services.answer_cache_service import AnswerCacheService
+from app.services.password_hasher import password_hasher
+from app.services.user_cache_service import UserCacheService
+
+router = APIRouter(tags=["metrics"])
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _family(name: str, kind: str, documentation: str, samples: List[str]) -> List[str]:
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}", *samples]
+
+
+def collect_service_stats() -> List[str]:
+    """
+    Exports the counters the caches, password hasher and connection pools already keep.
+    """
+    caches: Dict[str, Dict[str, int]] = {
+        "analysis": AnalysisCacheService.stats(),
+        "answer": AnswerCacheService.stats(),
+        **{f"user_{name}": stats for name, stats in UserCacheService.stats().items()},
+    }
+    cache_events, cache_entries = [], []
+    for cache, stats in caches.items():
+        for event in ("hits", "misses", "evictions", "invalidations"):
+            if event in stats:
+                cache_events.append(f'legallens_cache_events_total{{cache="{cache}",event="{event}"}} {stats[event]}')
+        if "entries" in stats:
+            cache_entries.append(f'legallens_cache_entries{{cache="{cache}"}} {stats["entries"]}')
+
+    hasher = password_hasher.snapshot()
+    lines = [
+        *_family("legallens_cache_events_total", "counter", "Cache lookups and removals by cache.", cache_events),
+        *_family("legallens_cache_entries", "gauge", "Entries held by in-memory caches.", cache_entries),
+        *_family("legallens_password_hash_operations_total", "counter", "Password hashing operations by outcome.", [
+            f'legallens_password_hash_operations_total{{outcome="completed"}} {hasher["completed"]}',
+            f'legallens_password_hash_operations_total{{outcome="rejected"}} {hasher["rejected"]}',
+        ]),
+        *_family("legallens_password_hash_pending", "gauge", "Password hashing operations queued or running.", [
+            f'legallens_password_hash_pending {hasher["pending"]}',
+        ]),
+    ]
+
+    pools = pool_stats()
+    wait_lines, occupancy, timeouts = [], [], []
+    for pool, stats in pools.items():
+        counts = [stats["buckets"][bound] for bound in WAIT_BUCKETS + (float("inf"),)]
+        wait_lines.extend(histogram_lines(
+            "legallens_db_pool_checkout_wait_seconds", {"pool": pool}, WAIT_BUCKETS, counts, stats["total_seconds"],
+        ))
+        timeouts.append(f'legallens_db_pool_checkout_timeouts_total{{pool="{pool}"}} {stats["timeouts"]}')
+        for state in ("size", "checked_out", "overflow"):
+            occupancy.append(f'legallens_db_pool_connections{{pool="{pool}",state="{state}"}} {stats[state]}')
+    lines += [
+        *_family("legallens_db_pool_checkout_wait_seconds", "histogram", "Time waited to check out a connection.", wait_lines),
+        *_family("legallens_db_pool_checkout_timeouts_total", "counter", "Checkouts that hit DB_POOL_TIMEOUT_SECONDS.", timeouts),
+        *_family("legallens_db_pool_connections", "gauge", "Pool size, checked-out and overflow connections.", occupancy),
+    ]
+    return lines
+
+
+registry.add_collector(collect_service_stats)
+
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> None:
+    """
+    Lets the request through only when it carries METRICS_TOKEN as a bearer token.
+    The endpoint does not exist while no token is configured.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode("utf-8"), settings.METRICS_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def read_metrics():
+    """
+    Returns all metrics in the Prometheus text exposition format.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
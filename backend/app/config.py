@@ -1,3 +1,4 @@
+from typing import Dict, Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -15,6 +16,12 @@ class Settings(BaseSettings):
     OPENROUTER_BASE_URL: str
     LLM_MODEL: str
     DATABASE_URL: str
+    READ_DATABASE_URL: Optional[str] = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
 
     PASSWORD_MIN_LENGTH: int
     PASSWORD_REQUIRE_UPPER: bool
@@ -29,4 +36,86 @@ class Settings(BaseSettings):
     JWT_REFRESH_SECRET_KEY: str
     JWT_REFRESH_TOKEN_EXPIRES_MINUTES: int
 
+    LLM_HTTP_TIMEOUT_SECONDS: float = 60.0
+    LLM_HTTP_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    LLM_HTTP2: bool = False
+
+    # live, record (call the provider and save responses) or replay (serve saved responses only).
+    LLM_TRANSPORT_MODE: str = "live"
+    LLM_CASSETTE_DIR: str = "data/llm_cassettes"
+    LLM_REPLAY_LATENCY_SECONDS: float = 0.0
+    LLM_REPLAY_USE_RECORDED_LATENCY: bool = False
+
+    # Requests sending this value in X-Profile-Token are profiled; unset disables profiling.
+    PROFILING_ADMIN_TOKEN: Optional[str] = None
+    PROFILING_DIR: str = "data/profiles"
+
+    # Scrapers must send this value as a bearer token to read /metrics; unset disables the endpoint.
+    METRICS_TOKEN: Optional[str] = None
+
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 10000
+
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ENTRIES: int = 5000
+    ANSWER_CACHE_TTL_SECONDS: int = 86400
+    ANSWER_CACHE_PERSISTENT: bool = False
+    ANSWER_CACHE_PERSISTENT_MAX_ENTRIES: int = 50000
+
+    CHAT_CHUNK_SIZE: int = 250
+    CHAT_CHUNK_OVERLAP: int = 50
+    CHAT_TOP_K: int = 4
+
+    ANALYSIS_MAP_REDUCE_THRESHOLD_TOKENS: int = 24000
+    ANALYSIS_MAP_CHUNK_TOKENS: int = 12000
+    ANALYSIS_MAP_CONCURRENCY: int = 4
+
+    PROMPT_COMPACTION_ENABLED: bool = True
+    CLAUSE_SEGMENTATION_ENABLED: bool = True
+    # Tokens of document text one prompt may carry; per-model overrides as JSON, e.g. {"openai/gpt-4o": 100000}.
+    LLM_PROMPT_TOKEN_BUDGET: int = 100000
+    LLM_PROMPT_TOKEN_BUDGETS: Dict[str, int] = {}
+    # head keeps the beginning of oversized text; head_tail keeps the beginning and the end.
+    LLM_PROMPT_TRUNCATION: str = "head_tail"
+    # Downloaded by tiktoken on first use; offline hosts read a copy from the TIKTOKEN_CACHE_DIR directory.
+    LLM_TOKENIZER_ENCODING: str = "cl100k_base"
+
+    INGESTION_WORKERS: int = 4
+    INGESTION_MAX_QUEUE: int = 1000
+    INGESTION_PER_USER_CONCURRENCY: int = 2
+    BATCH_UPLOAD_MAX_FILES: int = 200
+    INGESTION_UPLOAD_DIR: str = "data/uploads"
+    MAX_UPLOAD_BYTES: int = 50 * 1024 * 1024
+    # Running jobs refresh updated_at every heartbeat; one silent for a whole lease is requeued on startup.
+    INGESTION_HEARTBEAT_SECONDS: float = 30.0
+    INGESTION_LEASE_SECONDS: int = 300
+
+    PDF_EXTRACT_WORKERS: int = 4
+    PDF_PARALLEL_MIN_PAGES: int = 100
+    PDF_PAGES_PER_TASK: int = 25
+
+    DOCUMENT_CONTENT_COMPRESSION: str = "zlib"
+    DOCUMENT_CONTENT_COMPRESSION_LEVEL: int = 6
+
+    DOCUMENT_CACHE_MAX_AGE_SECONDS: int = 60
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 5
+
+    SEARCH_TEXT_CONFIG: str = "english"
+
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    REFRESH_TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+    REFRESH_TOKEN_PURGE_BATCH_SIZE: int = 1000
+
 settings = Settings()
\ No newline at end of file
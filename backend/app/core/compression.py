@@ -0,0 +1,130 @@
+import gzip
+import logging
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # brotli ships in requirements.txt; without it only gzip is offered.
+    brotli = None
+    logger.warning("brotli is not installed; responses will only be compressed with gzip.")
+
+ENCODING_GZIP = "gzip"
+ENCODING_BROTLI = "br"
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html")
+
+
+def supported_encodings() -> list[str]:
+    """
+    Returns the response encodings this server can produce, in order of preference.
+    """
+    return ([ENCODING_BROTLI] if brotli is not None else []) + [ENCODING_GZIP]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the preferred supported encoding the client accepts, ignoring codings sent with q=0.
+    """
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+
+    for encoding in supported_encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def strip_etag_encoding(etag: str) -> str:
+    """
+    Removes the coding suffix CompressionMiddleware appends to strong ETags of compressed responses.
+    """
+    for encoding in (ENCODING_GZIP, ENCODING_BROTLI):
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == ENCODING_BROTLI:
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Compresses complete JSON/text responses with brotli or gzip, per the request's Accept-Encoding.
+    Only single-message bodies of at least RESPONSE_COMPRESSION_MIN_BYTES are touched; streamed
+    responses such as the chat SSE endpoint pass through unchanged so tokens are never buffered.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.RESPONSE_COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+
+            if message["type"] == "http.response.start":
+                start = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if start is not None:
+                pending, start = start, None
+                headers = MutableHeaders(raw=pending["headers"])
+                body = message.get("body", b"")
+
+                if (
+                    message.get("more_body", False)
+                    or len(body) < self.minimum_size
+                    or "content-encoding" in headers
+                    or not headers.get("content-type", "").startswith(_COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(pending)
+                    await send(message)
+                    return
+
+                compressed = compress_body(body, encoding)
+                etag = headers.get("etag")
+                if etag and etag.endswith('"'):
+                    # Each coding is a distinct representation, so it gets its own strong validator.
+                    headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                headers.add_vary_header("Accept-Encoding")
+                await send(pending)
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -48,4 +48,24 @@ class PDFParseError(Exception):
 
 class AIEngineError(Exception):
     """Exception for AI engine errors."""
-    pass
\ No newline at end of file
+    pass
+
+class IngestionJobNotFoundError(Exception):
+    """Ingestion job not found in the database."""
+    pass
+
+class IngestionQueueFullError(Exception):
+    """The ingestion queue cannot accept more jobs."""
+    pass
+
+class FileTooLargeError(Exception):
+    """Uploaded file exceeds the configured size limit."""
+    pass
+
+class InvalidCursorError(Exception):
+    """Pagination cursor is malformed."""
+    pass
+
+class PasswordHasherBusyError(Exception):
+    """The password hashing pool has too many operations pending."""
+    pass
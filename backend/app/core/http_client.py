@@ -0,0 +1,61 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from app.config import settings
+from app.core.llm_transport import build_llm_transport
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """
+    Builds a pooled, keep-alive async HTTP client for outbound LLM calls. In record and
+    replay modes the live transport is wrapped by the cassette transports.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    timeout = httpx.Timeout(
+        settings.LLM_HTTP_TIMEOUT_SECONDS,
+        connect=settings.LLM_HTTP_CONNECT_TIMEOUT_SECONDS,
+    )
+    live = httpx.AsyncHTTPTransport(limits=limits, http2=settings.LLM_HTTP2)
+    return httpx.AsyncClient(timeout=timeout, transport=build_llm_transport(live))
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """
+    Creates the app-scoped client. Called from the FastAPI lifespan.
+    """
+    global _client
+    if _client is None:
+        _client = build_http_client()
+        logger.info("Shared HTTP client opened.")
+    return _client
+
+
+async def close_http_client() -> None:
+    """
+    Closes the app-scoped client and releases its pooled connections.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Shared HTTP client closed.")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client, creating it lazily when running outside the app lifespan.
+    """
+    global _client
+    if _client is None:
+        _client = build_http_client()
+    return _client
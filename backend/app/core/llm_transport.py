@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+from anyio import to_thread
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_LIVE = "live"
+TRANSPORT_RECORD = "record"
+TRANSPORT_REPLAY = "replay"
+
+# Only these response headers are stored; dates, request ids and cookies differ on every call.
+_KEPT_HEADERS = ("content-type",)
+
+
+def cassette_key(request: httpx.Request) -> str:
+    """
+    Hashes the request payload (model, messages, stream flag) with sorted keys, so the same
+    prompt always maps to the same cassette whatever the key order or auth headers.
+    """
+    payload = json.loads(request.content or b"{}")
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    """
+    Directory of recorded LLM exchanges, one JSON file per cassette key.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, cassette: Dict) -> None:
+        # Written to a temporary file and renamed so a concurrent replay never reads half a cassette.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(cassette, fh, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """
+    Forwards requests to the live transport and stores every successful exchange. The body
+    is read in full before it is returned, so streamed answers arrive in one piece while recording.
+    """
+
+    def __init__(self, live: httpx.AsyncBaseTransport, store: CassetteStore):
+        self._live = live
+        self._store = store
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self._live.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - started
+
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers}
+        if response.status_code < 400:
+            key = cassette_key(request)
+            cassette = {
+                "key": key,
+                "recorded_at": datetime.now(timezone.utc).isoformat(),
+                "url": str(request.url),
+                "request": json.loads(request.content or b"{}"),
+                "status_code": response.status_code,
+                "headers": headers,
+                "body": body.decode("utf-8"),
+                "elapsed_seconds": round(elapsed, 4),
+            }
+            await to_thread.run_sync(self._store.save, key, cassette)
+            logger.info(f"Recorded LLM cassette {key}.")
+
+        # The body is already decoded, so content-encoding and length headers no longer apply.
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self._live.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serves recorded exchanges without network access. Each reply waits `latency_seconds`, or
+    the recorded duration when `use_recorded_latency` is set. A request with no cassette gets
+    a 404 naming its key, which AIEngineService reports as an AIEngineError.
+    """
+
+    def __init__(self, store: CassetteStore, latency_seconds: float = 0.0, use_recorded_latency: bool = False):
+        self._store = store
+        self._latency_seconds = latency_seconds
+        self._use_recorded_latency = use_recorded_latency
+        self._loaded: Dict[str, Dict] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = cassette_key(request)
+        cassette = self._loaded.get(key)
+        if cassette is None:
+            cassette = self._store.load(key)
+            if cassette is None:
+                logger.warning(f"No LLM cassette for request {key} in {self._store.directory}.")
+                return httpx.Response(
+                    404,
+                    json={"error": {"message": f"No recorded response for request {key}.", "code": 404}},
+                    request=request,
+                )
+            self._loaded[key] = cassette
+
+        delay = cassette.get("elapsed_seconds", 0.0) if self._use_recorded_latency else self._latency_seconds
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            cassette["status_code"],
+            headers=cassette["headers"],
+            content=cassette["body"].encode("utf-8"),
+            request=request,
+        )
+
+
+def build_llm_transport(live: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+    """
+    Wraps the live transport according to LLM_TRANSPORT_MODE.
+    """
+    mode = settings.LLM_TRANSPORT_MODE
+    if mode == TRANSPORT_LIVE:
+        return live
+
+    store = CassetteStore(settings.LLM_CASSETTE_DIR)
+    if mode == TRANSPORT_RECORD:
+        logger.info(f"Recording LLM exchanges to {store.directory}.")
+        return RecordingTransport(live, store)
+    if mode == TRANSPORT_REPLAY:
+        logger.info(f"Replaying LLM exchanges from {store.directory}.")
+        return ReplayTransport(
+            store,
+            latency_seconds=settings.LLM_REPLAY_LATENCY_SECONDS,
+            use_recorded_latency=settings.LLM_REPLAY_USE_RECORDED_LATENCY,
+        )
+    raise ValueError(f"Unknown LLM_TRANSPORT_MODE {mode!r}; expected live, record or replay.")
@@ -0,0 +1,281 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import exceptions as app_exceptions
+
+# Upper bounds, in seconds, of the latency histogram buckets. LLM calls dominate the tail.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        # Unlabelled series are exported as 0 before the first update.
+        self._values: Dict[Tuple[str, ...], float] = {} if labelnames else {(): 0}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _add(self, amount: float, labels: Dict[str, str]) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self._add(amount, labels)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self._add(-amount, labels)
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        """
+        Counts the enclosed block as in progress while it runs.
+        """
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # One slot per bucket plus +Inf, then the running sum.
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 2))
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """
+        Observes the wall-clock duration of the enclosed block, including when it raises.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            lines.extend(histogram_lines(
+                self.name, labels, self.buckets, series[:-1], series[-1], cumulative=False,
+            ))
+        return lines
+
+
+def histogram_lines(
+    name: str,
+    labels: Dict[str, str],
+    bounds: Iterable[float],
+    counts: Iterable[int],
+    total: float,
+    cumulative: bool = True,
+) -> List[str]:
+    """
+    Renders one histogram series. `counts` has one entry per bound plus +Inf, either already
+    cumulative (as PoolWaitStats.snapshot returns them) or per bucket.
+    """
+    lines, running = [], 0
+    for bound, hits in zip(tuple(bounds) + (float("inf"),), counts):
+        running = hits if cumulative else running + hits
+        bucket_labels = {**labels, "le": _format_value(float(bound))}
+        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {running}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(float(total))}")
+    lines.append(f"{name}_count{_format_labels(labels)} {running}")
+    return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics rendered in the Prometheus text format. Collectors are
+    called at scrape time for values other modules already keep, such as cache counters.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "legallens_http_request_duration_seconds",
+    "Time to send the full response, by route template.",
+    ("method", "route", "status"),
+))
+HTTP_REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "legallens_http_requests_in_flight",
+    "Requests currently being served.",
+))
+STAGE_SECONDS = registry.register(Histogram(
+    "legallens_stage_duration_seconds",
+    "Time spent in each stage of document uploads and chat answers.",
+    ("operation", "stage"),
+))
+LLM_REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "legallens_llm_requests_in_flight",
+    "LLM calls currently awaiting a response.",
+))
+LLM_TOKENS = registry.register(Counter(
+    "legallens_llm_tokens_total",
+    "Tokens reported in the provider's usage field.",
+    ("kind",),
+))
+PROMPT_COMPACTION_TOKENS = registry.register(Counter(
+    "legallens_prompt_compaction_tokens_total",
+    "Estimated document tokens before (raw) and after (compacted) prompt compaction.",
+    ("stage",),
+))
+PROMPT_TRUNCATED_TOKENS = registry.register(Counter(
+    "legallens_prompt_truncated_tokens_total",
+    "Estimated tokens dropped to fit prompts into the model's token budget.",
+))
+ERRORS = registry.register(Counter(
+    "legallens_errors_total",
+    "Errors by exception type; unexpected exceptions are counted under their own class name.",
+    ("exception",),
+))
+
+
+def record_llm_usage(usage: Optional[Dict]) -> None:
+    """
+    Adds the prompt and completion token counts from a provider `usage` object, if present.
+    """
+    if not usage:
+        return
+    for kind in ("prompt", "completion"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens:
+            LLM_TOKENS.inc(tokens, kind=kind)
+
+
+def record_error(exc: Optional[BaseException]) -> None:
+    """
+    Counts an error by its class. An HTTPException raised while handling an exception from
+    app.core.exceptions is counted as that exception, so 404s and 503s keep their cause.
+    """
+    if exc is None:
+        return
+    cause = exc.__cause__ or exc.__context__
+    if cause is not None and type(cause).__module__ == app_exceptions.__name__:
+        exc = cause
+    ERRORS.inc(exception=type(exc).__name__)
+
+
+class MetricsMiddleware:
+    """
+    Records per-route latency and in-flight requests. The route label is the matched path
+    template, so ids in URLs do not create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            record_error(exc)
+            raise
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code),
+            )
@@ -0,0 +1,155 @@
+import cProfile
+import hmac
+import logging
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from anyio import to_thread
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyinstrument
+except ImportError:  # pyinstrument is optional; cProfile is always available.
+    pyinstrument = None
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+PROFILE_MODE_HEADER = b"x-profile-mode"
+
+MODE_DETERMINISTIC = "deterministic"
+MODE_SAMPLING = "sampling"
+
+
+class _DeterministicProfiler:
+    """
+    cProfile over the event loop thread, saved as a pstats file for snakeviz or `python -m pstats`.
+    """
+
+    suffix = ".prof"
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def save(self, path: Path) -> None:
+        self._profile.dump_stats(str(path))
+
+
+class _SamplingProfiler:
+    """
+    pyinstrument sampling profiler in async mode, saved as an interactive HTML flame view.
+    """
+
+    suffix = ".html"
+
+    def __init__(self):
+        self._profiler = pyinstrument.Profiler(interval=0.001, async_mode="enabled")
+
+    def start(self) -> None:
+        self._profiler.start()
+
+    def stop(self) -> None:
+        self._profiler.stop()
+
+    def save(self, path: Path) -> None:
+        path.write_text(self._profiler.output_html(), encoding="utf-8")
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_") or "root"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests that carry X-Profile-Token matching PROFILING_ADMIN_TOKEN.
+    X-Profile-Mode picks `deterministic` (cProfile, the default) or `sampling` (pyinstrument,
+    when installed). The profile is saved under `directory`, named with its id, the route
+    template and the total duration. The response gets a Server-Timing header with the time
+    to first byte and the profile id.
+
+    Only one request is profiled at a time. The profilers see the whole event loop thread,
+    so other requests running concurrently can show up in a profile.
+    The app only installs this middleware when a token is configured.
+    """
+
+    def __init__(self, app: ASGIApp, token: str, directory: str):
+        self.app = app
+        self._token = token.encode("utf-8")
+        self._directory = Path(directory)
+        self._busy = threading.Lock()
+
+    def _requested_mode(self, scope: Scope) -> Optional[str]:
+        token, mode = None, MODE_DETERMINISTIC
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER:
+                token = value
+            elif name == PROFILE_MODE_HEADER:
+                mode = value.decode("latin-1").strip().lower()
+        if token is None or not hmac.compare_digest(token, self._token):
+            return None
+        return mode
+
+    def _build_profiler(self, mode: str):
+        if mode == MODE_SAMPLING:
+            if pyinstrument is not None:
+                return _SamplingProfiler()
+            logger.warning("Sampling profile requested but pyinstrument is not installed; using cProfile.")
+        return _DeterministicProfiler()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = self._requested_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not self._busy.acquire(blocking=False):
+            logger.info(f"Profile requested for {scope['path']} while another is running; serving unprofiled.")
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        profiler = self._build_profiler(mode)
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers.append("Server-Timing", f'app;dur={elapsed_ms:.1f}, profile;desc="{profile_id}"')
+            await send(message)
+
+        try:
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.stop()
+            duration_ms = (time.perf_counter() - started) * 1000
+            route = getattr(scope.get("route"), "path", scope["path"])
+            path = self._directory / (
+                f"{profile_id}_{scope['method']}_{_slug(route)}_{duration_ms:.0f}ms{profiler.suffix}"
+            )
+            await to_thread.run_sync(self._save, profiler, path)
+            logger.info(f"Saved request profile {path} ({scope['method']} {route}, {duration_ms:.1f} ms).")
+        finally:
+            self._busy.release()
+
+    def _save(self, profiler, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.save(path)
@@ -0,0 +1,53 @@
+"""
+Creates the full-text search index and adds every document missing from it.
+
+New documents are indexed as they are created; this backfills databases created before
+search existed, or documents whose indexing failed. Safe to re-run.
+
+Usage (from backend/):
+    python -m app.db.migrations.build_search_index [--batch-size 200]
+"""
+import argparse
+import logging
+
+from sqlmodel import Session
+
+from app.db.session import engine
+from app.models.document import Document
+from app.services.document_content import load_document_text
+from app.services.search_service import SearchService, ensure_search_index
+
+logger = logging.getLogger(__name__)
+
+
+def backfill(batch_size: int = 200) -> int:
+    """
+    Indexes all unindexed documents and returns how many were added.
+    """
+    ensure_search_index(engine)
+
+    indexed = 0
+    last_id = 0
+    while True:
+        with Session(engine) as db:
+            search_service = SearchService(db)
+            ids = search_service.unindexed_document_ids(last_id, batch_size)
+            if not ids:
+                break
+            for document in db.query(Document).filter(Document.id.in_(ids)).all():
+                search_service.index_document(document, load_document_text(document))
+            db.commit()
+
+        indexed += len(ids)
+        last_id = ids[-1]
+        logger.info(f"Indexed {indexed} documents.")
+
+    return indexed
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Backfill the document full-text search index.")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    logger.info(f"Search index backfill finished: {backfill(batch_size=args.batch_size)} documents indexed.")
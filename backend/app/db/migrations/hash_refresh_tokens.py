@@ -0,0 +1,97 @@
+"""
+Converts the refresh token table from raw-token primary keys to hashed tokens.
+
+The legacy table is renamed aside and the new table, with its indexes, is created. Live
+(unexpired, unrevoked) tokens are copied over as SHA-256 hashes in batches, so signed-in
+clients keep working; expired and revoked rows are dropped along with the legacy table.
+Safe to re-run, including after an interrupted copy.
+
+Usage (from backend/):
+    python -m app.db.migrations.hash_refresh_tokens [--batch-size 1000]
+"""
+import argparse
+import logging
+from datetime import datetime
+
+from sqlalchemy import MetaData, Table, inspect, select, text
+from sqlmodel import SQLModel
+
+from app.db.session import engine
+from app.models.refresh_token import RefreshToken
+from app.services.auth_service import hash_refresh_token
+
+logger = logging.getLogger(__name__)
+
+TABLE = RefreshToken.__tablename__
+LEGACY_TABLE = f"{TABLE}_legacy"
+
+
+def migrate(batch_size: int = 1000) -> int:
+    """
+    Runs the migration and returns the number of live tokens carried over.
+    """
+    tables = inspect(engine).get_table_names()
+    if TABLE in tables and "token" in {c["name"] for c in inspect(engine).get_columns(TABLE)}:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}"))
+            if engine.dialect.name == "postgresql":
+                # Index names are schema-wide in Postgres; free them for the new table.
+                conn.execute(text(f"ALTER INDEX IF EXISTS {TABLE}_pkey RENAME TO {LEGACY_TABLE}_pkey"))
+                conn.execute(text(f"ALTER INDEX IF EXISTS ix_{TABLE}_token RENAME TO ix_{LEGACY_TABLE}_token"))
+            else:
+                conn.execute(text(f"DROP INDEX IF EXISTS ix_{TABLE}_token"))
+        tables.append(LEGACY_TABLE)
+
+    SQLModel.metadata.create_all(engine)
+
+    if LEGACY_TABLE not in tables:
+        logger.info("Refresh tokens are already hashed; nothing to migrate.")
+        return 0
+
+    legacy = Table(LEGACY_TABLE, MetaData(), autoload_with=engine)
+    copied = 0
+    last_token = ""
+    now = datetime.utcnow()
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(legacy.c.token, legacy.c.created_at, legacy.c.expires_at, legacy.c.user_id)
+                .where(legacy.c.token > last_token, legacy.c.revoked == False, legacy.c.expires_at > now)
+                .order_by(legacy.c.token)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_token = rows[-1].token
+
+            hashes = {hash_refresh_token(row.token): row for row in rows}
+            existing = set(conn.execute(
+                select(RefreshToken.token_hash).where(RefreshToken.token_hash.in_(list(hashes)))
+            ).scalars())
+            pending = [
+                {
+                    "token_hash": token_hash,
+                    "created_at": row.created_at,
+                    "expires_at": row.expires_at,
+                    "revoked": False,
+                    "user_id": row.user_id,
+                }
+                for token_hash, row in hashes.items() if token_hash not in existing
+            ]
+            if pending:
+                conn.execute(RefreshToken.__table__.insert(), pending)
+        copied += len(pending)
+        logger.info(f"Copied {copied} live refresh tokens.")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+
+    return copied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Hash stored refresh tokens.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logger.info(f"Refresh token migration finished: {migrate(batch_size=args.batch_size)} tokens migrated.")
@@ -0,0 +1,96 @@
+"""
+Moves document text out of the documents table into compressed document_contents rows.
+
+Brings a database created before the split up to the current schema:
+creates the new tables, adds documents.content_hash and the listing index,
+copies every documents.content value into document_contents in batches,
+then drops the legacy column. Safe to re-run; finished steps are skipped.
+
+Usage (from backend/):
+    python -m app.db.migrations.split_document_content [--batch-size 200] [--keep-legacy-column]
+"""
+import argparse
+import logging
+
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel
+
+from app.db.session import engine
+from app.models.document import Document
+from app.services.analysis_cache_service import compute_content_hash
+from app.services.document_content import compress_text
+
+logger = logging.getLogger(__name__)
+
+
+def _columns(table: str) -> set[str]:
+    return {column["name"] for column in inspect(engine).get_columns(table)}
+
+
+def migrate(batch_size: int = 200, drop_legacy_column: bool = True) -> int:
+    """
+    Runs the migration and returns the number of documents whose content was moved.
+    """
+    SQLModel.metadata.create_all(engine)
+
+    if "content_hash" not in _columns("documents"):
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE documents ADD COLUMN content_hash VARCHAR(64)"))
+
+    for index in Document.__table__.indexes:
+        index.create(engine, checkfirst=True)
+
+    if "content" not in _columns("documents"):
+        logger.info("documents.content already removed; nothing to move.")
+        return 0
+
+    moved = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT d.id, d.content FROM documents d "
+                    "LEFT JOIN document_contents c ON c.document_id = d.id "
+                    "WHERE d.id > :last_id AND c.document_id IS NULL "
+                    "ORDER BY d.id LIMIT :limit"
+                ),
+                {"last_id": last_id, "limit": batch_size},
+            ).all()
+            if not rows:
+                break
+
+            for doc_id, content in rows:
+                content = content or ""
+                encoding, data = compress_text(content)
+                conn.execute(
+                    text(
+                        "INSERT INTO document_contents (document_id, encoding, data, original_size) "
+                        "VALUES (:id, :encoding, :data, :size)"
+                    ),
+                    {"id": doc_id, "encoding": encoding, "data": data, "size": len(content)},
+                )
+                conn.execute(
+                    text("UPDATE documents SET content_hash = :hash WHERE id = :id"),
+                    {"hash": compute_content_hash(content), "id": doc_id},
+                )
+
+        moved += len(rows)
+        last_id = rows[-1][0]
+        logger.info(f"Moved content for {moved} documents.")
+
+    if drop_legacy_column:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE documents DROP COLUMN content"))
+
+    return moved
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Split document text into compressed document_contents rows.")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--keep-legacy-column", action="store_true", help="leave documents.content in place")
+    args = parser.parse_args()
+    moved = migrate(batch_size=args.batch_size, drop_legacy_column=not args.keep_legacy_column)
+    logger.info(f"Migration finished: {moved} documents moved.")
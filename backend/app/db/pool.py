@@ -0,0 +1,81 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets.
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolWaitStats:
+    """
+    Thread-safe histogram of how long callers waited to check a connection out of a pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: List[int] = [0] * (len(WAIT_BUCKETS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._buckets[bisect_left(WAIT_BUCKETS, seconds)] += 1
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def timed_out(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, hits in zip(WAIT_BUCKETS + (float("inf"),), self._buckets):
+                running += hits
+                cumulative[bound] = running
+            return {
+                "count": self.count,
+                "total_seconds": self.total_seconds,
+                "max_seconds": self.max_seconds,
+                "timeouts": self.timeouts,
+                "buckets": cumulative,
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records checkout wait time, including waits for a free connection
+    and pre-ping, so DB_POOL_SIZE and DB_MAX_OVERFLOW can be sized from real data.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.wait_stats.timed_out()
+            raise
+        finally:
+            self.wait_stats.observe(time.perf_counter() - started)
+
+    def recreate(self) -> "TimedQueuePool":
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool, TimedQueuePool):
+    """
+    TimedQueuePool for asyncio engines; waits for a free connection yield to the event loop.
+    """
@@ -1,28 +1,140 @@
 import os
 import logging
-from sqlmodel import create_engine, Session, SQLModel
+from typing import Any, Dict
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import create_engine, SQLModel
 from app.config import settings
+from app.db.pool import TimedAsyncQueuePool, TimedQueuePool
 from app.models.user import User
 from app.models.document import Document
+from app.models.document_index import DocumentIndex
+from app.models.document_content import DocumentContent
+from app.models.analysis_cache import AnalysisCacheEntry
+from app.models.answer_cache import AnswerCacheEntry
+from app.models.ingestion_job import IngestionJob
+from app.services.search_service import ensure_search_index
 
 logger = logging.getLogger(__name__)
 
-engine = create_engine(settings.DATABASE_URL, echo=False)
+
+# Async drivers used for the request path, by database backend.
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def async_database_url(url: str) -> URL:
+    """
+    Maps a database URL onto the async driver for its backend, so DATABASE_URL can keep
+    naming the sync driver used by migrations and scripts.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver is configured for {backend} databases.")
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}")
+
+
+def build_engine(url: str) -> Engine:
+    """
+    Creates a sync engine with the pool configured from Settings.
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    if _is_memory_sqlite(make_url(url)):
+        return create_engine(url, echo=False)
+    return create_engine(url, echo=False, poolclass=TimedQueuePool, **_pool_options())
+
+
+def build_async_engine(url: str) -> AsyncEngine:
+    """
+    Creates an async engine with the pool configured from Settings.
+    """
+    async_url = async_database_url(url)
+    if _is_memory_sqlite(async_url):
+        return create_async_engine(async_url, echo=False)
+    return create_async_engine(async_url, echo=False, poolclass=TimedAsyncQueuePool, **_pool_options())
+
+
+# Sync engine for table creation, migrations and offline scripts.
+engine = build_engine(settings.DATABASE_URL)
+
+# Request handlers and background tasks run on the event loop through these engines.
+async_engine = build_async_engine(settings.DATABASE_URL)
+
+# GET routes read through async_read_engine: the replica when READ_DATABASE_URL is set, otherwise
+# the primary's pool. On Postgres its transactions are READ ONLY, so a stray write fails loudly.
+async_read_engine = (
+    build_async_engine(settings.READ_DATABASE_URL) if settings.READ_DATABASE_URL else async_engine
+).execution_options(postgresql_readonly=True)
+
+# expire_on_commit is off because expired attributes cannot be lazily reloaded under asyncio.
+session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+read_session_factory = async_sessionmaker(async_read_engine, expire_on_commit=False)
+
 
 def create_db_and_tables():
     """
-    Creates the database tables based on SQLModel metadata.
+    Creates the database tables based on SQLModel metadata, plus the full-text search index.
     """
     logger.info("Creating database tables...")
     SQLModel.metadata.create_all(engine)
+    ensure_search_index(engine)
     logger.info("Tables created successfully.")
 
-def get_session():
+async def get_session():
+    """
+    FastAPI dependency to get an async database session.
+    """
+    async with session_factory() as session:
+        yield session
+
+async def get_read_session():
     """
-    FastAPI dependency to get a database session.
+    FastAPI dependency to get a read-only async database session, served by the read replica
+    when READ_DATABASE_URL is configured. Replicas may lag the primary slightly.
     """
-    with Session(engine) as session:
+    async with read_session_factory() as session:
         yield session
 
+async def dispose_engines() -> None:
+    """
+    Closes the pooled async connections. Called from the FastAPI lifespan.
+    """
+    await async_engine.dispose()
+    if settings.READ_DATABASE_URL:
+        await async_read_engine.dispose()
+
+def pool_stats() -> Dict[str, Dict]:
+    """
+    Returns checkout wait histograms and current occupancy for each connection pool.
+    """
+    engines = {"primary": async_engine}
+    if settings.READ_DATABASE_URL:
+        engines["replica"] = async_read_engine
+    stats = {}
+    for name, eng in engines.items():
+        pool = eng.pool
+        if isinstance(pool, TimedQueuePool):
+            stats[name] = {
+                **pool.wait_stats.snapshot(),
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+    return stats
+
 if __name__ == "__main__":
     create_db_and_tables()
\ No newline at end of file
@@ -1,9 +1,23 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.exception_handlers import http_exception_handler
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.document_routes import router as document_router
 from app.api.auth_routes import router as auth_router
 from app.api.chat_routes import router as chat_router
 from app.api.users_routes import router as users_router
+from app.api.metrics_routes import router as metrics_router
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, record_error
+from app.core.profiling import ProfilingMiddleware
+from app.config import settings
+from app.core.http_client import open_http_client, close_http_client
+from app.db.session import dispose_engines
+from app.services.ingestion_worker import ingestion_pool
+from app.services.pdf_parser import shutdown_extraction_pool
+from app.services.password_hasher import password_hasher
+from app.services.refresh_token_purger import refresh_token_purger
+from starlette.exceptions import HTTPException as StarletteHTTPException
 import sys
 import logging
 
@@ -11,10 +25,27 @@ logging.basicConfig(level=logging.ERROR)
 
 print("[DEBUG] Python executable:", sys.executable)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens app-scoped resources on startup and releases them on shutdown.
+    """
+    await open_http_client()
+    await ingestion_pool.start()
+    await refresh_token_purger.start()
+    yield
+    await refresh_token_purger.stop()
+    await ingestion_pool.stop()
+    shutdown_extraction_pool()
+    password_hasher.shutdown()
+    await close_http_client()
+    await dispose_engines()
+
 app = FastAPI(
     title="LegalLens API",
     description="Analyze legal documents with AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -23,9 +54,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Cache", "ETag"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+if settings.PROFILING_ADMIN_TOKEN:
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=settings.PROFILING_ADMIN_TOKEN,
+        directory=settings.PROFILING_DIR,
+    )
+
+
+@app.exception_handler(StarletteHTTPException)
+async def count_http_exception(request: Request, exc: StarletteHTTPException):
+    """
+    Counts error responses by the exception that caused them, then renders them as usual.
+    """
+    record_error(exc)
+    return await http_exception_handler(request, exc)
 
 app.include_router(auth_router)
 app.include_router(document_router)
 app.include_router(chat_router)
-app.include_router(users_router)
\ No newline at end of file
+app.include_router(users_router)
+app.include_router(metrics_router)
\ No newline at end of file
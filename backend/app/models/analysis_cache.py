@@ -0,0 +1,19 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field, JSON, Column, UniqueConstraint
+
+class AnalysisCacheEntry(SQLModel, table=True):
+    __tablename__ = "analysis_cache"
+    __table_args__ = (
+        UniqueConstraint("content_hash", "llm_model", "prompt_version", name="uq_analysis_cache_key"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    content_hash: str = Field(index=True, max_length=64)
+    llm_model: str
+    prompt_version: str
+    summary: str
+    red_flags: list[str] = Field(default=[], sa_column=Column(JSON))
+    clauses: list[dict] = Field(default=[], sa_column=Column(JSON))
+    hit_count: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow, index=True)
@@ -0,0 +1,10 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+class AnswerCacheEntry(SQLModel, table=True):
+    __tablename__ = "answer_cache"
+    cache_key: str = Field(primary_key=True, max_length=64)
+    content_hash: str = Field(index=True, max_length=64)
+    answer: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
@@ -1,19 +1,32 @@
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column
+from sqlmodel import SQLModel, Field, Relationship, JSON, Column, Index
 
 if TYPE_CHECKING:
     from app.models.user import User
+    from app.models.document_index import DocumentIndex
+    from app.models.document_content import DocumentContent
 
 class Document(SQLModel, table=True):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_user_created_id", "user_id", "created_at", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
-    content: str
+    content_hash: Optional[str] = Field(default=None, max_length=64)
     summary: str
     red_flags: list[str] = Field(default=[], sa_column=Column(JSON))
     clauses: list[dict] = Field(default=[], sa_column=Column(JSON))
     user_id: int = Field(foreign_key="users.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-    user: Optional["User"] = Relationship(back_populates="documents")
\ No newline at end of file
+    user: Optional["User"] = Relationship(back_populates="documents")
+    body: Optional["DocumentContent"] = Relationship(
+        back_populates="document",
+        sa_relationship_kwargs={"uselist": False, "cascade": "all, delete-orphan", "lazy": "select"}
+    )
+    chunk_index: Optional["DocumentIndex"] = Relationship(
+        back_populates="document",
+        sa_relationship_kwargs={"uselist": False, "cascade": "all, delete-orphan"}
+    )
\ No newline at end of file
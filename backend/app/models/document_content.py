@@ -0,0 +1,14 @@
+from typing import Optional, TYPE_CHECKING
+from sqlmodel import SQLModel, Field, Relationship, Column, LargeBinary
+
+if TYPE_CHECKING:
+    from app.models.document import Document
+
+class DocumentContent(SQLModel, table=True):
+    __tablename__ = "document_contents"
+    document_id: Optional[int] = Field(default=None, foreign_key="documents.id", primary_key=True)
+    encoding: str = Field(max_length=16)
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    original_size: int
+
+    document: Optional["Document"] = Relationship(back_populates="body")
@@ -0,0 +1,18 @@
+from typing import Optional, TYPE_CHECKING
+from datetime import datetime
+from sqlmodel import SQLModel, Field, Relationship, JSON, Column
+
+if TYPE_CHECKING:
+    from app.models.document import Document
+
+class DocumentIndex(SQLModel, table=True):
+    __tablename__ = "document_indexes"
+    document_id: int = Field(foreign_key="documents.id", primary_key=True)
+    chunk_size: int
+    chunks: list[str] = Field(default=[], sa_column=Column(JSON))
+    term_freqs: list[dict] = Field(default=[], sa_column=Column(JSON))
+    doc_freqs: dict = Field(default={}, sa_column=Column(JSON))
+    avg_chunk_length: float = 0.0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    document: Optional["Document"] = Relationship(back_populates="chunk_index")
@@ -0,0 +1,23 @@
+from enum import Enum
+from typing import Optional
+from uuid import uuid4
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+class IngestionJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class IngestionJob(SQLModel, table=True):
+    __tablename__ = "ingestion_jobs"
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True, max_length=32)
+    user_id: int = Field(foreign_key="users.id", index=True)
+    filename: str
+    file_path: str
+    status: IngestionJobStatus = Field(default=IngestionJobStatus.QUEUED, index=True)
+    document_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
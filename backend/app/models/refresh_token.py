@@ -1,14 +1,18 @@
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Index
 
 if TYPE_CHECKING:
     from app.models.user import User
 
 class RefreshToken(SQLModel, table=True):
-    token: str = Field(primary_key=True, index=True)
+    __table_args__ = (
+        Index("ix_refreshtoken_user_revoked_expires", "user_id", "revoked", "expires_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    token_hash: str = Field(max_length=64, unique=True, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    expires_at: datetime
+    expires_at: datetime = Field(index=True)
     revoked: bool = Field(default=False)
     user_id: Optional[int] = Field(default=None, foreign_key="users.id")
-    user: Optional["User"] = Relationship(back_populates="refresh_tokens")
\ No newline at end of file
+    user: Optional["User"] = Relationship(back_populates="refresh_tokens")
@@ -3,6 +3,8 @@ from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
 
 from app.models.document import Document
+from app.models.document_index import DocumentIndex
+from app.models.document_content import DocumentContent
 from app.models.refresh_token import RefreshToken
 
 class User(SQLModel, table=True):
@@ -1,16 +1,16 @@
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict
 
 class DocumentSummary(BaseModel):
     id: int
     title: str
-    content: str
     summary: str
     red_flags: List[str]
     clauses: List[dict]
     user_id: int
     created_at: datetime
+    content: Optional[str] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -22,5 +22,12 @@ class DocumentListItem(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class DocumentSearchResult(BaseModel):
+    id: int
+    title: str
+    created_at: datetime
+    rank: float
+    snippet: str
+
 class DocumentCreate(BaseModel):
     title: str
\ No newline at end of file
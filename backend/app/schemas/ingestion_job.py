@@ -0,0 +1,26 @@
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+from app.models.ingestion_job import IngestionJobStatus
+
+class IngestionJobRead(BaseModel):
+    id: str
+    filename: str
+    status: IngestionJobStatus
+    document_id: Optional[int]
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BatchUploadItem(BaseModel):
+    filename: str
+    job: Optional[IngestionJobRead] = None
+    error: Optional[str] = None
+
+class BatchUploadResponse(BaseModel):
+    accepted: int
+    rejected: int
+    items: List[BatchUploadItem]
@@ -1,18 +1,102 @@
+import asyncio
 import json
 import logging
+from typing import AsyncIterator, Optional
+
 import httpx
 
 from app.config import settings
+from app.core.http_client import get_http_client
 from app.schemas.document import DocumentSummary
 from app.core.exceptions import AIEngineError
+from app.core.metrics import LLM_REQUESTS_IN_FLIGHT, record_llm_usage
+from app.services.clause_segmenter import clause_label
+from app.services.prompt_budget import estimate_tokens, fit_to_budget, prompt_token_budget
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the analysis prompt or the cached analysis format changes so old entries are not reused.
+ANALYSIS_PROMPT_VERSION = "4"
+# Bump whenever the chat prompt or the context ChatService builds for it changes, so cached answers are not reused.
+CHAT_PROMPT_VERSION = "2"
+
+
+def _pieces_within(text: str, start: int, end: int, max_tokens: int) -> list[tuple[int, int, int]]:
+    """
+    Splits text[start:end] into (start, end, tokens) pieces of at most max_tokens each,
+    cutting at whitespace where possible.
+    """
+    pieces = []
+    while start < end:
+        piece_end = end
+        tokens = estimate_tokens(text[start:piece_end])
+        while tokens > max_tokens:
+            # Shrink in proportion to the overshoot, with a margin so the loop converges quickly.
+            piece_end = start + max(int((piece_end - start) * max_tokens / tokens * 0.95), 1)
+            cut = max(text.rfind(" ", start, piece_end), text.rfind("\n", start, piece_end))
+            if cut > start + (piece_end - start) // 2:
+                piece_end = cut + 1
+            tokens = estimate_tokens(text[start:piece_end])
+        pieces.append((start, piece_end, tokens))
+        start = piece_end
+    return pieces
+
+
+def split_pages_into_chunks(text: str, page_offsets: list[int], max_tokens: int) -> list[str]:
+    """
+    Groups consecutive pages into chunks of at most max_tokens as counted by estimate_tokens,
+    splitting oversized pages, so fit_to_budget never has to cut a chunk.
+    Pages are the slices of text starting at each entry of page_offsets.
+    """
+    bounds = page_offsets + [len(text)]
+    groups: list[list[tuple[int, int, int]]] = [[]]
+    group_tokens = 0
+
+    for page_start, page_end in zip(bounds, bounds[1:]):
+        for piece in _pieces_within(text, page_start, page_end, max_tokens):
+            if groups[-1] and group_tokens + piece[2] > max_tokens:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(piece)
+            group_tokens += piece[2]
+
+    chunks: list[str] = []
+    for group in groups:
+        while group:
+            # Pieces are counted separately; tokens that merge across a boundary can make the whole
+            # larger than their sum, so trailing pieces move to a chunk of their own until it fits.
+            count = len(group)
+            while count > 1 and estimate_tokens(text[group[0][0]:group[count - 1][1]]) > max_tokens:
+                count -= 1
+            chunk = text[group[0][0]:group[count - 1][1]]
+            if chunk.strip():
+                chunks.append(chunk)
+            group = group[count:]
+    return chunks
+
+
+def _dedupe_key(value: str) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def _format_red_flag(flag, labels: dict[str, str]) -> str:
+    """
+    Renders a red flag that cites clause ids as text naming those clauses, e.g.
+    "Liability is capped at one month of fees (see 6. Limitation of Liability)".
+    """
+    if not isinstance(flag, dict):
+        return str(flag)
+    cited = [labels[clause_id] for clause_id in flag.get("clause_ids", []) if clause_id in labels]
+    text = str(flag.get("text", "")).strip()
+    return f"{text} (see {'; '.join(cited)})" if cited else text
+
 class AIEngineService:
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        self._client = http_client or get_http_client()
         self._api_key = settings.OPENROUTER_API_KEY
         self._base_url = settings.OPENROUTER_BASE_URL
         self._llm_model = settings.LLM_MODEL
+        self._token_budget = prompt_token_budget(self._llm_model)
         self._headers = {
             "Authorization": f"Bearer {self._api_key}",
             "Content-Type": "application/json",
@@ -20,9 +104,9 @@ class AIEngineService:
             "X-Title": "LegalLens"
         }
 
-    def _send_request(self, messages: list[dict]) -> dict:
+    async def _send_request(self, messages: list[dict]) -> dict:
         """
-        Sends a request to the OpenRouter API and handles potential errors.
+        Sends a request to the OpenRouter API over the shared pooled client and handles potential errors.
         """
         payload = {
             "model": self._llm_model,
@@ -30,10 +114,12 @@ class AIEngineService:
         }
 
         try:
-            with httpx.Client(timeout=60.0) as client:
-                response = client.post(self._base_url, headers=self._headers, json=payload)
-                response.raise_for_status()
-                return response.json()
+            with LLM_REQUESTS_IN_FLIGHT.track():
+                response = await self._client.post(self._base_url, headers=self._headers, json=payload)
+            response.raise_for_status()
+            response_json = response.json()
+            record_llm_usage(response_json.get("usage"))
+            return response_json
         except httpx.HTTPStatusError as exc:
             logger.error(f"HTTP error with AI engine: {exc.response.status_code} - {exc.response.text}")
             raise AIEngineError(f"AI service returned an error: {exc.response.status_code}") from exc
@@ -44,11 +130,26 @@ class AIEngineService:
             logger.error(f"Unexpected error with AI engine request: {exc}")
             raise AIEngineError("An unexpected error occurred with the AI service.") from exc
 
-    def analyze_text_with_ai(self, text: str) -> DocumentSummary:
+    async def analyze_text_with_ai(self, text: str, clauses: Optional[list[dict]] = None) -> DocumentSummary:
         """
-        Sends document text to the AI model for legal analysis.
+        Sends document text to the AI model for legal analysis, truncated to the model's token budget.
+        When `clauses` were segmented locally, the text carries their id markers and the model
+        returns only the summary and red flags citing clause ids, instead of echoing every clause.
         """
-        prompt = f"""
+        text, _ = fit_to_budget(text, self._token_budget)
+        if clauses:
+            prompt = f"""
+        You are a legal assistant AI. Analyze the following legal document. Its clauses are already identified: each one starts with an id marker such as [c3].
+
+        Document:
+        \"\"\"
+        {text}
+        \"\"\"
+
+        Respond in JSON format with keys: `summary` (string, max 5 lines) and `red_flags` (list of objects with `text`, a string, and `clause_ids`, the list of clause ids such as "c3" that the red flag concerns). Do not repeat clause text.
+        """
+        else:
+            prompt = f"""
         You are a legal assistant AI. Analyze the following legal document and return a JSON object with a summary, key clauses, and potential red flags.
 
         Document:
@@ -59,28 +160,116 @@ class AIEngineService:
         Respond in JSON format with keys: `summary` (string, max 5 lines), `clauses` (list of objects with `title` and `content`), and `red_flags` (list of strings).
         """
         messages = [{"role": "user", "content": prompt}]
-        response_json = self._send_request(messages)
+        response_json = await self._send_request(messages)
         content = response_json["choices"][0]["message"]["content"]
         
         try:
             parsed = json.loads(content)
+        except json.JSONDecodeError as exc:
+            logger.error(f"Failed to parse AI response as JSON: {content}")
+            raise AIEngineError("The AI response could not be parsed.") from exc
+
+        if not clauses:
             return {
                 "summary": parsed.get("summary", ""),
                 "clauses": parsed.get("clauses", []),
                 "red_flags": parsed.get("red_flags", [])
             }
-        except json.JSONDecodeError as exc:
-            logger.error(f"Failed to parse AI response as JSON: {content}")
-            raise AIEngineError("The AI response could not be parsed.") from exc
+        labels = {clause["id"]: clause_label(clause) for clause in clauses}
+        return {
+            "summary": parsed.get("summary", ""),
+            "clauses": clauses,
+            "red_flags": [_format_red_flag(flag, labels) for flag in parsed.get("red_flags", [])],
+        }
 
-    def get_ai_response(self, text: str, question: str) -> str:
+    async def analyze_pages(
+        self,
+        text: str,
+        page_offsets: list[int],
+        tokens: Optional[int] = None,
+        clauses: Optional[list[dict]] = None,
+    ) -> DocumentSummary:
         """
-        Submits a question about a document to the AI model.
+        Analyzes extracted pages, switching to map-reduce above ANALYSIS_MAP_REDUCE_THRESHOLD_TOKENS
+        or the model's token budget, whichever is lower. Chunks are analyzed concurrently, bounded
+        by ANALYSIS_MAP_CONCURRENCY. Pass `tokens` when the text has already been counted, and
+        `clauses` when the text carries the clause markers added by mark_clauses.
+        """
+        if tokens is None:
+            tokens = estimate_tokens(text)
+        if tokens <= min(settings.ANALYSIS_MAP_REDUCE_THRESHOLD_TOKENS, self._token_budget):
+            return await self.analyze_text_with_ai(text, clauses)
+
+        chunk_tokens = min(settings.ANALYSIS_MAP_CHUNK_TOKENS, self._token_budget)
+        chunks = split_pages_into_chunks(text, page_offsets, chunk_tokens)
+        semaphore = asyncio.Semaphore(settings.ANALYSIS_MAP_CONCURRENCY)
+
+        async def analyze_chunk(chunk: str) -> dict:
+            async with semaphore:
+                return await self.analyze_text_with_ai(chunk, clauses)
+
+        logger.info(f"Map-reduce analysis over {len(chunks)} chunks.")
+        partials = await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks))
+        if clauses:
+            # Every partial repeats the local clause list; merge only summaries and red flags.
+            partials = [{**partial, "clauses": []} for partial in partials]
+            return {**await self._reduce_analyses(partials), "clauses": clauses}
+        return await self._reduce_analyses(partials)
+
+    async def _reduce_analyses(self, partials: list[dict]) -> DocumentSummary:
         """
+        Merges per-chunk analyses: clauses and red flags are deduplicated in order,
+        and the partial summaries are condensed into one by the model.
+        """
+        clauses, seen_clauses = [], set()
+        red_flags, seen_flags = [], set()
+
+        for partial in partials:
+            for clause in partial.get("clauses", []):
+                key = _dedupe_key(clause.get("title", "") if isinstance(clause, dict) else clause)
+                if key not in seen_clauses:
+                    seen_clauses.add(key)
+                    clauses.append(clause)
+            for flag in partial.get("red_flags", []):
+                key = _dedupe_key(flag)
+                if key not in seen_flags:
+                    seen_flags.add(key)
+                    red_flags.append(flag)
+
+        summaries = [p.get("summary", "") for p in partials if p.get("summary")]
+        if len(summaries) > 1:
+            summary = await self._combine_summaries(summaries)
+        else:
+            summary = summaries[0] if summaries else ""
+
+        return {"summary": summary, "clauses": clauses, "red_flags": red_flags}
+
+    async def _combine_summaries(self, summaries: list[str]) -> str:
+        """
+        Asks the model to condense the summaries of consecutive document sections into one.
+        """
+        joined = "\n\n".join(f"Section {i}: {summary}" for i, summary in enumerate(summaries, start=1))
         prompt = f"""
-        You are a legal assistant AI. Answer the following question based only on the document provided. Do not use outside knowledge.
+        You are a legal assistant AI. The following are summaries of consecutive sections of one legal document.
 
-        Document:
+        {joined}
+
+        Write a single summary of the whole document, maximum 5 lines. Respond with the summary text only.
+        """
+        messages = [{"role": "user", "content": prompt}]
+        response_json = await self._send_request(messages)
+        return response_json["choices"][0]["message"]["content"].strip()
+
+    def _build_chat_messages(self, text: str, question: str) -> list[dict]:
+        """
+        Builds the chat prompt. `text` is the document context: its stored analysis
+        and the excerpts relevant to the question, truncated to the model's token budget.
+        """
+        text, _ = fit_to_budget(text, self._token_budget)
+        prompt = f"""
+        You are a legal assistant AI. Answer the following question based only on the document context provided. Do not use outside knowledge.
+
+        Document context:
         \"\"\"
         {text}
         \"\"\"
@@ -92,6 +281,51 @@ class AIEngineService:
 
         Answer the user's question clearly and precisely. Maximum 10 lines.
         """
-        messages = [{"role": "user", "content": prompt}]
-        response_json = self._send_request(messages)
-        return response_json["choices"][0]["message"]["content"]
\ No newline at end of file
+        return [{"role": "user", "content": prompt}]
+
+    async def get_ai_response(self, text: str, question: str) -> str:
+        """
+        Submits a question about a document to the AI model.
+        """
+        messages = self._build_chat_messages(text, question)
+        response_json = await self._send_request(messages)
+        return response_json["choices"][0]["message"]["content"]
+
+    async def stream_ai_response(self, text: str, question: str) -> AsyncIterator[str]:
+        """
+        Submits a question about a document with `stream: true` and yields answer tokens as they arrive.
+        """
+        payload = {
+            "model": self._llm_model,
+            "messages": self._build_chat_messages(text, question),
+            "stream": True
+        }
+
+        try:
+            with LLM_REQUESTS_IN_FLIGHT.track():
+                async with self._client.stream("POST", self._base_url, headers=self._headers, json=payload) as response:
+                    if response.is_error:
+                        await response.aread()
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        # The provider reports usage on the final chunk.
+                        record_llm_usage(chunk.get("usage"))
+                        choices = chunk["choices"]
+                        delta = choices[0].get("delta", {}).get("content") if choices else None
+                        if delta:
+                            yield delta
+        except httpx.HTTPStatusError as exc:
+            logger.error(f"HTTP error with AI engine stream: {exc.response.status_code} - {exc.response.text}")
+            raise AIEngineError(f"AI service returned an error: {exc.response.status_code}") from exc
+        except httpx.RequestError as exc:
+            logger.error(f"Network error streaming from AI engine: {exc}")
+            raise AIEngineError("Network error connecting to AI service.") from exc
+        except (json.JSONDecodeError, KeyError, IndexError) as exc:
+            logger.error(f"Malformed chunk in AI engine stream: {exc}")
+            raise AIEngineError("The AI response stream could not be parsed.") from exc
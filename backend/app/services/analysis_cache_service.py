@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.analysis_cache import AnalysisCacheEntry
+from app.services.ai_engine import ANALYSIS_PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+_stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+# Text is hashed in blocks of about this many characters, each ending at whitespace.
+_HASH_BLOCK_CHARS = 1 << 16
+_WHITESPACE = re.compile(r"\s")
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def compute_content_hash(text: str) -> str:
+    """
+    Hashes document text after collapsing whitespace, so re-extracted copies of the same PDF match.
+    The digest is that of `" ".join(text.split())`, computed block by block so no word list or
+    normalized copy of the whole text is built.
+    """
+    digest = hashlib.sha256()
+    separator = b""
+    start = 0
+    while start < len(text):
+        boundary = _WHITESPACE.search(text, min(start + _HASH_BLOCK_CHARS, len(text)))
+        end = boundary.start() if boundary else len(text)
+        words = text[start:end].split()
+        if words:
+            digest.update(separator + " ".join(words).encode("utf-8"))
+            separator = b" "
+        start = end + 1 if boundary else end
+    return digest.hexdigest()
+
+
+class AnalysisCacheService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._llm_model = settings.LLM_MODEL
+        self._prompt_version = ANALYSIS_PROMPT_VERSION
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        """
+        Returns a snapshot of the process-wide hit/miss/eviction counters.
+        """
+        with _stats_lock:
+            return dict(_stats)
+
+    async def get(self, content_hash: str) -> Optional[dict]:
+        """
+        Returns a stored analysis for the hash under the current model and prompt version, if any.
+        Cache failures are logged and treated as a miss.
+        """
+        if not settings.ANALYSIS_CACHE_ENABLED:
+            return None
+
+        try:
+            entry = await self.db.scalar(select(AnalysisCacheEntry).where(
+                AnalysisCacheEntry.content_hash == content_hash,
+                AnalysisCacheEntry.llm_model == self._llm_model,
+                AnalysisCacheEntry.prompt_version == self._prompt_version,
+            ).limit(1))
+
+            if not entry:
+                _count("misses")
+                return None
+
+            entry.hit_count += 1
+            entry.last_used_at = datetime.utcnow()
+            self.db.add(entry)
+            await self.db.commit()
+            _count("hits")
+            return {
+                "summary": entry.summary,
+                "clauses": entry.clauses,
+                "red_flags": entry.red_flags,
+            }
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.warning(f"Analysis cache lookup failed for {content_hash}: {e}")
+            _count("misses")
+            return None
+
+    async def put(self, content_hash: str, analysis: dict) -> None:
+        """
+        Stores an analysis result and evicts the least recently used entries beyond the configured bound.
+        """
+        if not settings.ANALYSIS_CACHE_ENABLED:
+            return
+
+        entry = AnalysisCacheEntry(
+            content_hash=content_hash,
+            llm_model=self._llm_model,
+            prompt_version=self._prompt_version,
+            summary=analysis.get("summary") or "",
+            red_flags=analysis.get("red_flags", []),
+            clauses=analysis.get("clauses", []),
+        )
+
+        try:
+            self.db.add(entry)
+            await self.db.commit()
+        except IntegrityError:
+            # Another upload of the same text stored it first.
+            await self.db.rollback()
+            return
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.warning(f"Analysis cache store failed for {content_hash}: {e}")
+            return
+
+        await self._evict()
+
+    async def _evict(self) -> None:
+        """
+        Deletes the least recently used entries once the table exceeds ANALYSIS_CACHE_MAX_ENTRIES.
+        """
+        try:
+            total = await self.db.scalar(select(func.count()).select_from(AnalysisCacheEntry))
+            overflow = total - settings.ANALYSIS_CACHE_MAX_ENTRIES
+            if overflow <= 0:
+                return
+
+            stale_ids = list(await self.db.scalars(
+                select(AnalysisCacheEntry.id)
+                .order_by(AnalysisCacheEntry.last_used_at.asc())
+                .limit(overflow)
+            ))
+            await self.db.execute(
+                delete(AnalysisCacheEntry).where(AnalysisCacheEntry.id.in_(stale_ids)),
+                execution_options={"synchronize_session": False},
+            )
+            await self.db.commit()
+            _count("evictions", len(stale_ids))
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.warning(f"Analysis cache eviction failed: {e}")
@@ -0,0 +1,194 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.answer_cache import AnswerCacheEntry
+from app.services.ai_engine import ANALYSIS_PROMPT_VERSION, CHAT_PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """
+    Lowercases a question, collapses whitespace and drops trailing punctuation.
+    """
+    collapsed = " ".join(question.lower().split())
+    return re.sub(r"[\s?!.]+$", "", collapsed)
+
+
+def build_answer_key(content_hash: str, question: str, llm_model: str, prompt_version: str) -> str:
+    """
+    Builds the cache key for a (document content, question, model, prompt version) tuple.
+    """
+    raw = f"{content_hash}\x1f{normalize_question(question)}\x1f{llm_model}\x1f{prompt_version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _LRUTTLCache:
+    """
+    Thread-safe in-memory LRU cache whose entries also expire after a fixed TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, _, answer = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return answer
+
+    def set(self, key: str, content_hash: str, answer: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, content_hash, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, content_hash: str) -> None:
+        with self._lock:
+            stale = [k for k, (_, h, _) in self._entries.items() if h == content_hash]
+            for key in stale:
+                del self._entries[key]
+
+
+_memory_cache = _LRUTTLCache(
+    max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+)
+
+
+class AnswerCacheService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._llm_model = settings.LLM_MODEL
+        # The chat context embeds the stored analysis, so both prompts version the answers.
+        self._prompt_version = f"{ANALYSIS_PROMPT_VERSION}.{CHAT_PROMPT_VERSION}"
+        self._persistent = settings.ANSWER_CACHE_PERSISTENT
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        """
+        Returns a snapshot of the in-memory tier's hit/miss/eviction counters.
+        """
+        with _memory_cache._lock:
+            return dict(_memory_cache.stats)
+
+    async def get(self, content_hash: str, question: str) -> Optional[str]:
+        """
+        Returns a cached answer, checking memory first and then the persistent tier if enabled.
+        """
+        if not settings.ANSWER_CACHE_ENABLED:
+            return None
+
+        key = build_answer_key(content_hash, question, self._llm_model, self._prompt_version)
+        answer = _memory_cache.get(key)
+        if answer is not None or not self._persistent:
+            return answer
+
+        try:
+            entry = await self.db.get(AnswerCacheEntry, key)
+        except SQLAlchemyError as e:
+            logger.warning(f"Answer cache lookup failed: {e}")
+            return None
+
+        if entry is None or entry.expires_at < datetime.utcnow():
+            return None
+
+        _memory_cache.set(key, content_hash, entry.answer)
+        return entry.answer
+
+    async def put(self, content_hash: str, question: str, answer: str) -> None:
+        """
+        Stores an answer in memory and, if enabled, in the persistent tier.
+        """
+        if not settings.ANSWER_CACHE_ENABLED:
+            return
+
+        key = build_answer_key(content_hash, question, self._llm_model, self._prompt_version)
+        _memory_cache.set(key, content_hash, answer)
+        if not self._persistent:
+            return
+
+        try:
+            await self.db.merge(AnswerCacheEntry(
+                cache_key=key,
+                content_hash=content_hash,
+                answer=answer,
+                expires_at=datetime.utcnow() + timedelta(seconds=settings.ANSWER_CACHE_TTL_SECONDS),
+            ))
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.warning(f"Answer cache store failed: {e}")
+            return
+
+        await self._evict()
+
+    async def _evict(self) -> None:
+        """
+        Deletes expired rows, then the oldest rows once the table exceeds ANSWER_CACHE_PERSISTENT_MAX_ENTRIES.
+        Every row lives for the same TTL, so the soonest to expire are the oldest.
+        """
+        try:
+            await self.db.execute(
+                delete(AnswerCacheEntry).where(AnswerCacheEntry.expires_at < datetime.utcnow()),
+                execution_options={"synchronize_session": False},
+            )
+            total = await self.db.scalar(select(func.count()).select_from(AnswerCacheEntry))
+            overflow = total - settings.ANSWER_CACHE_PERSISTENT_MAX_ENTRIES
+            if overflow > 0:
+                stale_keys = list(await self.db.scalars(
+                    select(AnswerCacheEntry.cache_key)
+                    .order_by(AnswerCacheEntry.expires_at.asc())
+                    .limit(overflow)
+                ))
+                await self.db.execute(
+                    delete(AnswerCacheEntry).where(AnswerCacheEntry.cache_key.in_(stale_keys)),
+                    execution_options={"synchronize_session": False},
+                )
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.warning(f"Answer cache eviction failed: {e}")
+
+    async def invalidate(self, content_hash: str) -> None:
+        """
+        Drops every cached answer for a document's content, in memory and in the persistent
+        tier. Rows are deleted even when this process does not read them, since other
+        processes or an earlier configuration may have stored them.
+        """
+        _memory_cache.invalidate(content_hash)
+        try:
+            await self.db.execute(
+                delete(AnswerCacheEntry).where(AnswerCacheEntry.content_hash == content_hash),
+                execution_options={"synchronize_session": False},
+            )
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.warning(f"Answer cache invalidation failed for {content_hash}: {e}")
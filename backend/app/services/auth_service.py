@@ -1,12 +1,14 @@
+import hashlib
 import logging
+import uuid
 from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from app.models.user import User
 from app.models.refresh_token import RefreshToken
-from app.schemas.user import UserCreate
+from app.schemas.user import UserCreate, UserUpdate
 from app.schemas.token import Token
 from app.config import settings
 from app.core.exceptions import (
@@ -17,114 +19,203 @@ from app.core.exceptions import (
 )
 from app.services.jwt import jwt_service
 from app.services.user_service import UserService
+from app.services.password_hasher import password_hasher
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Returns the fixed-length digest refresh tokens are stored and looked up by.
+    Tokens are long random-bearing JWTs, so an unsalted SHA-256 is sufficient.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
 
 class AuthService:
-    def __init__(self, db: Session, user_service: UserService):
+    def __init__(self, db: AsyncSession, user_service: UserService):
         self.db = db
         self.user_service = user_service
 
-    def register_user(self, user_in: UserCreate) -> User:
+    async def register_user(self, user_in: UserCreate) -> User:
         """
         Registers a new user after checking if the email is already in use.
+        Hashing runs in the password hasher pool.
         """
-        existing_user = self.user_service.get_user_by_email(user_in.email)
+        password_hasher.ensure_capacity()
+        existing_user = await self.user_service.get_user_by_email(user_in.email)
         if existing_user:
             raise UserAlreadyExistsError("Email is already registered.")
 
-        hashed_password = pwd_context.hash(user_in.password)
+        hashed_password = await password_hasher.hash(user_in.password)
         user_in.password = hashed_password
         
         try:
-            user = self.user_service.create_user(user_in)
+            user = await self.user_service.create_user(user_in)
             return user
         except DatabaseError as e:
             raise e
 
-    def authenticate_user(self, email: str, password: str) -> User:
+    async def authenticate_user(self, email: str, password: str) -> User:
         """
         Authenticates a user by email and password.
+        Hashes made with a different bcrypt cost than PASSWORD_BCRYPT_ROUNDS are replaced on success.
         """
-        user = self.user_service.get_user_by_email(email)
-        if not user or not self.verify_password(password, user.hashed_password):
+        password_hasher.ensure_capacity()
+        user = await self.user_service.get_user_by_email(email)
+        if not user:
             raise InvalidCredentialsError("Invalid email or password.")
-        
+
+        valid, new_hash = await self.verify_password(password, user.hashed_password)
+        if not valid:
+            raise InvalidCredentialsError("Invalid email or password.")
+
+        if new_hash:
+            user_id = user.id
+            try:
+                await self.user_service.update_user(user_id, UserUpdate(password=new_hash))
+            except DatabaseError as e:
+                logger.warning(f"Could not store rehashed password for user {user_id}: {e}")
+                # The rollback expired the instance, and it cannot lazily reload under asyncio.
+                user = await self.user_service.get_user_by_id(user_id)
+
         return user
     
-    def create_tokens_for_user(self, user_id: int) -> Token:
+    async def create_tokens_for_user(self, user_id: int) -> Token:
         """
         Generates new access and refresh tokens for a user.
         """
         access_token = jwt_service.create_access_token(data={"sub": str(user_id)})
-        refresh_token_string = self.create_and_store_refresh_token(user_id)
+        refresh_token_string = await self.create_and_store_refresh_token(user_id)
         return Token(access_token=access_token, refresh_token=refresh_token_string)
 
-    def verify_refresh_token(self, refresh_token_string: str) -> int:
+    async def _get_refresh_token(self, refresh_token_string: str) -> RefreshToken:
         """
-        Verifies a refresh token against the database and returns the user ID.
+        Looks up a live refresh token by its hash, raising RefreshTokenExpiredError otherwise.
         """
-        try:
-            stored_token = self.db.query(RefreshToken).filter(
-                RefreshToken.token == refresh_token_string,
-                RefreshToken.revoked == False
-            ).first()
+        stored_token = await self.db.scalar(select(RefreshToken).where(
+            RefreshToken.token_hash == hash_refresh_token(refresh_token_string),
+            RefreshToken.revoked == False
+        ).limit(1))
 
-            if not stored_token:
+        if not stored_token:
+            raise RefreshTokenExpiredError("Invalid refresh token or already revoked.")
+
+        if stored_token.expires_at < datetime.utcnow():
+            raise RefreshTokenExpiredError("Expired refresh token.")
+
+        return stored_token
+
+    async def rotate_refresh_token(self, refresh_token_string: str) -> Token:
+        """
+        Exchanges a refresh token for a new token pair. The old token is revoked and the new
+        one stored in the same transaction; the conditional revoke ensures that of two
+        concurrent refreshes with one token, only one succeeds.
+        """
+        try:
+            stored_token = await self._get_refresh_token(refresh_token_string)
+            user_id = stored_token.user_id
+            claimed = await self.db.execute(
+                update(RefreshToken).where(
+                    RefreshToken.id == stored_token.id,
+                    RefreshToken.revoked == False
+                ).values(revoked=True),
+                execution_options={"synchronize_session": False},
+            )
+            if claimed.rowcount != 1:
+                await self.db.rollback()
                 raise RefreshTokenExpiredError("Invalid refresh token or already revoked.")
-                
-            if stored_token.expires_at < datetime.utcnow():
-                self.revoke_refresh_token(stored_token)
-                raise RefreshTokenExpiredError("Expired refresh token.")
-            
-            return stored_token.user_id
+
+            refresh_token_string = self._add_refresh_token(user_id)
+            await self.db.commit()
         except SQLAlchemyError as e:
-            logger.error(f"Database error verifying refresh token: {e}", exc_info=True)
-            raise DatabaseError("Error verifying refresh token.")
+            await self.db.rollback()
+            logger.error(f"Database error rotating refresh token: {e}", exc_info=True)
+            raise DatabaseError("Error rotating refresh token.")
 
-    def create_and_store_refresh_token(self, user_id: int) -> str:
+        access_token = jwt_service.create_access_token(data={"sub": str(user_id)})
+        return Token(access_token=access_token, refresh_token=refresh_token_string)
+
+    def _add_refresh_token(self, user_id: int) -> str:
         """
-        Creates a refresh token and stores it in the database.
+        Creates a refresh token and adds its hash to the session without committing.
         """
         token_string = jwt_service.create_access_token(
-            data={"sub": str(user_id)},
+            data={"sub": str(user_id), "jti": uuid.uuid4().hex},
             expires_delta=timedelta(minutes=settings.JWT_REFRESH_TOKEN_EXPIRES_MINUTES)
         )
-        
         expires_at = datetime.utcnow() + timedelta(minutes=settings.JWT_REFRESH_TOKEN_EXPIRES_MINUTES)
-        
+        self.db.add(RefreshToken(
+            token_hash=hash_refresh_token(token_string),
+            user_id=user_id,
+            expires_at=expires_at
+        ))
+        return token_string
+
+    async def create_and_store_refresh_token(self, user_id: int) -> str:
+        """
+        Creates a refresh token and stores its hash in the database.
+        The token itself is only ever returned to the client.
+        """
         try:
-            new_token = RefreshToken(
-                token=token_string,
-                user_id=user_id,
-                expires_at=expires_at
-            )
-            self.db.add(new_token)
-            self.db.commit()
-            self.db.refresh(new_token)
-            return new_token.token
+            token_string = self._add_refresh_token(user_id)
+            await self.db.commit()
+            return token_string
         except SQLAlchemyError as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Database error storing refresh token for user {user_id}: {e}", exc_info=True)
             raise DatabaseError("Error storing refresh token.")
 
-    def revoke_refresh_token(self, rt: RefreshToken) -> None:
+    async def revoke_all_refresh_tokens(self, user_id: int) -> int:
         """
-        Revokes a refresh token by marking it as revoked in the database.
+        Revokes every live refresh token of a user in one statement, ending all their sessions
+        once their current access tokens expire. Returns the number of tokens revoked.
         """
         try:
-            rt.revoked = True
-            self.db.add(rt)
-            self.db.commit()
+            result = await self.db.execute(
+                update(RefreshToken).where(
+                    RefreshToken.user_id == user_id,
+                    RefreshToken.revoked == False
+                ).values(revoked=True),
+                execution_options={"synchronize_session": False},
+            )
+            await self.db.commit()
+            return result.rowcount
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(f"Database error revoking refresh token {rt.id}: {e}", exc_info=True)
-            raise DatabaseError("Error revoking refresh token.")
-            
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+            await self.db.rollback()
+            logger.error(f"Database error revoking refresh tokens for user {user_id}: {e}", exc_info=True)
+            raise DatabaseError("Error revoking refresh tokens.")
+
+    async def purge_expired_refresh_tokens(self, batch_size: int) -> int:
+        """
+        Deletes expired refresh tokens in batches of batch_size, committing after each batch
+        so no long-running transaction holds locks. Returns the number of rows deleted.
+        """
+        deleted = 0
+        while True:
+            try:
+                ids = list(await self.db.scalars(select(RefreshToken.id).where(
+                    RefreshToken.expires_at < datetime.utcnow()
+                ).limit(batch_size)))
+                if not ids:
+                    return deleted
+                await self.db.execute(
+                    delete(RefreshToken).where(RefreshToken.id.in_(ids)),
+                    execution_options={"synchronize_session": False},
+                )
+                await self.db.commit()
+            except SQLAlchemyError as e:
+                await self.db.rollback()
+                logger.error(f"Database error purging expired refresh tokens: {e}", exc_info=True)
+                raise DatabaseError("Error purging expired refresh tokens.")
+
+            deleted += len(ids)
+            if len(ids) < batch_size:
+                return deleted
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
         """
         Verifies a plain-text password against a hashed one.
+        Also returns a replacement hash when the stored hash uses an outdated cost.
         """
-        return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
\ No newline at end of file
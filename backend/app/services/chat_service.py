@@ -1,50 +1,124 @@
 import logging
-from typing import Dict
-from sqlalchemy.orm import Session
+from typing import Any, AsyncIterator, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.document import Document
 from app.services.ai_engine import AIEngineService
 from app.services.document_service import DocumentService
+from app.services.analysis_cache_service import compute_content_hash
+from app.services.answer_cache_service import AnswerCacheService
+from app.services.clause_segmenter import clause_label
+from app.services.retrieval_service import RetrievalService
 from app.core.exceptions import DocumentNotFoundError, AIEngineError
+from app.core.metrics import STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+
+def _clause_line(clause) -> str:
+    # "[c4] 6. Limitation of Liability"; locally segmented clauses carry a 1500-char preview that
+    # would otherwise go into every chat prompt.
+    if not isinstance(clause, dict):
+        return str(clause)
+    label = clause_label(clause)
+    return f"[{clause['id']}] {label}" if clause.get("id") else label
+
 class ChatService:
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
         ai_engine_service: AIEngineService,
-        document_service: DocumentService
+        document_service: DocumentService,
+        answer_cache_service: Optional[AnswerCacheService] = None,
+        retrieval_service: Optional[RetrievalService] = None
     ):
         self.db = db
         self.ai_engine_service = ai_engine_service
         self.document_service = document_service
+        self.answer_cache_service = answer_cache_service or AnswerCacheService(db)
+        self.retrieval_service = retrieval_service or RetrievalService(db)
+
+    async def prepare_chat(self, document_id: int, user_id: int, message: str) -> Dict[str, Any]:
+        """
+        Checks document ownership and resolves the cached answer or the LLM context for a question.
+        """
+        with STAGE_SECONDS.time(operation="chat", stage="fetch_doc"):
+            try:
+                document = await self.document_service.get_document_by_id(document_id, user_id)
+            except DocumentNotFoundError:
+                logger.warning(f"Attempt to chat on non-existent or unauthorized document_id={document_id} by user_id={user_id}")
+                raise DocumentNotFoundError("Document not found or user not authorized.")
+
+            content_hash = document.content_hash or compute_content_hash(
+                await self.document_service.get_document_content(document)
+            )
+            cached = await self.answer_cache_service.get(content_hash, message)
+            context = None if cached is not None else await self._build_context(document, message)
+            # End the read transaction so the pooled connection is not held across the LLM call.
+            await self.db.commit()
+
+        return {
+            "document_id": document_id,
+            "content_hash": content_hash,
+            "cached": cached,
+            "context": context,
+        }
 
-    def get_chat_response(self, document_id: int, user_id: int, message: str) -> Dict[str, str]:
+    async def get_chat_response(self, document_id: int, user_id: int, message: str) -> Dict[str, Any]:
         """
         Retrieves a contextual response from the AI for a given document.
+        Repeated questions about the same document content are served from the answer cache.
         """
-        try:
-            document = self.document_service.get_document_by_id(document_id, user_id)
-        except DocumentNotFoundError:
-            logger.warning(f"Attempt to chat on non-existent or unauthorized document_id={document_id} by user_id={user_id}")
-            raise DocumentNotFoundError("Document not found or user not authorized.")
-
-        context_prompt = (
-            f"You are a legal assistant. Your task is to provide concise and accurate answers based on the provided legal document analysis. "
-            f"The document is titled '{document.title}'. Here is the key information:\n\n"
-            f"SUMMARY: {document.summary}\n\n"
-            f"RED FLAGS: {document.red_flags}\n\n"
-            f"CLAUSES: {document.clauses}\n\n"
-            f"Based on this context, answer the user's question: '{message}'"
-        )
+        prepared = await self.prepare_chat(document_id, user_id, message)
+        if prepared["cached"] is not None:
+            return {"response": prepared["cached"], "cached": True}
 
         try:
-            response = self.ai_engine_service.get_ai_response(
-            text=document.content,
-            question=message
-        )
-
-            return {"response": response}
+            with STAGE_SECONDS.time(operation="chat", stage="llm"):
+                response = await self.ai_engine_service.get_ai_response(prepared["context"], message)
         except AIEngineError as e:
             logger.error(f"AI engine service failed for chat query on document {document_id}: {e}")
-            raise AIEngineError("AI chat service is unavailable.")
\ No newline at end of file
+            raise AIEngineError("AI chat service is unavailable.")
+
+        await self.answer_cache_service.put(prepared["content_hash"], message, response)
+        return {"response": response, "cached": False}
+
+    async def stream_chat_response(self, prepared: Dict[str, Any], message: str) -> AsyncIterator[str]:
+        """
+        Yields the answer for a prepared chat as it is generated, caching it once complete.
+        Call prepare_chat first so ownership is checked before any bytes are streamed.
+        """
+        if prepared["cached"] is not None:
+            yield prepared["cached"]
+            return
+
+        parts = []
+        try:
+            with STAGE_SECONDS.time(operation="chat", stage="llm"):
+                async for token in self.ai_engine_service.stream_ai_response(prepared["context"], message):
+                    parts.append(token)
+                    yield token
+        except AIEngineError as e:
+            logger.error(f"AI engine stream failed for chat query on document {prepared['document_id']}: {e}")
+            raise AIEngineError("AI chat service is unavailable.")
+
+        await self.answer_cache_service.put(prepared["content_hash"], message, "".join(parts))
+
+    async def _build_context(self, document: Document, message: str) -> str:
+        """
+        Builds the chat context from the stored analysis plus the document chunks
+        most relevant to the question, instead of the full document text. Clauses are
+        listed by id and label only; their text reaches the prompt through the excerpts.
+        """
+        excerpts = await self.retrieval_service.get_relevant_chunks(document, message)
+        clauses = "\n".join(f"- {_clause_line(clause)}" for clause in document.clauses)
+        red_flags = "\n".join(f"- {flag}" for flag in document.red_flags)
+        sections = "\n\n".join(f"[Excerpt {i}]\n{chunk}" for i, chunk in enumerate(excerpts, start=1))
+
+        # Answers are cached by content hash and shared between owners, so nothing owner-specific,
+        # such as the uploaded file name, goes into the context.
+        return (
+            f"SUMMARY: {document.summary}\n\n"
+            f"CLAUSES:\n{clauses}\n\n"
+            f"RED FLAGS:\n{red_flags}\n\n"
+            f"RELEVANT EXCERPTS:\n{sections}"
+        )
@@ -0,0 +1,173 @@
+import re
+from collections import Counter
+from typing import Tuple
+
+from app.services.prompt_budget import PAGE_NUMBER
+
+# Clause numbers at the start of a line: "ARTICLE IV", "Section 3", "12.", "12.3", "4.1.2".
+# "ARTICLE IV" and "Section 3" may stand alone, taking their title from the next line. Plain
+# numbers need a ".", ":" or ")" or a title after them, so a bare "12", "2025" or "1.5%" never match.
+_HEADING = re.compile(
+    r"^\s*(?:"
+    r"(?P<article>(?:ARTICLE|Article|SECTION|Section)\s+(?:[IVXLCDM]+|\d+(?:\.\d+)*))(?:[.:)]\s*|\s+|$)"
+    r"|(?P<number>\d{1,3}(?:\.\d{1,3}){0,3})(?:[.:)]\s*|\s+(?=\S))"
+    r")(?P<rest>.*)$"
+)
+_NON_SPACE = re.compile(r"\S+")
+# Text after a clause number starts like a title, not like the middle of a sentence ("30 days").
+_TITLE_START = re.compile(r"^(?:$|[A-Z\"'“(])")
+
+# Lines at least this much larger than the body font count as styled headings.
+_HEADING_SIZE_RATIO = 1.08
+_MIN_CLAUSES = 2
+_TITLE_MAX_CHARS = 80
+# Clause content is a preview; `start` and `end` locate the full text in the document body.
+_CONTENT_MAX_CHARS = 1500
+
+
+def _body_font_size(layout_pages: list[list[dict]]) -> float:
+    sizes = Counter()
+    for lines in layout_pages:
+        for line in lines:
+            sizes[round(line["size"], 1)] += len(line["text"])
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def _title(rest: str, next_line: str) -> str:
+    # "2.1 Subscription. Subject to ..." is titled "Subscription"; a bare "ARTICLE IV" takes the next line.
+    title = rest.strip() or next_line.strip()
+    title = title.split(". ", 1)[0].rstrip(" .:")
+    return title if len(title) <= _TITLE_MAX_CHARS else title[:_TITLE_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+def segment_clauses(layout_pages: list[list[dict]], text: str, page_offsets: list[int]) -> list[dict]:
+    """
+    Splits a document into clauses at numbered headings found in its PyMuPDF layout.
+    Headings set in bold or a larger font are used when there are at least two; otherwise
+    every numbered line start is. Each clause has an id ("c1", ...), its number, title,
+    a content preview, its 1-based page and its [start, end) offsets in `text`, the
+    concatenated page texts described by `page_offsets`. Returns an empty list when the
+    document has no recognisable structure.
+    """
+    body_size = _body_font_size(layout_pages)
+    bounds = page_offsets + [len(text)]
+    candidates = []
+
+    for page_number, lines in enumerate(layout_pages):
+        page_start, page_end = bounds[page_number], bounds[page_number + 1]
+        page_text = text[page_start:page_end]
+        cursor = 0
+        for i, line in enumerate(lines):
+            # The plain-text extraction holds the same lines in the same order.
+            position = page_text.find(line["text"], cursor)
+            if position < 0:
+                continue
+            cursor = position + len(line["text"])
+
+            if PAGE_NUMBER.match(line["text"].strip()):
+                continue
+            match = _HEADING.match(line["text"])
+            if match is None or not _TITLE_START.match(match["rest"].strip()):
+                continue
+            next_line = lines[i + 1]["text"] if i + 1 < len(lines) else ""
+            candidates.append({
+                "number": " ".join((match["article"] or match["number"]).split()),
+                "title": _title(match["rest"], next_line),
+                "page": page_number + 1,
+                "start": page_start + position,
+                "heading_end": page_start + cursor,
+                "styled": line["bold"] or line["size"] >= body_size * _HEADING_SIZE_RATIO,
+            })
+
+    styled = [candidate for candidate in candidates if candidate["styled"]]
+    chosen = styled if len(styled) >= _MIN_CLAUSES else candidates
+    if len(chosen) < _MIN_CLAUSES:
+        return []
+
+    clauses = []
+    for i, heading in enumerate(chosen):
+        end = chosen[i + 1]["start"] if i + 1 < len(chosen) else len(text)
+        content = " ".join(text[heading["heading_end"]:end].split())
+        if len(content) > _CONTENT_MAX_CHARS:
+            content = content[:_CONTENT_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+        clauses.append({
+            "id": f"c{i + 1}",
+            "number": heading["number"],
+            "title": heading["title"],
+            "content": content,
+            "page": heading["page"],
+            "start": heading["start"],
+            "end": end,
+        })
+    return clauses
+
+
+def clause_label(clause: dict) -> str:
+    return " ".join(part for part in (clause.get("number"), clause.get("title")) if part)
+
+
+def mark_clauses(text: str, page_offsets: list[int], clauses: list[dict]) -> Tuple[str, list[int]]:
+    """
+    Prefixes each clause heading in `text` with its id marker, e.g. "[c3] 4. Confidentiality",
+    so the model can cite clauses by id. Returns the marked text and its page offsets.
+    """
+    parts, previous = [], 0
+    shifts: list[Tuple[int, int]] = []
+    for clause in clauses:
+        marker = f"[{clause['id']}] "
+        parts.append(text[previous:clause["start"]])
+        parts.append(marker)
+        previous = clause["start"]
+        shifts.append((clause["start"], len(marker)))
+    parts.append(text[previous:])
+
+    # A marker at a page's first character belongs to that page, so it does not shift its start.
+    offsets = [offset + sum(size for start, size in shifts if start < offset) for offset in page_offsets]
+    return "".join(parts), offsets
+
+
+def _positioned(clauses: list) -> list[dict]:
+    return [clause for clause in clauses if isinstance(clause, dict) and "start" in clause]
+
+
+def to_content_positions(text: str, clauses: list) -> list:
+    """
+    Returns the clauses with `start` and `end` counted in non-whitespace characters of `text`
+    instead of raw offsets. Cached analyses are shared by every copy with the same content hash,
+    which ignores whitespace, so only these positions hold for all of them.
+    """
+    offsets = sorted({clause[key] for clause in _positioned(clauses) for key in ("start", "end")})
+    positions, count, previous = {}, 0, 0
+    for offset in offsets:
+        count += sum(len(word) for word in text[previous:offset].split())
+        positions[offset] = count
+        previous = offset
+    return [
+        {**clause, "start": positions[clause["start"]], "end": positions[clause["end"]]}
+        if isinstance(clause, dict) and "start" in clause else clause
+        for clause in clauses
+    ]
+
+
+def from_content_positions(text: str, clauses: list) -> list:
+    """
+    Maps positions from to_content_positions back to offsets in `text`, which may differ
+    from the text they were computed on in whitespace only.
+    """
+    targets = sorted({clause[key] for clause in _positioned(clauses) for key in ("start", "end")})
+    offsets, count, pending = {}, 0, 0
+    for match in _NON_SPACE.finditer(text):
+        if pending == len(targets):
+            break
+        length = match.end() - match.start()
+        while pending < len(targets) and targets[pending] < count + length:
+            offsets[targets[pending]] = match.start() + targets[pending] - count
+            pending += 1
+        count += length
+    for target in targets[pending:]:
+        offsets[target] = len(text)
+    return [
+        {**clause, "start": offsets[clause["start"]], "end": offsets[clause["end"]]}
+        if isinstance(clause, dict) and "start" in clause else clause
+        for clause in clauses
+    ]
@@ -0,0 +1,78 @@
+import logging
+import zlib
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.models.document import Document
+from app.models.document_content import DocumentContent
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available.
+    zstandard = None
+
+ENCODING_IDENTITY = "identity"
+ENCODING_ZLIB = "zlib"
+ENCODING_ZSTD = "zstd"
+
+
+def compress_text(text: str) -> Tuple[str, bytes]:
+    """
+    Encodes document text with the configured DOCUMENT_CONTENT_COMPRESSION codec.
+    Falls back to zlib when zstd is configured but the zstandard package is missing.
+    """
+    raw = text.encode("utf-8")
+    codec = settings.DOCUMENT_CONTENT_COMPRESSION
+
+    if codec == ENCODING_ZSTD:
+        if zstandard is not None:
+            return ENCODING_ZSTD, zstandard.ZstdCompressor(level=settings.DOCUMENT_CONTENT_COMPRESSION_LEVEL).compress(raw)
+        logger.warning("zstd compression requested but zstandard is not installed; using zlib.")
+        codec = ENCODING_ZLIB
+
+    if codec == ENCODING_ZLIB:
+        return ENCODING_ZLIB, zlib.compress(raw, settings.DOCUMENT_CONTENT_COMPRESSION_LEVEL)
+
+    return ENCODING_IDENTITY, raw
+
+
+def decompress_text(encoding: str, data: bytes) -> str:
+    """
+    Decodes bytes produced by compress_text.
+    """
+    if encoding == ENCODING_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed document content.")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif encoding == ENCODING_ZLIB:
+        raw = zlib.decompress(data)
+    else:
+        raw = data
+    return raw.decode("utf-8")
+
+
+def build_document_content(text: str) -> DocumentContent:
+    """
+    Builds the compressed body row for a document's extracted text.
+    """
+    encoding, data = compress_text(text)
+    return DocumentContent(encoding=encoding, data=data, original_size=len(text))
+
+
+def decode_document_content(body: Optional[DocumentContent]) -> str:
+    """
+    Decodes a document's body row; documents without one have no text.
+    """
+    if body is None:
+        return ""
+    return decompress_text(body.encoding, body.data)
+
+
+def load_document_text(document: Document) -> str:
+    """
+    Loads and decompresses a document's text. The body row is only fetched on this call.
+    Sync sessions only; async callers fetch the DocumentContent row explicitly.
+    """
+    return decode_document_content(document.body)
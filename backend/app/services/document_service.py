@@ -1,82 +1,206 @@
+import base64
+import io
 import json
 import logging
-from typing import Generator
+import os
+from datetime import datetime
+from typing import Optional, Tuple
 from fastapi import UploadFile
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
+from app.config import settings
 from app.models.document import Document
-from app.services.pdf_parser import PDFParserService
+from app.models.document_content import DocumentContent
+from app.services.pdf_parser import PDFParserService, PDFSource
 from app.services.ai_engine import AIEngineService
+from app.services.analysis_cache_service import AnalysisCacheService, compute_content_hash
+from app.services.answer_cache_service import AnswerCacheService
+from app.services.retrieval_service import build_document_index
+from app.services.document_content import build_document_content, decode_document_content
+from app.services.search_service import AsyncSearchService
+from app.services.prompt_budget import compact_document
+from app.services.clause_segmenter import (
+    from_content_positions,
+    mark_clauses,
+    segment_clauses,
+    to_content_positions,
+)
 from app.core.exceptions import (
     PDFParseError,
     AIEngineError,
     DocumentNotFoundError,
     DatabaseError,
     UnsupportedFileTypeError,
+    InvalidCursorError,
 )
+from app.core.metrics import STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+
+def encode_cursor(created_at: datetime, doc_id: int) -> str:
+    """
+    Encodes the sort key of the last listed document as an opaque URL-safe cursor.
+    """
+    raw = json.dumps({"created_at": created_at.isoformat(), "id": doc_id})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodes a cursor produced by encode_cursor.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["created_at"]), int(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor.") from e
+
+
 class DocumentService:
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
         pdf_parser_service: PDFParserService,
         ai_engine_service: AIEngineService,
+        analysis_cache_service: Optional[AnalysisCacheService] = None,
+        answer_cache_service: Optional[AnswerCacheService] = None,
+        search_service: Optional[AsyncSearchService] = None,
     ):
         self.db = db
         self.pdf_parser_service = pdf_parser_service
         self.ai_engine_service = ai_engine_service
+        self.analysis_cache_service = analysis_cache_service or AnalysisCacheService(db)
+        self.answer_cache_service = answer_cache_service or AnswerCacheService(db)
+        self.search_service = search_service or AsyncSearchService(db)
 
-    def create_document(self, file: UploadFile, user_id: int) -> Document:
+    async def create_document(self, file: UploadFile, user_id: int) -> Document:
         """
         Processes a file, analyzes its content, and creates a new document.
         """
         if file.content_type != "application/pdf":
             raise UnsupportedFileTypeError("Only PDFs are supported.")
 
+        return await self.create_document_from_pdf(file.file, file.filename, user_id)
+
+    def _extract_pages(self, pdf_source: PDFSource) -> Tuple[str, list[int]]:
+        """
+        Extracts a PDF's text and the start offset of each page. Blocking; run on a worker thread.
+        Page texts are appended to a single buffer as they are extracted, so the text is held once
+        alongside the page start offsets rather than as a page list plus a joined copy.
+        """
+        if not isinstance(pdf_source, (str, os.PathLike)):
+            pdf_source.seek(0)
+        buffer = io.StringIO()
+        page_offsets: list[int] = []
+        offset = 0
+        for page_text in self.pdf_parser_service.extract_text(pdf_source):
+            page_offsets.append(offset)
+            buffer.write(page_text)
+            offset += len(page_text)
+        file_content = buffer.getvalue()
+        buffer.close()
+        return file_content, page_offsets
+
+    def _prepare_prompt_text(self, pdf_source: PDFSource, file_content: str, page_offsets: list[int]) -> dict:
+        """
+        Segments clauses from the PDF layout, marks them in the text and compacts the result for
+        the LLM. Returns compact_document's result plus the clauses. Blocking; run on a worker thread.
+        """
+        clauses = []
+        if settings.CLAUSE_SEGMENTATION_ENABLED:
+            if not isinstance(pdf_source, (str, os.PathLike)):
+                pdf_source.seek(0)
+            # The layout is only needed for segmentation; it is freed before the text is marked and compacted.
+            clauses = segment_clauses(list(self.pdf_parser_service.extract_layout(pdf_source)), file_content, page_offsets)
+        if clauses:
+            file_content, page_offsets = mark_clauses(file_content, page_offsets, clauses)
+        return {**compact_document(file_content, page_offsets), "clauses": clauses}
+
+    async def create_document_from_pdf(self, pdf_source: PDFSource, filename: str, user_id: int) -> Document:
+        """
+        Runs the parse, analyze and persist pipeline for an already validated PDF path or file object.
+        Parsing, hashing, compression and chunk indexing are CPU-bound and run on the threadpool;
+        the LLM call and database writes are awaited on the event loop.
+        """
         try:
-            file.file.seek(0)
-            text_generator: Generator[str, None, None] = self.pdf_parser_service.extract_text(file.file)
-            file_content = "".join(text_generator)
+            with STAGE_SECONDS.time(operation="upload", stage="extract"):
+                file_content, page_offsets = await run_in_threadpool(self._extract_pages, pdf_source)
         except PDFParseError as e:
             logger.error(f"Error extracting text from PDF: {e}")
             raise e
-        
-        try:
-            analysis = self.ai_engine_service.analyze_text_with_ai(file_content)
-        except AIEngineError as e:
-            logger.error(f"AI engine service unavailable: {e}")
-            raise e
-        
-        document = Document(
-            title=file.filename,
-            content=file_content,
-            summary=analysis.get("summary"),
-            red_flags=analysis.get("red_flags", []),
-            clauses=analysis.get("clauses", []),
-            user_id=user_id,
-        )
 
-        try:
-            self.db.add(document)
-            self.db.commit()
-            self.db.refresh(document)
-            return document
-        except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error(f"Database error creating document for user {user_id}: {e}")
-            raise DatabaseError("Error saving the document.")
+        with STAGE_SECONDS.time(operation="upload", stage="analyze"):
+            content_hash = await run_in_threadpool(compute_content_hash, file_content)
+            analysis = await self.analysis_cache_service.get(content_hash)
+
+            if analysis is not None:
+                # Cached clause positions ignore whitespace, like the hash; map them onto this copy of the text.
+                analysis["clauses"] = await run_in_threadpool(
+                    from_content_positions, file_content, analysis.get("clauses") or []
+                )
+            else:
+                # End the cache lookup's transaction so the pooled connection is not held across the LLM call.
+                await self.db.commit()
+                compacted = await run_in_threadpool(
+                    self._prepare_prompt_text, pdf_source, file_content, page_offsets
+                )
+                logger.info(
+                    f"Prompt compaction for {filename}: {compacted['tokens_before']} -> "
+                    f"{compacted['tokens_after']} tokens "
+                    f"({compacted['tokens_before'] - compacted['tokens_after']} saved), "
+                    f"{len(compacted['clauses'])} clauses segmented locally."
+                )
+                try:
+                    analysis = await self.ai_engine_service.analyze_pages(
+                        compacted["text"], compacted["page_offsets"], compacted["tokens_after"], compacted["clauses"]
+                    )
+                except AIEngineError as e:
+                    logger.error(f"AI engine service unavailable: {e}")
+                    raise e
+                cached_clauses = await run_in_threadpool(
+                    to_content_positions, file_content, analysis.get("clauses") or []
+                )
+                await self.analysis_cache_service.put(content_hash, {**analysis, "clauses": cached_clauses})
+
+        with STAGE_SECONDS.time(operation="upload", stage="persist"):
+            document = Document(
+                title=filename,
+                content_hash=content_hash,
+                summary=analysis.get("summary"),
+                red_flags=analysis.get("red_flags", []),
+                clauses=analysis.get("clauses", []),
+                user_id=user_id,
+            )
+            document.body, document.chunk_index = await run_in_threadpool(
+                lambda: (build_document_content(file_content), build_document_index(document, file_content))
+            )
 
-    def get_document_by_id(self, doc_id: int, user_id: int) -> Document:
+            try:
+                self.db.add(document)
+                await self.db.flush()
+                await self.search_service.index_document(document, file_content)
+                await self.db.commit()
+                await self.db.refresh(document)
+                return document
+            except SQLAlchemyError as e:
+                await self.db.rollback()
+                logger.error(f"Database error creating document for user {user_id}: {e}")
+                raise DatabaseError("Error saving the document.")
+
+    async def get_document_by_id(self, doc_id: int, user_id: int) -> Document:
         """
         Retrieves a document by its ID and ensures it belongs to the user.
         """
         try:
-            document = self.db.query(Document).filter(
+            document = await self.db.scalar(select(Document).where(
                 Document.id == doc_id,
                 Document.user_id == user_id,
-            ).first()
+            ).limit(1))
         except SQLAlchemyError as e:
             logger.error(f"Database error fetching document {doc_id} for user {user_id}: {e}")
             raise DatabaseError("Error fetching document.")
@@ -86,26 +210,100 @@ class DocumentService:
 
         return document
 
-    def list_documents_for_user(self, user_id: int) -> list[Document]:
+    async def get_document_content_hash(self, doc_id: int, user_id: int) -> Optional[str]:
         """
-        Lists all documents for a given user.
+        Returns only the content hash of a user's document, for cheap ETag checks.
         """
         try:
-            documents = self.db.query(Document).filter(Document.user_id == user_id).all()
-            return documents
+            row = (await self.db.execute(select(Document.content_hash).where(
+                Document.id == doc_id,
+                Document.user_id == user_id,
+            ).limit(1))).first()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error fetching content hash of document {doc_id} for user {user_id}: {e}")
+            raise DatabaseError("Error fetching document.")
+
+        if not row:
+            raise DocumentNotFoundError("Document not found.")
+
+        return row.content_hash
+
+    async def get_document_content(self, document: Document) -> str:
+        """
+        Loads and decompresses the full text of a document.
+        """
+        try:
+            body = await self.db.get(DocumentContent, document.id)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error loading content for document {document.id}: {e}")
+            raise DatabaseError("Error fetching document content.")
+        return decode_document_content(body)
+
+    async def list_documents_for_user(
+        self,
+        user_id: int,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order: str = "desc",
+    ) -> Tuple[list[Row], Optional[str]]:
+        """
+        Lists one page of a user's documents ordered by (created_at, id), using keyset
+        pagination on the (user_id, created_at, id) index. Only the listed columns are
+        selected, never the document text or analysis JSON.
+        Returns the rows and the cursor for the next page, or None on the last page.
+        """
+        query = select(
+            Document.id,
+            Document.title,
+            Document.summary,
+            Document.created_at,
+        ).where(Document.user_id == user_id)
+
+        if cursor:
+            created_at, doc_id = decode_cursor(cursor)
+            if order == "asc":
+                query = query.where(or_(
+                    Document.created_at > created_at,
+                    and_(Document.created_at == created_at, Document.id > doc_id),
+                ))
+            else:
+                query = query.where(or_(
+                    Document.created_at < created_at,
+                    and_(Document.created_at == created_at, Document.id < doc_id),
+                ))
+
+        if order == "asc":
+            query = query.order_by(Document.created_at.asc(), Document.id.asc())
+        else:
+            query = query.order_by(Document.created_at.desc(), Document.id.desc())
+
+        try:
+            rows = (await self.db.execute(query.limit(limit + 1))).all()
         except SQLAlchemyError as e:
             logger.error(f"Database error listing documents for user {user_id}: {e}")
             raise DatabaseError("Error listing documents.")
 
-    def delete_document(self, doc_id: int, user_id: int) -> None:
+        if len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    async def delete_document(self, doc_id: int, user_id: int) -> None:
         """
-        Deletes a document by its ID, ensuring it belongs to the user.
+        Deletes a document by its ID, ensuring it belongs to the user,
+        and drops any cached chat answers for its content.
         """
         try:
-            document = self.get_document_by_id(doc_id, user_id)
-            self.db.delete(document)
-            self.db.commit()
+            document = await self.get_document_by_id(doc_id, user_id)
+            content_hash = document.content_hash
+            await self.search_service.remove_document(document.id)
+            await self.db.delete(document)
+            await self.db.commit()
         except SQLAlchemyError as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error(f"Database error deleting document {doc_id} for user {user_id}: {e}")
-            raise DatabaseError("Error deleting document.")
\ No newline at end of file
+            raise DatabaseError("Error deleting document.")
+
+        if content_hash:
+            await self.answer_cache_service.invalidate(content_hash)
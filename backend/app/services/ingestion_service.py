@@ -0,0 +1,184 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.ingestion_job import IngestionJob, IngestionJobStatus
+from app.core.exceptions import (
+    DatabaseError,
+    FileTooLargeError,
+    IngestionJobNotFoundError,
+    UnsupportedFileTypeError,
+)
+
+logger = logging.getLogger(__name__)
+
+_COPY_CHUNK_BYTES = 1024 * 1024
+
+
+class IngestionService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_job(self, file: UploadFile, user_id: int) -> IngestionJob:
+        """
+        Validates an upload, spools it to INGESTION_UPLOAD_DIR and records a queued job for it.
+        The upload is copied in fixed-size blocks on the threadpool, so memory stays bounded
+        regardless of file size and the event loop never waits on disk.
+        """
+        if file.content_type != "application/pdf":
+            raise UnsupportedFileTypeError("Only PDFs are supported.")
+
+        job = IngestionJob(user_id=user_id, filename=file.filename, file_path="")
+        job.file_path = os.path.join(settings.INGESTION_UPLOAD_DIR, f"{job.id}.pdf")
+
+        os.makedirs(settings.INGESTION_UPLOAD_DIR, exist_ok=True)
+        await run_in_threadpool(self._spool_upload, file, job.file_path)
+
+        try:
+            self.db.add(job)
+            await self.db.commit()
+            await self.db.refresh(job)
+            return job
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            os.remove(job.file_path)
+            logger.error(f"Database error creating ingestion job for user {user_id}: {e}")
+            raise DatabaseError("Error creating ingestion job.")
+
+    def _spool_upload(self, file: UploadFile, path: str) -> None:
+        """
+        Copies an upload to disk, rejecting it once it exceeds MAX_UPLOAD_BYTES.
+        """
+        written = 0
+        file.file.seek(0)
+        try:
+            with open(path, "wb") as target:
+                while block := file.file.read(_COPY_CHUNK_BYTES):
+                    written += len(block)
+                    if written > settings.MAX_UPLOAD_BYTES:
+                        raise FileTooLargeError(
+                            f"File exceeds the {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB upload limit."
+                        )
+                    target.write(block)
+        except BaseException:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+    async def get_job(self, job_id: str, user_id: int) -> IngestionJob:
+        """
+        Retrieves an ingestion job and ensures it belongs to the user.
+        """
+        try:
+            job = await self.db.scalar(select(IngestionJob).where(
+                IngestionJob.id == job_id,
+                IngestionJob.user_id == user_id,
+            ).limit(1))
+        except SQLAlchemyError as e:
+            logger.error(f"Database error fetching ingestion job {job_id}: {e}")
+            raise DatabaseError("Error fetching ingestion job.")
+
+        if not job:
+            raise IngestionJobNotFoundError("Ingestion job not found.")
+
+        return job
+
+    async def list_pending_jobs(self) -> list[tuple[str, int]]:
+        """
+        Returns (job id, user id) for queued jobs, oldest first, after requeueing running jobs
+        whose heartbeat is older than INGESTION_LEASE_SECONDS. Used on startup so jobs interrupted
+        by a restart are picked up again; jobs another live process is running keep their lease.
+        """
+        now = datetime.utcnow()
+        try:
+            await self.db.execute(
+                update(IngestionJob)
+                .where(
+                    IngestionJob.status == IngestionJobStatus.RUNNING,
+                    IngestionJob.updated_at < now - timedelta(seconds=settings.INGESTION_LEASE_SECONDS),
+                )
+                .values(status=IngestionJobStatus.QUEUED, updated_at=now),
+                execution_options={"synchronize_session": False},
+            )
+            await self.db.commit()
+            rows = await self.db.execute(
+                select(IngestionJob.id, IngestionJob.user_id)
+                .where(IngestionJob.status == IngestionJobStatus.QUEUED)
+                .order_by(IngestionJob.created_at.asc())
+            )
+            return [(job_id, user_id) for job_id, user_id in rows]
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Database error listing pending ingestion jobs: {e}")
+            raise DatabaseError("Error listing pending ingestion jobs.")
+
+    async def claim_job(self, job_id: str) -> bool:
+        """
+        Moves a queued job to running. Returns False when it is not queued any more, because
+        another worker or process claimed it first; the conditional update makes the claim atomic.
+        """
+        try:
+            result = await self.db.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, IngestionJob.status == IngestionJobStatus.QUEUED)
+                .values(status=IngestionJobStatus.RUNNING, updated_at=datetime.utcnow()),
+                execution_options={"synchronize_session": False},
+            )
+            await self.db.commit()
+            return result.rowcount == 1
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Database error claiming ingestion job {job_id}: {e}")
+            raise DatabaseError("Error claiming ingestion job.")
+
+    async def heartbeat_job(self, job_id: str) -> None:
+        """
+        Renews a running job's lease by refreshing its updated_at.
+        """
+        try:
+            await self.db.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, IngestionJob.status == IngestionJobStatus.RUNNING)
+                .values(updated_at=datetime.utcnow()),
+                execution_options={"synchronize_session": False},
+            )
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Database error renewing ingestion job {job_id}: {e}")
+            raise DatabaseError("Error renewing ingestion job.")
+
+    async def mark_job(
+        self,
+        job: IngestionJob,
+        status: IngestionJobStatus,
+        document_id: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Records a job state transition, dropping the spooled upload once the job is finished.
+        """
+        job.status = status
+        job.document_id = document_id
+        job.error = error
+        job.updated_at = datetime.utcnow()
+
+        job_id, file_path = job.id, job.file_path
+        try:
+            self.db.add(job)
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Database error updating ingestion job {job_id}: {e}")
+            raise DatabaseError("Error updating ingestion job.")
+
+        if status in (IngestionJobStatus.DONE, IngestionJobStatus.FAILED) and os.path.exists(file_path):
+            os.remove(file_path)
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+from collections import Counter, OrderedDict, deque
+from typing import Optional
+
+from app.config import settings
+from app.db.session import session_factory
+from app.models.ingestion_job import IngestionJob, IngestionJobStatus
+from app.services.ai_engine import AIEngineService
+from app.services.document_service import DocumentService
+from app.services.ingestion_service import IngestionService
+from app.services.pdf_parser import PDFParserService
+from app.core.exceptions import (
+    AIEngineError,
+    DatabaseError,
+    IngestionQueueFullError,
+    PDFParseError,
+)
+from app.core.metrics import record_error
+
+logger = logging.getLogger(__name__)
+
+
+async def _heartbeat(job_id: str) -> None:
+    """
+    Renews a running job's lease every INGESTION_HEARTBEAT_SECONDS, on a session of its own.
+    """
+    while True:
+        await asyncio.sleep(settings.INGESTION_HEARTBEAT_SECONDS)
+        try:
+            async with session_factory() as db:
+                await IngestionService(db).heartbeat_job(job_id)
+        except DatabaseError as e:
+            logger.warning(f"Heartbeat for ingestion job {job_id} failed: {e}")
+
+
+async def process_job(job_id: str) -> None:
+    """
+    Claims a queued job and runs parse, analyze and persist for it, recording its outcome.
+    Jobs another worker or process has claimed are skipped.
+    """
+    async with session_factory() as db:
+        ingestion_service = IngestionService(db)
+        if not await ingestion_service.claim_job(job_id):
+            return
+        job = await db.get(IngestionJob, job_id)
+        document_service = DocumentService(db, PDFParserService(), AIEngineService())
+
+        heartbeat = asyncio.create_task(_heartbeat(job_id))
+        try:
+            document = await document_service.create_document_from_pdf(job.file_path, job.filename, job.user_id)
+        except (PDFParseError, AIEngineError, DatabaseError) as e:
+            record_error(e)
+            error = str(e)
+        except Exception as e:
+            record_error(e)
+            logger.error(f"Unexpected error processing ingestion job {job_id}: {e}", exc_info=True)
+            error = "An unexpected error occurred."
+        else:
+            await ingestion_service.mark_job(job, IngestionJobStatus.DONE, document_id=document.id)
+            return
+        finally:
+            heartbeat.cancel()
+
+        # A failed save leaves the job expired, and it cannot lazily reload under asyncio.
+        await db.rollback()
+        job = await db.get(IngestionJob, job_id)
+        await ingestion_service.mark_job(job, IngestionJobStatus.FAILED, error=error)
+
+
+class IngestionWorkerPool:
+    """
+    Fixed-size pool of event-loop workers draining a bounded in-process job queue.
+    Jobs are queued per user and picked round-robin, with at most `per_user` jobs of one
+    user in flight, so a large batch from one user cannot starve everyone else.
+    Jobs run on the event loop; DocumentService moves parsing and other CPU-bound steps
+    to the threadpool so they never block it.
+    """
+
+    def __init__(self, workers: int, max_queue: int, per_user: int):
+        self._workers = workers
+        self._max_queue = max_queue
+        self._per_user = per_user
+        self._pending: "OrderedDict[int, deque[str]]" = OrderedDict()
+        self._running: Counter = Counter()
+        self._size = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """
+        Starts the workers and enqueues queued jobs, including running jobs whose lease expired
+        because the process running them stopped. Claims are atomic, so several processes
+        enqueueing the same job run it once.
+        """
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+        async with session_factory() as db:
+            pending_jobs = await IngestionService(db).list_pending_jobs()
+
+        for job_id, user_id in pending_jobs:
+            self._enqueue(job_id, user_id)
+
+    async def stop(self) -> None:
+        """
+        Cancels the workers. Unfinished jobs stay persisted and resume on next start.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def has_capacity(self, count: int = 1) -> bool:
+        return self._wakeup is not None and self._size + count <= self._max_queue
+
+    def submit(self, job_id: str, user_id: int) -> None:
+        """
+        Enqueues a persisted job. Must be called from the event loop.
+        """
+        if not self.has_capacity():
+            raise IngestionQueueFullError("The ingestion queue is full. Please retry later.")
+        self._enqueue(job_id, user_id)
+
+    def _enqueue(self, job_id: str, user_id: int) -> None:
+        self._pending.setdefault(user_id, deque()).append(job_id)
+        self._size += 1
+        self._wakeup.set()
+
+    def _next_job(self) -> Optional[tuple[str, int]]:
+        """
+        Pops the next job from the first user, in round-robin order, who is under the per-user limit.
+        """
+        for user_id, jobs in self._pending.items():
+            if self._running[user_id] < self._per_user:
+                job_id = jobs.popleft()
+                if jobs:
+                    self._pending.move_to_end(user_id)
+                else:
+                    del self._pending[user_id]
+                self._size -= 1
+                return job_id, user_id
+        return None
+
+    async def _worker(self) -> None:
+        while True:
+            item = self._next_job()
+            if item is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            job_id, user_id = item
+            self._running[user_id] += 1
+            try:
+                await process_job(job_id)
+            except Exception as e:
+                logger.error(f"Ingestion worker failed on job {job_id}: {e}", exc_info=True)
+            finally:
+                self._running[user_id] -= 1
+                if not self._running[user_id]:
+                    del self._running[user_id]
+                self._wakeup.set()
+
+
+ingestion_pool = IngestionWorkerPool(
+    workers=settings.INGESTION_WORKERS,
+    max_queue=settings.INGESTION_MAX_QUEUE,
+    per_user=settings.INGESTION_PER_USER_CONCURRENCY,
+)
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.core.exceptions import PasswordHasherBusyError
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def crypt_context(rounds: int) -> CryptContext:
+    """
+    Returns a bcrypt context that hashes at `rounds` and flags any other cost as needing an update.
+    """
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+def _hash_password(password: str, rounds: int) -> str:
+    """
+    Worker entry point: hashes a password at the given bcrypt cost.
+    """
+    return crypt_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    """
+    Worker entry point: verifies a password and, if its hash uses another cost, returns a new hash.
+    """
+    return crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small dedicated process pool so hashing never occupies the request
+    threadpool or the GIL. At most `max_pending` operations may be queued or running;
+    beyond that calls fail fast with PasswordHasherBusyError instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self._workers = workers
+        self._max_pending = max_pending
+        self.rounds = rounds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.stats: Dict[str, int] = {"completed": 0, "rejected": 0}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Spawned rather than forked so workers never inherit server threads or sockets.
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def ensure_capacity(self) -> None:
+        """
+        Raises PasswordHasherBusyError if the queue is full, so callers can reject a request
+        before doing any other work for it.
+        """
+        with self._lock:
+            self._reject_if_full()
+
+    def _reject_if_full(self) -> None:
+        if self._pending >= self._max_pending:
+            self.stats["rejected"] += 1
+            raise PasswordHasherBusyError("Too many sign-in attempts in progress. Please retry shortly.")
+
+    def _submit(self, fn, *args) -> Future:
+        pool = self._get_pool()
+        with self._lock:
+            self._reject_if_full()
+            self._pending += 1
+
+        try:
+            future = pool.submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.stats["completed"] += 1
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash_password, password, self.rounds))
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifies a password. The second item is a replacement hash when the stored one was
+        made with a different cost, and None otherwise.
+        """
+        return await asyncio.wrap_future(
+            self._submit(_verify_and_update, password, hashed_password, self.rounds)
+        )
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "pending": self._pending}
+
+    def shutdown(self) -> None:
+        """
+        Stops the hashing workers. Called from the FastAPI lifespan.
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
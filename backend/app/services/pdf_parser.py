@@ -1,25 +1,147 @@
+import os
 import fitz
 import logging
-from typing import Generator
-from io import BytesIO
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Callable, Generator, Optional, Union
+from app.config import settings
 from app.core.exceptions import PDFParseError
 
 logger = logging.getLogger(__name__)
 
+PDFSource = Union[str, os.PathLike, BinaryIO]
+
+# Text, fonts and positions only; decoding embedded images would dominate layout extraction.
+_LAYOUT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+# Extraction runs on threadpool threads, so concurrent first uploads must not each create a pool.
+_extraction_pool_lock = threading.Lock()
+
+
+def _page_layout(page: fitz.Page) -> list[dict]:
+    lines = []
+    for block in page.get_text("dict", flags=_LAYOUT_FLAGS)["blocks"]:
+        for line in block.get("lines", []):
+            spans = [span for span in line["spans"] if span["text"].strip()]
+            if not spans:
+                continue
+            lines.append({
+                "text": "".join(span["text"] for span in line["spans"]),
+                "size": spans[0]["size"],
+                "bold": bool(spans[0]["flags"] & fitz.TEXT_FONT_BOLD) or "bold" in spans[0]["font"].lower(),
+            })
+    return lines
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    """
+    Worker entry point: opens the PDF in the child process and extracts pages [start, stop).
+    """
+    with fitz.open(path, filetype="pdf") as doc:
+        return [doc[number].get_text() for number in range(start, stop)]
+
+
+def _extract_layout_range(path: str, start: int, stop: int) -> list[list[dict]]:
+    """
+    Worker entry point: opens the PDF in the child process and extracts the layout of pages [start, stop).
+    """
+    with fitz.open(path, filetype="pdf") as doc:
+        return [_page_layout(doc[number]) for number in range(start, stop)]
+
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """
+    Returns the shared extraction process pool, creating it on first use.
+    Workers are spawned rather than forked so they never inherit server threads or sockets.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _extraction_pool
+
+
+def shutdown_extraction_pool() -> None:
+    """
+    Stops the extraction workers. Called from the FastAPI lifespan.
+    """
+    global _extraction_pool
+    with _extraction_pool_lock:
+        pool, _extraction_pool = _extraction_pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
 class PDFParserService:
-    def extract_text(self, pdf_file) -> Generator[str, None, None]:
+    def extract_text(self, pdf_source: PDFSource) -> Generator[str, None, None]:
         """
         Extracts text from each page of a PDF file.
         Yields a string for each page.
+        Paths are opened directly so PyMuPDF reads pages from disk on demand;
+        file objects are read once and handed over without an extra copy.
+        Paths with at least PDF_PARALLEL_MIN_PAGES pages are extracted across the process pool.
         """
         try:
-            pdf_bytes = pdf_file.read()
-            pdf_stream = BytesIO(pdf_bytes)
-
-            with fitz.open(stream=pdf_stream, filetype="pdf") as doc:
+            with self._open(pdf_source) as doc:
+                if self._use_parallel(pdf_source, doc.page_count):
+                    yield from self._extract_parallel(_extract_page_range, os.fspath(pdf_source), doc.page_count)
+                    return
                 for page in doc:
                     text = page.get_text()
                     yield text
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}", exc_info=True)
-            raise PDFParseError("Could not extract text from PDF. The file may be corrupted or unreadable.")
\ No newline at end of file
+            raise PDFParseError("Could not extract text from PDF. The file may be corrupted or unreadable.")
+
+    def extract_layout(self, pdf_source: PDFSource) -> Generator[list[dict], None, None]:
+        """
+        Yields each page's text lines, in reading order, with the font size and boldness of
+        their first span, from `page.get_text("dict")`. Used for clause segmentation.
+        This is the most expensive parse, so large PDFs are spread across the process pool
+        on the same terms as extract_text.
+        """
+        try:
+            with self._open(pdf_source) as doc:
+                if self._use_parallel(pdf_source, doc.page_count):
+                    yield from self._extract_parallel(_extract_layout_range, os.fspath(pdf_source), doc.page_count)
+                    return
+                for page in doc:
+                    yield _page_layout(page)
+        except Exception as e:
+            logger.error(f"Error extracting layout from PDF: {e}", exc_info=True)
+            raise PDFParseError("Could not extract text from PDF. The file may be corrupted or unreadable.")
+
+    def _open(self, pdf_source: PDFSource) -> fitz.Document:
+        if isinstance(pdf_source, (str, os.PathLike)):
+            return fitz.open(pdf_source, filetype="pdf")
+        return fitz.open(stream=pdf_source.read(), filetype="pdf")
+
+    def _use_parallel(self, pdf_source: PDFSource, page_count: int) -> bool:
+        return (
+            isinstance(pdf_source, (str, os.PathLike))
+            and settings.PDF_EXTRACT_WORKERS > 1
+            and page_count >= settings.PDF_PARALLEL_MIN_PAGES
+        )
+
+    def _extract_parallel(self, worker: Callable[[str, int, int], list], path: str, page_count: int) -> Generator:
+        """
+        Splits the page range into PDF_PAGES_PER_TASK slices, runs `worker` on them in worker
+        processes and yields pages in document order as each slice completes.
+        """
+        pool = get_extraction_pool()
+        step = settings.PDF_PAGES_PER_TASK
+        futures = [
+            pool.submit(worker, path, start, min(start + step, page_count))
+            for start in range(0, page_count, step)
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
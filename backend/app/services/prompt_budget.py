@@ -0,0 +1,164 @@
+import logging
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.metrics import PROMPT_COMPACTION_TOKENS, PROMPT_TRUNCATED_TOKENS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; the character ratio is used without it.
+    tiktoken = None
+
+# Rough characters-per-token ratio for English legal text, used when no tokenizer is available.
+CHARS_PER_TOKEN = 4
+
+TRUNCATE_HEAD = "head"
+TRUNCATE_HEAD_TAIL = "head_tail"
+
+# Under head_tail, the share of the budget kept from the start; the rest comes from the end,
+# where governing law, termination and signature terms usually sit.
+_HEAD_SHARE = 0.75
+
+# Lines this close to the top or bottom of a page are header and footer candidates. One counts
+# as boilerplate when it recurs on at least this share of pages, in documents of _BOILERPLATE_MIN_PAGES or more.
+_EDGE_LINES = 3
+_BOILERPLATE_PAGE_SHARE = 0.5
+_BOILERPLATE_MIN_PAGES = 3
+
+_HYPHEN_BREAK = re.compile(r"(?<=[a-z])-\n(?=[a-z])")
+_SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_DIGITS = re.compile(r"\d+")
+# Clause id markers added by clause_segmenter.mark_clauses. A marked line is a clause heading; numbered
+# headings at the top of every page would otherwise look like a running header once digits are masked.
+_CLAUSE_MARKER = re.compile(r"^\[c\d+\] ")
+# A line holding only a page number: "7", "- 7 -", "Page 7 of 12", "7/12". Shared with the clause segmenter.
+PAGE_NUMBER = re.compile(r"^(?:page\s*)?[-–—]?\s*\d+\s*(?:(?:of|/)\s*\d+)?\s*[-–—]?$", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(settings.LLM_TOKENIZER_ENCODING)
+    except Exception as e:
+        # Encodings are downloaded on first use, which fails on machines without network access
+        # unless TIKTOKEN_CACHE_DIR points at a copied cache.
+        logger.warning(
+            f"Tokenizer {settings.LLM_TOKENIZER_ENCODING} unavailable, estimating from length; "
+            f"set TIKTOKEN_CACHE_DIR to a copy of the tiktoken cache on offline hosts: {e}"
+        )
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Counts tokens with the local tokenizer when tiktoken is installed, else estimates from length.
+    """
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def prompt_token_budget(model: str) -> int:
+    """
+    Returns how many tokens of document text one prompt to `model` may carry.
+    """
+    return settings.LLM_PROMPT_TOKEN_BUDGETS.get(model, settings.LLM_PROMPT_TOKEN_BUDGET)
+
+
+def fit_to_budget(text: str, max_tokens: int, policy: Optional[str] = None) -> Tuple[str, int]:
+    """
+    Truncates text to about max_tokens according to LLM_PROMPT_TRUNCATION: `head` keeps the
+    beginning, `head_tail` keeps the beginning and the end. The cut is marked in the text so the
+    model knows content is missing. Returns the text and the number of tokens dropped.
+    """
+    policy = policy or settings.LLM_PROMPT_TRUNCATION
+    if policy not in (TRUNCATE_HEAD, TRUNCATE_HEAD_TAIL):
+        raise ValueError(f"Unknown LLM_PROMPT_TRUNCATION {policy!r}; expected head or head_tail.")
+
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text, 0
+
+    dropped = tokens - max_tokens
+    marker = f"\n[... about {dropped} tokens omitted ...]\n"
+    keep_chars = max(int(len(text) * max_tokens / tokens) - len(marker), 0)
+    if policy == TRUNCATE_HEAD:
+        fitted = text[:keep_chars] + marker
+    else:
+        head = int(keep_chars * _HEAD_SHARE)
+        tail = keep_chars - head
+        fitted = text[:head] + marker + (text[-tail:] if tail else "")
+
+    PROMPT_TRUNCATED_TOKENS.inc(dropped)
+    logger.warning(f"Prompt text of {tokens} tokens truncated to {max_tokens} ({policy}).")
+    return fitted, dropped
+
+
+def _normalize_page(text: str) -> list[str]:
+    text = _HYPHEN_BREAK.sub("", text)
+    return [_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+
+
+def _edge_indexes(lines: list[str]) -> list[int]:
+    filled = [i for i, line in enumerate(lines) if line]
+    # Short pages keep their middle third out of reach, so body text is never taken for a header.
+    count = min(_EDGE_LINES, len(filled) // 3)
+    return filled[:count] + filled[len(filled) - count:] if count else []
+
+
+def _boilerplate_key(line: str) -> str:
+    # Page numbers and dates inside running headers differ per page; the rest of the line repeats.
+    return _DIGITS.sub("#", line.lower())
+
+
+def compact_document(text: str, page_offsets: list[int]) -> Dict[str, Any]:
+    """
+    Prepares extracted pages for the LLM: rejoins words hyphenated across line breaks, collapses
+    runs of whitespace and blank lines, and removes page numbers and header or footer lines
+    repeated across pages. Lines starting with a clause marker are always kept. Returns the
+    compacted text, its page offsets and token counts before and after. Blocking; run on a
+    worker thread.
+    """
+    tokens_before = estimate_tokens(text)
+    if not settings.PROMPT_COMPACTION_ENABLED:
+        return {"text": text, "page_offsets": page_offsets, "tokens_before": tokens_before, "tokens_after": tokens_before}
+
+    bounds = page_offsets + [len(text)]
+    pages = [_normalize_page(text[start:end]) for start, end in zip(bounds, bounds[1:])]
+
+    boilerplate = set()
+    if len(pages) >= _BOILERPLATE_MIN_PAGES:
+        seen = Counter()
+        for lines in pages:
+            seen.update({_boilerplate_key(lines[i]) for i in _edge_indexes(lines) if not _CLAUSE_MARKER.match(lines[i])})
+        threshold = max(2, math.ceil(len(pages) * _BOILERPLATE_PAGE_SHARE))
+        boilerplate = {key for key, count in seen.items() if count >= threshold}
+
+    compacted, offsets, offset = [], [], 0
+    for lines in pages:
+        for i in _edge_indexes(lines):
+            if _CLAUSE_MARKER.match(lines[i]):
+                continue
+            if PAGE_NUMBER.match(lines[i]) or _boilerplate_key(lines[i]) in boilerplate:
+                lines[i] = ""
+        page_text = _BLANK_LINES.sub("\n\n", "\n".join(lines).strip("\n"))
+        page_text = page_text + "\n" if page_text else ""
+        offsets.append(offset)
+        compacted.append(page_text)
+        offset += len(page_text)
+
+    result = "".join(compacted)
+    tokens_after = estimate_tokens(result)
+    PROMPT_COMPACTION_TOKENS.inc(tokens_before, stage="raw")
+    PROMPT_COMPACTION_TOKENS.inc(tokens_after, stage="compacted")
+    return {"text": result, "page_offsets": offsets, "tokens_before": tokens_before, "tokens_after": tokens_after}
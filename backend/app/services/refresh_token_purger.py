@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import settings
+from app.db.session import session_factory
+from app.services.auth_service import AuthService
+from app.services.user_service import UserService
+from app.core.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_expired_refresh_tokens(batch_size: int) -> int:
+    async with session_factory() as db:
+        return await AuthService(db, UserService(db)).purge_expired_refresh_tokens(batch_size)
+
+
+class RefreshTokenPurger:
+    """
+    Background task that periodically deletes expired refresh tokens, so the table and its
+    indexes stay proportional to live sessions. Each run deletes in batches.
+    """
+
+    def __init__(self, interval_seconds: float, batch_size: int):
+        self._interval = interval_seconds
+        self._batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await purge_expired_refresh_tokens(self._batch_size)
+                if deleted:
+                    logger.info(f"Purged {deleted} expired refresh tokens.")
+            except DatabaseError as e:
+                logger.warning(f"Refresh token purge failed: {e}")
+            await asyncio.sleep(self._interval)
+
+
+refresh_token_purger = RefreshTokenPurger(
+    interval_seconds=settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS,
+    batch_size=settings.REFRESH_TOKEN_PURGE_BATCH_SIZE,
+)
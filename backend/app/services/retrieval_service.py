@@ -0,0 +1,145 @@
+import logging
+import math
+import re
+from collections import Counter, deque
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.document import Document
+from app.models.document_index import DocumentIndex
+from app.models.document_content import DocumentContent
+from app.services.document_content import decode_document_content
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_WORD_RE = re.compile(r"\S+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was were will with shall any all such not no may which who what when where how".split()
+)
+
+# Standard Okapi BM25 parameters.
+_BM25_K1 = 1.5
+_BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercases text and splits it into word tokens, dropping stopwords.
+    """
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def chunk_text(text: str, chunk_size: int, overlap: int) -> list[str]:
+    """
+    Splits text into overlapping windows of at most chunk_size words.
+    Words are read one at a time into a window of the last chunk_size words, so no list of
+    every word in the document is built.
+    """
+    step = max(chunk_size - overlap, 1)
+    window: deque = deque(maxlen=chunk_size)
+    chunks = []
+    count = 0
+    next_start = 0
+    for match in _WORD_RE.finditer(text):
+        window.append(match.group())
+        count += 1
+        if count == next_start + chunk_size:
+            chunks.append(" ".join(window))
+            next_start += step
+
+    # The last window is shorter than chunk_size unless a full window already reached the end.
+    if next_start < count and (not chunks or next_start - step + chunk_size < count):
+        chunks.append(" ".join(list(window)[next_start - count:]))
+    return chunks
+
+
+def build_document_index(document: Document, text: str) -> DocumentIndex:
+    """
+    Chunks a document's text and computes the BM25 term statistics for it.
+    """
+    chunks = chunk_text(text, settings.CHAT_CHUNK_SIZE, settings.CHAT_CHUNK_OVERLAP)
+    term_freqs = [dict(Counter(tokenize(chunk))) for chunk in chunks]
+
+    doc_freqs: Counter = Counter()
+    for freqs in term_freqs:
+        doc_freqs.update(freqs.keys())
+
+    lengths = [sum(freqs.values()) for freqs in term_freqs]
+    avg_chunk_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    return DocumentIndex(
+        document_id=document.id,
+        chunk_size=settings.CHAT_CHUNK_SIZE,
+        chunks=chunks,
+        term_freqs=term_freqs,
+        doc_freqs=dict(doc_freqs),
+        avg_chunk_length=avg_chunk_length,
+    )
+
+
+def rank_chunks(index: DocumentIndex, query: str, top_k: int) -> list[str]:
+    """
+    Scores every chunk against the query with BM25 and returns the top_k in document order.
+    """
+    terms = set(tokenize(query))
+    total = len(index.chunks)
+    if not terms or total == 0:
+        return index.chunks[:top_k]
+
+    avgdl = index.avg_chunk_length or 1.0
+    idf = {
+        term: math.log(1 + (total - index.doc_freqs.get(term, 0) + 0.5) / (index.doc_freqs.get(term, 0) + 0.5))
+        for term in terms
+    }
+
+    scores = []
+    for position, freqs in enumerate(index.term_freqs):
+        length = sum(freqs.values())
+        score = 0.0
+        for term in terms:
+            tf = freqs.get(term, 0)
+            if tf:
+                score += idf[term] * tf * (_BM25_K1 + 1) / (tf + _BM25_K1 * (1 - _BM25_B + _BM25_B * length / avgdl))
+        scores.append((score, position))
+
+    best = sorted(scores, key=lambda item: (-item[0], item[1]))[:top_k]
+    return [index.chunks[position] for _, position in sorted(best, key=lambda item: item[1])]
+
+
+class RetrievalService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_index(self, document: Document) -> DocumentIndex:
+        """
+        Returns the document's chunk index, building and persisting it for documents
+        uploaded before indexing existed or with a different chunk size.
+        """
+        index = await self.db.get(DocumentIndex, document.id)
+        if index is not None and index.chunk_size == settings.CHAT_CHUNK_SIZE:
+            return index
+
+        text = decode_document_content(await self.db.get(DocumentContent, document.id))
+        fresh = await run_in_threadpool(build_document_index, document, text)
+        try:
+            if index is not None:
+                await self.db.delete(index)
+                await self.db.flush()
+            self.db.add(fresh)
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.warning(f"Could not persist chunk index for document {document.id}: {e}")
+        return fresh
+
+    async def get_relevant_chunks(self, document: Document, question: str) -> list[str]:
+        """
+        Returns the CHAT_TOP_K chunks of the document most relevant to the question.
+        """
+        return rank_chunks(await self.get_index(document), question, settings.CHAT_TOP_K)
@@ -0,0 +1,300 @@
+import logging
+import re
+from typing import Any, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.document import Document
+from app.models.document_content import DocumentContent
+from app.core.exceptions import DatabaseError
+from app.services.document_content import decode_document_content
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "document_search"
+
+_SNIPPET_START = "<mark>"
+_SNIPPET_STOP = "</mark>"
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Postgres: one row per document with a weighted tsvector. Title ranks highest, then the
+# AI summary, clauses and red flags, then the body. The text itself stays compressed in
+# document_contents; snippets are highlighted from it for the returned rows only.
+# Tables created before that still carry a raw body column, which is dropped.
+_POSTGRES_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+        document_id INTEGER PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+        user_id INTEGER NOT NULL,
+        tsv TSVECTOR NOT NULL
+    )
+    """,
+    f"ALTER TABLE {SEARCH_TABLE} DROP COLUMN IF EXISTS body",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_tsv ON {SEARCH_TABLE} USING GIN (tsv)",
+    f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_user_id ON {SEARCH_TABLE} (user_id)",
+]
+
+# SQLite: an FTS5 table keyed by rowid = documents.id. The owner column holds a "u<id>" token
+# so the per-user filter is part of the MATCH and runs against the index.
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        owner, title, summary, clauses, red_flags, content,
+        tokenize = 'porter unicode61'
+    )
+    """,
+]
+
+_SQLITE_TEXT_COLUMNS = "title summary clauses red_flags content"
+
+# bm25() column weights for owner, title, summary, clauses, red_flags and content.
+_SQLITE_WEIGHTS = "0.0, 10.0, 4.0, 3.0, 3.0, 1.0"
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """
+    Creates the full-text index structures for the engine's dialect if they are missing.
+    """
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        statements = _POSTGRES_DDL
+    elif dialect == "sqlite":
+        statements = _SQLITE_DDL
+    else:
+        logger.warning(f"Full-text search is not supported on {dialect}; search index not created.")
+        return
+
+    with engine.begin() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def flatten_clauses(clauses: list[dict]) -> str:
+    return "\n".join(f"{c.get('title', '')}: {c.get('content', '')}" for c in clauses or [])
+
+
+def build_fts5_query(query: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 query: every whitespace-separated term must match, and
+    terms such as "auto-renewal" become phrases. Returns None when there is nothing to search.
+    """
+    phrases = []
+    for part in query.split():
+        words = _WORD_RE.findall(part)
+        if words:
+            phrases.append('"' + " ".join(words) + '"')
+    return " AND ".join(phrases) if phrases else None
+
+
+class SearchService:
+    def __init__(self, db: Session):
+        self.db = db
+        self._dialect = db.get_bind().dialect.name
+
+    def index_document(self, document: Document, text_content: str) -> None:
+        """
+        Adds a document to the full-text index within the caller's transaction.
+        The document must already have an id (i.e. be flushed). Runs in a savepoint, so a
+        failure leaves the document itself intact; it can be reindexed by the backfill.
+        """
+        clauses = flatten_clauses(document.clauses)
+        red_flags = "\n".join(document.red_flags or [])
+
+        if self._dialect == "postgresql":
+            statement = text(f"""
+                INSERT INTO {SEARCH_TABLE} (document_id, user_id, tsv)
+                VALUES (
+                    :document_id, :user_id,
+                    setweight(to_tsvector(CAST(:config AS regconfig), :title), 'A') ||
+                    setweight(to_tsvector(CAST(:config AS regconfig), :summary), 'B') ||
+                    setweight(to_tsvector(CAST(:config AS regconfig), :clauses || ' ' || :red_flags), 'B') ||
+                    setweight(to_tsvector(CAST(:config AS regconfig), :content), 'C')
+                )
+                ON CONFLICT (document_id) DO NOTHING
+            """)
+            params = {
+                "document_id": document.id,
+                "user_id": document.user_id,
+                "config": settings.SEARCH_TEXT_CONFIG,
+            }
+        elif self._dialect == "sqlite":
+            statement = text(f"""
+                INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, owner, title, summary, clauses, red_flags, content)
+                VALUES (:document_id, :owner, :title, :summary, :clauses, :red_flags, :content)
+            """)
+            params = {"document_id": document.id, "owner": f"u{document.user_id}"}
+        else:
+            return
+
+        params.update({
+            "title": document.title,
+            "summary": document.summary or "",
+            "clauses": clauses,
+            "red_flags": red_flags,
+            "content": text_content,
+        })
+        try:
+            with self.db.begin_nested():
+                self.db.execute(statement, params)
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not index document {document.id} for search: {e}")
+
+    def remove_document(self, doc_id: int) -> None:
+        """
+        Removes a document from the full-text index within the caller's transaction.
+        """
+        if self._dialect == "postgresql":
+            self.db.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE document_id = :id"), {"id": doc_id})
+        elif self._dialect == "sqlite":
+            self.db.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": doc_id})
+
+    def unindexed_document_ids(self, after_id: int, limit: int) -> list[int]:
+        """
+        Returns ids of documents missing from the index, in id order, for backfills.
+        """
+        key = "document_id" if self._dialect == "postgresql" else "rowid"
+        rows = self.db.execute(
+            text(
+                f"SELECT d.id FROM documents d WHERE d.id > :after_id "
+                f"AND NOT EXISTS (SELECT 1 FROM {SEARCH_TABLE} s WHERE s.{key} = d.id) "
+                f"ORDER BY d.id LIMIT :limit"
+            ),
+            {"after_id": after_id, "limit": limit},
+        ).all()
+        return [row.id for row in rows]
+
+    def search(self, user_id: int, query: str, limit: int = 20) -> list[dict[str, Any]]:
+        """
+        Returns the user's documents matching the query, best first, with a highlighted snippet.
+        """
+        try:
+            if self._dialect == "postgresql":
+                rows = self._search_postgres(user_id, query, limit)
+            elif self._dialect == "sqlite":
+                rows = self._search_sqlite(user_id, query, limit)
+            else:
+                raise DatabaseError("Full-text search is not supported on this database.")
+        except SQLAlchemyError as e:
+            logger.error(f"Database error searching documents for user {user_id}: {e}")
+            raise DatabaseError("Error searching documents.")
+
+        return rows
+
+    def _search_postgres(self, user_id: int, query: str, limit: int) -> list[dict[str, Any]]:
+        # Rank and limit first, so only the returned rows are decompressed and highlighted.
+        hits = self.db.execute(
+            text(f"""
+                WITH q AS (SELECT websearch_to_tsquery(CAST(:config AS regconfig), :query) AS query),
+                hits AS (
+                    SELECT s.document_id, ts_rank_cd(s.tsv, q.query) AS rank
+                    FROM {SEARCH_TABLE} s, q
+                    WHERE s.user_id = :user_id AND s.tsv @@ q.query
+                    ORDER BY rank DESC
+                    LIMIT :limit
+                )
+                SELECT d.id, d.title, d.summary, d.clauses, d.red_flags, d.created_at, hits.rank
+                FROM hits JOIN documents d ON d.id = hits.document_id
+                ORDER BY hits.rank DESC
+            """),
+            {"config": settings.SEARCH_TEXT_CONFIG, "query": query, "user_id": user_id, "limit": limit},
+        ).all()
+        if not hits:
+            return []
+
+        ids = [hit.id for hit in hits]
+        bodies = {
+            body.document_id: decode_document_content(body)
+            for body in self.db.scalars(select(DocumentContent).where(DocumentContent.document_id.in_(ids)))
+        }
+        # The same text the tsvector was built from, so a match anywhere can be highlighted.
+        texts = [
+            "\n".join([
+                hit.title, hit.summary or "", flatten_clauses(hit.clauses),
+                "\n".join(hit.red_flags or []), bodies.get(hit.id, ""),
+            ])
+            for hit in hits
+        ]
+        snippets = dict(self.db.execute(
+            text("""
+                SELECT t.id, ts_headline(
+                    CAST(:config AS regconfig), t.body,
+                    websearch_to_tsquery(CAST(:config AS regconfig), :query), :options
+                )
+                FROM unnest(CAST(:ids AS INTEGER[]), CAST(:texts AS TEXT[])) AS t(id, body)
+            """),
+            {
+                "config": settings.SEARCH_TEXT_CONFIG,
+                "query": query,
+                "ids": ids,
+                "texts": texts,
+                "options": (
+                    f"StartSel={_SNIPPET_START}, StopSel={_SNIPPET_STOP}, "
+                    "MaxFragments=2, MaxWords=24, MinWords=8, FragmentDelimiter=\" … \""
+                ),
+            },
+        ).all())
+
+        return [
+            {
+                "id": hit.id,
+                "title": hit.title,
+                "created_at": hit.created_at,
+                "rank": hit.rank,
+                "snippet": snippets.get(hit.id),
+            }
+            for hit in hits
+        ]
+
+    def _search_sqlite(self, user_id: int, query: str, limit: int) -> list[dict[str, Any]]:
+        match = build_fts5_query(query)
+        if match is None:
+            return []
+
+        rows = self.db.execute(
+            text(f"""
+                SELECT d.id, d.title, d.created_at, hits.rank, hits.snippet
+                FROM (
+                    SELECT rowid AS document_id,
+                           -bm25({SEARCH_TABLE}, {_SQLITE_WEIGHTS}) AS rank,
+                           snippet({SEARCH_TABLE}, -1, :start, :stop, ' … ', 24) AS snippet
+                    FROM {SEARCH_TABLE}
+                    WHERE {SEARCH_TABLE} MATCH :match
+                    ORDER BY rank DESC
+                    LIMIT :limit
+                ) AS hits
+                JOIN documents d ON d.id = hits.document_id
+                ORDER BY hits.rank DESC
+            """),
+            {
+                "match": f'owner:"u{user_id}" AND {{{_SQLITE_TEXT_COLUMNS}}}: ({match})',
+                "start": _SNIPPET_START,
+                "stop": _SNIPPET_STOP,
+                "limit": limit,
+            },
+        ).all()
+        return [dict(row._mapping) for row in rows]
+
+
+class AsyncSearchService:
+    """
+    SearchService for AsyncSession callers. The dialect-specific SQL lives in SearchService,
+    which also serves the sync backfill and benchmarks; each call here runs it on the async
+    session's connection through run_sync, without a thread hop.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def index_document(self, document: Document, text_content: str) -> None:
+        await self.db.run_sync(lambda session: SearchService(session).index_document(document, text_content))
+
+    async def remove_document(self, doc_id: int) -> None:
+        await self.db.run_sync(lambda session: SearchService(session).remove_document(doc_id))
+
+    async def search(self, user_id: int, query: str, limit: int = 20) -> list[dict[str, Any]]:
+        return await self.db.run_sync(lambda session: SearchService(session).search(user_id, query, limit))
@@ -0,0 +1,117 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.models.user import User
+
+
+class _TTLCache:
+    """
+    Thread-safe in-memory LRU cache whose entries expire at a per-entry deadline.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return item[1]
+
+    def set(self, key: Any, value: Any, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def pop(self, key: Any) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.stats["invalidations"] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries)}
+
+
+_token_cache = _TTLCache(max_entries=settings.USER_CACHE_MAX_ENTRIES)
+_user_cache = _TTLCache(max_entries=settings.USER_CACHE_MAX_ENTRIES)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class UserCacheService:
+    """
+    Per-process cache of decoded access tokens and user records for get_current_user.
+    Entries are dropped explicitly when UserService changes a user; the TTL bounds how long
+    other processes can serve a stale record.
+    """
+
+    @staticmethod
+    def stats() -> Dict[str, Dict[str, int]]:
+        """
+        Returns a snapshot of the token and user caches' counters.
+        """
+        return {"tokens": _token_cache.snapshot(), "users": _user_cache.snapshot()}
+
+    @staticmethod
+    def get_token_payload(token: str) -> Optional[Dict[str, Any]]:
+        if not settings.USER_CACHE_ENABLED:
+            return None
+        return _token_cache.get(_token_key(token))
+
+    @staticmethod
+    def put_token_payload(token: str, payload: Dict[str, Any]) -> None:
+        """
+        Caches a verified token's payload, never beyond the token's own expiry.
+        """
+        if not settings.USER_CACHE_ENABLED:
+            return
+        ttl = settings.USER_CACHE_TTL_SECONDS
+        if "exp" in payload:
+            ttl = min(ttl, float(payload["exp"]) - time.time())
+        _token_cache.set(_token_key(token), payload, ttl)
+
+    @staticmethod
+    def get_user(user_id: int) -> Optional[User]:
+        """
+        Returns a fresh, session-less copy of a cached user record, so callers can never
+        mutate the shared entry or trigger lazy loads against another request's session.
+        """
+        if not settings.USER_CACHE_ENABLED:
+            return None
+        values = _user_cache.get(user_id)
+        return User(**values) if values is not None else None
+
+    @staticmethod
+    def put_user(user: User) -> None:
+        if not settings.USER_CACHE_ENABLED:
+            return
+        values = {column.name: getattr(user, column.name) for column in User.__table__.columns}
+        _user_cache.set(user.id, values, settings.USER_CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def invalidate(user_id: int) -> None:
+        """
+        Drops a user's cached record in this process.
+        """
+        _user_cache.pop(user_id)
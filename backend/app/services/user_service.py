@@ -1,10 +1,12 @@
 import logging
 from typing import List, Optional
 
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
+from app.services.user_cache_service import UserCacheService
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.exceptions import DatabaseError, UserNotFoundError, UserAlreadyExistsError
 
@@ -12,45 +14,45 @@ logger = logging.getLogger(__name__)
 
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
         """
         Retrieves a user from the database by their ID.
         """
         try:
-            return self.db.get(User, user_id)
+            return await self.db.get(User, user_id)
         except SQLAlchemyError as e:
             logger.error(f"Database error fetching user with ID {user_id}: {e}", exc_info=True)
             raise DatabaseError("Error fetching user from the database.")
 
-    def get_user_by_email(self, email: str) -> Optional[User]:
+    async def get_user_by_email(self, email: str) -> Optional[User]:
         """
         Retrieves a user by their email, normalizing it to lowercase.
         """
         normalized_email = email.strip().lower()
         try:
-            return self.db.query(User).filter(User.email == normalized_email).first()
+            return await self.db.scalar(select(User).where(User.email == normalized_email).limit(1))
         except SQLAlchemyError as e:
             logger.error(f"Database error fetching user with email {email}: {e}", exc_info=True)
             raise DatabaseError("Error fetching user from the database.")
 
-    def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
+    async def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
         """
         Lists users with pagination.
         """
         try:
-            return self.db.query(User).offset(skip).limit(limit).all()
+            return list(await self.db.scalars(select(User).offset(skip).limit(limit)))
         except SQLAlchemyError as e:
             logger.error(f"Database error listing users: {e}", exc_info=True)
             raise DatabaseError("Error listing users from the database.")
 
-    def create_user(self, user_in: UserCreate) -> User:
+    async def create_user(self, user_in: UserCreate) -> User:
         """
         Creates a new user. Expects a UserCreate object with the password already hashed.
         """
-        existing_user = self.get_user_by_email(user_in.email)
+        existing_user = await self.get_user_by_email(user_in.email)
         if existing_user:
             raise UserAlreadyExistsError("Email is already registered")
         
@@ -61,25 +63,25 @@ class UserService:
 
         try:
             self.db.add(new_user)
-            self.db.commit()
-            self.db.refresh(new_user)
+            await self.db.commit()
+            await self.db.refresh(new_user)
             logger.info("User created: %s", new_user.email)
             return new_user
         except IntegrityError as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error("Integrity error creating user %s: %s", new_user.email, e)
             raise UserAlreadyExistsError("Email is already registered")
         except SQLAlchemyError as e:
-            self.db.rollback()
+            await self.db.rollback()
             logger.error("Database error creating user %s: %s", new_user.email, e)
             raise DatabaseError("Error creating user.")
 
-    def update_user(self, user_id: int, user_in: UserUpdate) -> User:
+    async def update_user(self, user_id: int, user_in: UserUpdate) -> User:
         """
         Updates an existing user's fields.
         Expects a UserUpdate object with the password already hashed if it's included.
         """
-        db_user = self.get_user_by_id(user_id)
+        db_user = await self.get_user_by_id(user_id)
         if not db_user:
             raise UserNotFoundError("User not found.")
 
@@ -95,28 +97,30 @@ class UserService:
             setattr(db_user, field, value)
 
         try:
-            self.db.commit()
-            self.db.refresh(db_user)
+            await self.db.commit()
+            UserCacheService.invalidate(user_id)
+            await self.db.refresh(db_user)
             logger.info("User updated: %s", db_user.id)
             return db_user
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error("Database error updating user %s: %s", db_user.id, e)
+            await self.db.rollback()
+            logger.error("Database error updating user %s: %s", user_id, e)
             raise DatabaseError("Error updating user.")
 
-    def delete_user(self, user_id: int) -> None:
+    async def delete_user(self, user_id: int) -> None:
         """
         Deletes a user from the database.
         """
-        db_user = self.get_user_by_id(user_id)
+        db_user = await self.get_user_by_id(user_id)
         if not db_user:
             raise UserNotFoundError("User not found.")
 
         try:
-            self.db.delete(db_user)
-            self.db.commit()
-            logger.info("User deleted: %s", db_user.id)
+            await self.db.delete(db_user)
+            await self.db.commit()
+            UserCacheService.invalidate(user_id)
+            logger.info("User deleted: %s", user_id)
         except SQLAlchemyError as e:
-            self.db.rollback()
-            logger.error("Database error deleting user %s: %s", db_user.id, e)
+            await self.db.rollback()
+            logger.error("Database error deleting user %s: %s", user_id, e)
             raise DatabaseError("Error deleting user.")
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Local stand-in for the OpenRouter chat completions API, for load tests without network access.
+
+Every POST is answered like /chat/completions. Prompts asking for JSON (document analysis)
+get a JSON analysis and other prompts get a plain-text answer. Analyses of documents with
+locally segmented clauses return only a summary and red flags citing the clause markers. A response waits --latency
+seconds (plus up to --jitter) before its first token. It then produces --completion-tokens
+tokens at --tokens-per-second, streamed as server-sent events when the request sets
+"stream": true. --error-rate of the requests fail with --error-status instead.
+Responses carry a `usage` field: prompt tokens are estimated at 4 characters per token.
+GET /stats returns request, error and token counters.
+
+Usage (from backend/):
+    python -m benchmarks.fake_llm --port 8001 --latency 0.8 --tokens-per-second 60
+    then set OPENROUTER_BASE_URL=http://127.0.0.1:8001/v1/chat/completions
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+_WORDS = (
+    "the party shall provide notice of termination within thirty days and remains liable "
+    "for fees accrued under this agreement subject to the limitation of liability clause"
+).split()
+
+
+@dataclass
+class FakeLLMConfig:
+    latency: float = 0.5
+    jitter: float = 0.0
+    tokens_per_second: float = 0.0
+    completion_tokens: int = 120
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int = 7
+
+
+def _filler(rng: random.Random, tokens: int) -> list[str]:
+    return [rng.choice(_WORDS) for _ in range(max(tokens, 1))]
+
+
+def _analysis(words: list[str]) -> str:
+    """
+    Builds an analysis in the JSON shape AIEngineService expects, about len(words) tokens long.
+    """
+    third = max(len(words) // 3, 1)
+    return json.dumps({
+        "summary": " ".join(words[:third]),
+        "clauses": [
+            {"title": f"Clause {i}", "content": " ".join(words[third + i * 8:third + i * 8 + 8])}
+            for i in range(max(third // 8, 1))
+        ],
+        "red_flags": [" ".join(words[2 * third:])],
+    })
+
+
+def _flagged_summary(words: list[str], clause_ids: list[str]) -> str:
+    """
+    Builds the summary-and-red-flags analysis requested when clauses were segmented locally.
+    """
+    half = max(len(words) // 2, 1)
+    return json.dumps({
+        "summary": " ".join(words[:half]),
+        "red_flags": [{"text": " ".join(words[half:]), "clause_ids": clause_ids[:1]}],
+    })
+
+
+def build_app(config: FakeLLMConfig) -> Starlette:
+    rng = random.Random(config.seed)
+    stats: Counter = Counter()
+
+    async def completions(request: Request):
+        body = await request.json()
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        stats["requests"] += 1
+        await asyncio.sleep(config.latency + rng.uniform(0, config.jitter))
+
+        if rng.random() < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"error": {"message": "Injected failure.", "code": config.error_status}},
+                status_code=config.error_status,
+            )
+
+        words = _filler(rng, config.completion_tokens)
+        usage = {
+            "prompt_tokens": len(prompt) // 4 + 1,
+            "completion_tokens": len(words),
+            "total_tokens": len(prompt) // 4 + 1 + len(words),
+        }
+        stats["prompt_tokens"] += usage["prompt_tokens"]
+        stats["completion_tokens"] += usage["completion_tokens"]
+        completion_id = f"gen-{uuid.uuid4().hex[:12]}"
+        token_delay = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+
+        if body.get("stream"):
+            async def events():
+                for i, word in enumerate(words):
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+                    delta = {"content": word if i == 0 else f" {word}"}
+                    yield f"data: {json.dumps({'id': completion_id, 'choices': [{'index': 0, 'delta': delta}]})}\n\n"
+                final = {"index": 0, "delta": {}, "finish_reason": "stop"}
+                yield f"data: {json.dumps({'id': completion_id, 'choices': [final], 'usage': usage})}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(token_delay * len(words))
+        if "clause_ids" in prompt:
+            content = _flagged_summary(words, re.findall(r"\[(c\d+)\]", prompt))
+        elif "JSON" in prompt:
+            content = _analysis(words)
+        else:
+            content = " ".join(words)
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    async def read_stats(request: Request):
+        return JSONResponse({**stats, "config": asdict(config)})
+
+    return Starlette(routes=[
+        Route("/stats", read_stats, methods=["GET"]),
+        Route("/{path:path}", completions, methods=["POST"]),
+    ])
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8001)
+    arg_parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token")
+    arg_parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    arg_parser.add_argument("--tokens-per-second", type=float, default=0.0, help="generation rate; 0 returns all tokens at once")
+    arg_parser.add_argument("--completion-tokens", type=int, default=120)
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    arg_parser.add_argument("--error-status", type=int, default=503)
+    arg_parser.add_argument("--seed", type=int, default=7)
+    args = arg_parser.parse_args()
+
+    import uvicorn
+
+    config = FakeLLMConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    uvicorn.run(build_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Load and latency benchmark for the API against a local fake LLM.
+
+Starts benchmarks.fake_llm and the API (uvicorn, temporary SQLite database) as subprocesses.
+It registers --users accounts and runs each scenario at each --concurrency level for
+--duration seconds of closed-loop load:
+
+    login   POST /auth/login
+    upload  POST /documents/ with a dummy_pdfs file, timed until its job has finished
+    list    GET /documents/
+    read    GET /documents/{id}
+    chat    POST /ai/chat/ with a new question
+
+Each run reports requests/s, p50/p95/p99/max latency, errors by status and the peak RSS of
+the API process and its worker processes. RSS is sampled from /proc, so it is Linux-only.
+Results are written as JSON to --output, and --baseline compares them with an earlier run.
+The analysis and answer caches are off unless --with-caches is given, so every upload and
+chat reaches the fake LLM.
+
+Usage (from backend/, with the usual .env settings):
+    python -m benchmarks.load_suite --concurrency 1,8,32 --duration 10 --output results.json
+    python -m benchmarks.load_suite --scenarios chat --llm-latency 2 --env DB_POOL_SIZE=20
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+CORPUS_DIR = BACKEND_DIR.parent / "dummy_pdfs"
+SCENARIOS = ("login", "upload", "list", "read", "chat")
+PASSWORD = "Benchmark-password-1!"
+QUESTIONS = [
+    "Who are the parties to this agreement?",
+    "How can either party terminate the contract?",
+    "What are the payment terms?",
+    "Is there a limitation of liability?",
+    "Which law governs the agreement?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def tree_rss_bytes(pid: int) -> int:
+    """
+    Returns the resident memory of a process and all its descendants, read from /proc.
+    """
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as fh:
+                    pending.extend(int(child) for child in fh.read().split())
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+    return total
+
+
+class RSSSampler:
+    """
+    Samples the process tree's RSS on a background thread and keeps the peak.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self._pid = pid
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.peak = 0
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss_bytes(self._pid))
+            self._stop.wait(self._interval)
+
+    def __enter__(self) -> "RSSSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def wait_until_up(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with status {process.returncode} during startup.")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s.")
+
+
+class LoadRunner:
+    def __init__(self, client: httpx.AsyncClient, users: int, seed: int):
+        self.client = client
+        self.emails = [f"bench{i}@example.com" for i in range(users)]
+        self.headers: list[dict[str, str]] = []
+        self.documents: dict[int, list[int]] = {}
+        self.pdfs = sorted(CORPUS_DIR.glob("*.pdf"))
+        self.rng = random.Random(seed)
+        self.sequence = itertools.count()
+
+    async def register_users(self) -> None:
+        for email in self.emails:
+            response = await self.client.post("/auth/register", json={"email": email, "password": PASSWORD})
+            response.raise_for_status()
+            self.headers.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+
+    async def _upload(self, user: int) -> httpx.Response:
+        """
+        Uploads a corpus PDF and polls its job until it is done or failed. Returns the last
+        response: the job status on success, otherwise the failing upload or job response.
+        """
+        pdf = self.pdfs[next(self.sequence) % len(self.pdfs)]
+        response = await self.client.post(
+            "/documents/",
+            files={"file": (pdf.name, pdf.read_bytes(), "application/pdf")},
+            headers=self.headers[user],
+        )
+        if response.status_code != 202:
+            return response
+        job_id = response.json()["id"]
+        while True:
+            response = await self.client.get(f"/documents/jobs/{job_id}", headers=self.headers[user])
+            job = response.json() if response.status_code == 200 else {}
+            if job.get("status") == "done":
+                self.documents.setdefault(user, []).append(job["document_id"])
+                return response
+            if response.status_code != 200 or job.get("status") == "failed":
+                return httpx.Response(500, request=response.request)
+            await asyncio.sleep(0.05)
+
+    async def seed_documents(self) -> None:
+        """
+        Gives every user at least one document, for the list, read and chat scenarios.
+        Uploads are retried a few times, since --llm-error-rate also fails analyses.
+        """
+        for _ in range(5):
+            missing = [user for user in range(len(self.emails)) if not self.documents.get(user)]
+            if not missing:
+                return
+            await asyncio.gather(*(self._upload(user) for user in missing))
+        raise RuntimeError("Could not upload a document for every benchmark user.")
+
+    async def request(self, scenario: str, user: int) -> httpx.Response:
+        headers = self.headers[user]
+        if scenario == "login":
+            return await self.client.post("/auth/login", json={"email": self.emails[user], "password": PASSWORD})
+        if scenario == "upload":
+            return await self._upload(user)
+        if scenario == "list":
+            return await self.client.get("/documents/", params={"limit": 50}, headers=headers)
+        if scenario == "read":
+            doc_id = self.rng.choice(self.documents[user])
+            return await self.client.get(f"/documents/{doc_id}", headers=headers)
+        if scenario == "chat":
+            question = f"{self.rng.choice(QUESTIONS)} ({next(self.sequence)})"
+            doc_id = self.rng.choice(self.documents[user])
+            return await self.client.post("/ai/chat/", json={"document_id": doc_id, "message": question}, headers=headers)
+        raise ValueError(f"Unknown scenario {scenario}.")
+
+    async def run(self, scenario: str, concurrency: int, duration: float) -> dict:
+        latencies: list[float] = []
+        statuses: Counter = Counter()
+        deadline = time.perf_counter() + duration
+
+        async def worker(slot: int) -> None:
+            user = slot % len(self.emails)
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = (await self.request(scenario, user)).status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[str(status)] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(slot) for slot in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        errors = {status: count for status, count in statuses.items() if not status.startswith(("2", "3"))}
+        return {
+            "scenario": scenario,
+            "concurrency": concurrency,
+            "requests": len(latencies),
+            "errors": sum(errors.values()),
+            "error_statuses": errors,
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round(max(latencies, default=0.0) * 1000, 1),
+        }
+
+
+async def run_suite(base_url: str, server_pid: int, args: argparse.Namespace) -> list[dict]:
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.request_timeout, limits=limits) as client:
+        runner = LoadRunner(client, args.users, args.seed)
+        await runner.register_users()
+        results = []
+        for scenario in args.scenarios:
+            if scenario in ("list", "read", "chat"):
+                await runner.seed_documents()
+            for concurrency in args.concurrency:
+                with RSSSampler(server_pid) as sampler:
+                    result = await runner.run(scenario, concurrency, args.duration)
+                result["peak_rss_mb"] = round(sampler.peak / 2**20, 1)
+                results.append(result)
+                print(
+                    f"{scenario:<7} c={concurrency:<4} {result['rps']:8.2f} req/s  "
+                    f"p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+                    f"errors {result['errors']:<4} rss {result['peak_rss_mb']:7.1f} MB",
+                    flush=True,
+                )
+    return results
+
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    """
+    Prints the change in throughput and p95 latency against an earlier results file.
+    """
+    with open(baseline_path) as fh:
+        baseline = {(r["scenario"], r["concurrency"]): r for r in json.load(fh)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+
+        def change(key: str) -> str:
+            return f"{(result[key] - before[key]) / before[key] * 100:+6.1f}%" if before[key] else "   n/a"
+
+        print(f"{result['scenario']:<7} c={result['concurrency']:<4} req/s {change('rps')}  p95 {change('p95_ms')}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--scenarios", type=lambda v: v.split(","), default=list(SCENARIOS), help="comma-separated")
+    arg_parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 8, 32],
+                            help="comma-separated concurrency levels")
+    arg_parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario and concurrency level")
+    arg_parser.add_argument("--users", type=int, default=8)
+    arg_parser.add_argument("--request-timeout", type=float, default=120.0)
+    arg_parser.add_argument("--rounds", type=int, help="bcrypt cost (PASSWORD_BCRYPT_ROUNDS)")
+    arg_parser.add_argument("--with-caches", action="store_true", help="keep the analysis and answer caches enabled")
+    arg_parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                            help="extra setting for the API process, e.g. DB_POOL_SIZE=20; repeatable")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.5)
+    arg_parser.add_argument("--llm-jitter", type=float, default=0.0)
+    arg_parser.add_argument("--llm-tokens-per-second", type=float, default=0.0)
+    arg_parser.add_argument("--llm-completion-tokens", type=int, default=120)
+    arg_parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    arg_parser.add_argument("--seed", type=int, default=7)
+    arg_parser.add_argument("--output", help="path for JSON results")
+    arg_parser.add_argument("--baseline", help="earlier --output file to compare against")
+    args = arg_parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        arg_parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    tmp = tempfile.TemporaryDirectory()
+    llm_port, api_port = free_port(), free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp.name}/bench.sqlite",
+        "INGESTION_UPLOAD_DIR": f"{tmp.name}/uploads",
+        "OPENROUTER_BASE_URL": f"http://127.0.0.1:{llm_port}/v1/chat/completions",
+    }
+    if not args.with_caches:
+        env.update({"ANALYSIS_CACHE_ENABLED": "false", "ANSWER_CACHE_ENABLED": "false"})
+    if args.rounds is not None:
+        env["PASSWORD_BCRYPT_ROUNDS"] = str(args.rounds)
+    env.update(item.split("=", 1) for item in args.env)
+
+    llm_args = [
+        "--port", str(llm_port),
+        "--latency", str(args.llm_latency),
+        "--jitter", str(args.llm_jitter),
+        "--tokens-per-second", str(args.llm_tokens_per_second),
+        "--completion-tokens", str(args.llm_completion_tokens),
+        "--error-rate", str(args.llm_error_rate),
+        "--seed", str(args.seed),
+    ]
+    subprocess.run([sys.executable, "-m", "app.db.session"], cwd=BACKEND_DIR, env=env, check=True)
+    llm = subprocess.Popen([sys.executable, "-m", "benchmarks.fake_llm", *llm_args], cwd=BACKEND_DIR, env=env)
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(api_port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+    try:
+        wait_until_up(f"http://127.0.0.1:{llm_port}/stats", llm)
+        wait_until_up(f"http://127.0.0.1:{api_port}/openapi.json", api)
+        results = asyncio.run(run_suite(f"http://127.0.0.1:{api_port}", api.pid, args))
+        llm_stats = httpx.get(f"http://127.0.0.1:{llm_port}/stats").json()
+    finally:
+        for process in (api, llm):
+            process.terminate()
+            process.wait(timeout=30)
+        tmp.cleanup()
+
+    report = {
+        "meta": {
+            "started_at": started_at,
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+            "llm": llm_stats,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
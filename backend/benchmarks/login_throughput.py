@@ -0,0 +1,145 @@
+"""
+Measures login throughput and how much a login burst slows other requests.
+
+Starts the API under uvicorn on a temporary SQLite database and registers --users
+accounts. It then sends --concurrency parallel login streams for --duration seconds,
+while a probe repeatedly calls GET /users/me. Reports logins/s, login latency, fast
+rejections (503) and probe latency.
+
+Usage (from backend/, with the usual .env settings):
+    python -m benchmarks.login_throughput --concurrency 32 --duration 10 --rounds 12
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_load(base_url: str, users: int, concurrency: int, duration: float) -> dict:
+    import httpx
+
+    password = "Benchmark-password-1!"
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        for i in range(users):
+            response = await client.post("/auth/register", json={"email": f"bench{i}@example.com", "password": password})
+            response.raise_for_status()
+        token = (await client.post("/auth/login", json={"email": "bench0@example.com", "password": password})).json()["access_token"]
+
+        login_latencies: list[float] = []
+        probe_latencies: list[float] = []
+        rejected = 0
+        deadline = time.perf_counter() + duration
+
+        async def login_stream(worker: int) -> None:
+            nonlocal rejected
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/auth/login",
+                    json={"email": f"bench{worker % users}@example.com", "password": password},
+                )
+                if response.status_code == 503:
+                    rejected += 1
+                    await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+                    continue
+                response.raise_for_status()
+                login_latencies.append(time.perf_counter() - started)
+
+        async def probe() -> None:
+            headers = {"Authorization": f"Bearer {token}"}
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                (await client.get("/users/me", headers=headers)).raise_for_status()
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.02)
+
+        started = time.perf_counter()
+        await asyncio.gather(probe(), *(login_stream(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "logins": len(login_latencies),
+        "logins_per_s": round(len(login_latencies) / elapsed, 2),
+        "login_p50_ms": round(statistics.median(login_latencies) * 1000, 1) if login_latencies else None,
+        "login_p95_ms": round(percentile(login_latencies, 0.95) * 1000, 1),
+        "rejected_503": rejected,
+        "probe_p50_ms": round(statistics.median(probe_latencies) * 1000, 1) if probe_latencies else None,
+        "probe_p95_ms": round(percentile(probe_latencies, 0.95) * 1000, 1),
+    }
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--users", type=int, default=8)
+    arg_parser.add_argument("--concurrency", type=int, default=32, help="parallel login streams")
+    arg_parser.add_argument("--duration", type=float, default=10.0, help="seconds of sustained logins")
+    arg_parser.add_argument("--rounds", type=int, help="bcrypt cost (PASSWORD_BCRYPT_ROUNDS)")
+    arg_parser.add_argument("--workers", type=int, help="hashing processes (PASSWORD_HASH_WORKERS)")
+    arg_parser.add_argument("--max-pending", type=int, help="hashing queue limit (PASSWORD_HASH_MAX_PENDING)")
+    arg_parser.add_argument("--output", help="optional path for JSON results")
+    args = arg_parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    # Settings are read at import time, so overrides must be in the environment first.
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp.name}/login.sqlite"
+    for name, value in (
+        ("PASSWORD_BCRYPT_ROUNDS", args.rounds),
+        ("PASSWORD_HASH_WORKERS", args.workers),
+        ("PASSWORD_HASH_MAX_PENDING", args.max_pending),
+    ):
+        if value is not None:
+            os.environ[name] = str(value)
+
+    import uvicorn
+    from app.config import settings
+    from app.db.session import create_db_and_tables
+    from app.main import app
+
+    create_db_and_tables()
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        results = asyncio.run(run_load(f"http://127.0.0.1:{port}", args.users, args.concurrency, args.duration))
+    finally:
+        server.should_exit = True
+        thread.join()
+        tmp.cleanup()
+
+    results.update({
+        "rounds": settings.PASSWORD_BCRYPT_ROUNDS,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+        "concurrency": args.concurrency,
+    })
+    print(json.dumps(results, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
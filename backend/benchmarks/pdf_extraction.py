@@ -0,0 +1,94 @@
+"""
+Compares serial and process-pool PDF text extraction on the dummy_pdfs corpus.
+
+The corpus PDFs are short, so each one is also concatenated --repeat times into a
+larger temporary PDF to approximate long contracts.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_extraction --repeat 60 --runs 3
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+
+from app.config import settings
+from app.services.pdf_parser import PDFParserService, shutdown_extraction_pool
+
+CORPUS_DIR = Path(__file__).resolve().parents[2] / "dummy_pdfs"
+
+
+def build_inflated_pdf(source: Path, repeat: int, target_dir: str) -> str:
+    """
+    Writes a copy of source with its pages repeated `repeat` times and returns its path.
+    """
+    path = os.path.join(target_dir, f"{source.stem}_x{repeat}.pdf")
+    with fitz.open(source) as original, fitz.open() as inflated:
+        for _ in range(repeat):
+            inflated.insert_pdf(original)
+        inflated.save(path)
+    return path
+
+
+def time_extraction(path: str, parallel: bool, runs: int) -> list[float]:
+    """
+    Extracts every page of path `runs` times and returns the wall-clock seconds of each run.
+    """
+    settings.PDF_PARALLEL_MIN_PAGES = 1 if parallel else 10**9
+    parser = PDFParserService()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for _ in parser.extract_text(path):
+            pass
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=60, help="times each corpus PDF is concatenated")
+    arg_parser.add_argument("--runs", type=int, default=3, help="timed runs per mode")
+    arg_parser.add_argument("--workers", type=int, default=settings.PDF_EXTRACT_WORKERS)
+    arg_parser.add_argument("--output", help="optional path for JSON results")
+    args = arg_parser.parse_args()
+
+    settings.PDF_EXTRACT_WORKERS = args.workers
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm the pool so worker start-up is not charged to the first file.
+        warmup = build_inflated_pdf(sorted(CORPUS_DIR.glob("*.pdf"))[0], 1, tmp)
+        time_extraction(warmup, parallel=True, runs=1)
+
+        for source in sorted(CORPUS_DIR.glob("*.pdf")):
+            path = build_inflated_pdf(source, args.repeat, tmp)
+            with fitz.open(path) as doc:
+                pages = doc.page_count
+
+            serial = statistics.median(time_extraction(path, parallel=False, runs=args.runs))
+            parallel = statistics.median(time_extraction(path, parallel=True, runs=args.runs))
+            results.append({
+                "file": source.name,
+                "pages": pages,
+                "serial_s": round(serial, 4),
+                "parallel_s": round(parallel, 4),
+                "speedup": round(serial / parallel, 2) if parallel else None,
+            })
+            print(f"{source.name:<14} {pages:>5} pages  serial {serial:7.3f}s  "
+                  f"parallel {parallel:7.3f}s  speedup {serial / parallel:5.2f}x")
+
+    shutdown_extraction_pool()
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"workers": args.workers, "repeat": args.repeat, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
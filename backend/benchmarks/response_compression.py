@@ -0,0 +1,112 @@
+"""
+Measures bytes on the wire for GET /documents/{id} payloads built from the dummy_pdfs corpus:
+uncompressed, gzip and (if the brotli package is installed) brotli, with and without
+?include=content, plus the cost of an ETag revalidation (304, empty body).
+
+Each PDF is concatenated --repeat times to approximate long contracts. The payloads go
+through CompressionMiddleware on a minimal app, so no database or LLM is needed.
+
+Usage (from backend/):
+    python -m benchmarks.response_compression --repeat 1
+"""
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+
+import fitz
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.api.document_routes import document_etag, matching_etag
+from app.core.compression import CompressionMiddleware, supported_encodings
+from app.schemas.document import DocumentSummary
+from app.services.analysis_cache_service import compute_content_hash
+
+CORPUS_DIR = Path(__file__).resolve().parents[2] / "dummy_pdfs"
+
+
+def build_payloads(repeat: int) -> dict[int, DocumentSummary]:
+    """
+    Builds one DocumentSummary per corpus PDF, with its text repeated `repeat` times.
+    """
+    payloads = {}
+    for doc_id, source in enumerate(sorted(CORPUS_DIR.glob("*.pdf")), start=1):
+        with fitz.open(source) as doc:
+            text = "".join(page.get_text() for page in doc) * repeat
+        payloads[doc_id] = DocumentSummary(
+            id=doc_id,
+            title=source.name,
+            summary="A short AI-generated summary of the agreement. " * 8,
+            red_flags=[f"Potential issue number {i} in this contract." for i in range(6)],
+            clauses=[{"title": f"Clause {i}", "content": "Clause explanation text. " * 6} for i in range(12)],
+            user_id=1,
+            created_at=datetime(2025, 1, 1),
+            content=text,
+        )
+    return payloads
+
+
+def build_app(payloads: dict[int, DocumentSummary]) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/documents/{doc_id}")
+    def read(doc_id: int, request: Request, response: Response, include: str = ""):
+        doc = payloads[doc_id]
+        include_content = include == "content"
+        etag = document_etag(doc_id, compute_content_hash(doc.content), include_content)
+        matched = matching_etag(request.headers.get("if-none-match"), etag)
+        if matched:
+            return Response(status_code=304, headers={"ETag": matched})
+        response.headers["ETag"] = etag
+        return doc if include_content else doc.model_copy(update={"content": None})
+
+    return app
+
+
+def wire_bytes(client: TestClient, url: str, encoding: str, etag: str = "") -> tuple[int, int, str]:
+    """
+    Returns (status, body bytes as sent, ETag) for one request.
+    """
+    headers = {"Accept-Encoding": encoding}
+    if etag:
+        headers["If-None-Match"] = etag
+    response = client.get(url, headers=headers)
+    return response.status_code, int(response.headers.get("content-length", 0)), response.headers.get("etag", "")
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=1, help="times each corpus PDF's text is repeated")
+    arg_parser.add_argument("--output", help="optional path for JSON results")
+    args = arg_parser.parse_args()
+
+    payloads = build_payloads(args.repeat)
+    client = TestClient(build_app(payloads))
+    encodings = ["identity"] + supported_encodings()
+    results = []
+
+    for doc_id, doc in payloads.items():
+        for include in ("", "content"):
+            url = f"/documents/{doc_id}?include={include}"
+            row = {"file": doc.title, "include_content": bool(include)}
+            for encoding in encodings:
+                _, size, etag = wire_bytes(client, url, encoding)
+                status, revalidated, _ = wire_bytes(client, url, encoding, etag)
+                row[encoding] = size
+                row[f"{encoding}_304"] = revalidated if status == 304 else None
+            results.append(row)
+
+            sizes = "  ".join(f"{enc} {row[enc]:>9,}" for enc in encodings)
+            ratio = row["identity"] / min(row[enc] for enc in encodings)
+            print(f"{doc.title:<14} {'content' if include else 'summary':<8} {sizes}  "
+                  f"best {ratio:5.1f}x  304 body {row['identity_304']}")
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"repeat": args.repeat, "encodings": encodings, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Measures /documents/search query latency against a synthetic corpus.
+
+Builds --documents documents spread over --users users. Their text is drawn from the
+dummy_pdfs sentences, with a few rare marker phrases mixed in. Each document goes through
+SearchService.index_document, and then SearchService.search is timed for common,
+multi-word and rare queries.
+
+Uses a temporary SQLite (FTS5) database unless --database-url points at Postgres.
+
+Usage (from backend/):
+    python -m benchmarks.search_latency --documents 100000 --users 1000
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel
+
+from app.models.user import User
+from app.models.document import Document
+from app.services.document_content import build_document_content
+from app.services.search_service import SearchService, ensure_search_index
+
+CORPUS_DIR = Path(__file__).resolve().parents[2] / "dummy_pdfs"
+
+QUERIES = ["agreement", "termination notice", "auto-renewal", "indemnify", "limitation of liability", "arbitration"]
+RARE_PHRASES = ["automatic renewal clause", "auto-renewal", "binding arbitration", "liquidated damages"]
+
+
+def load_sentences() -> list[str]:
+    sentences = []
+    for source in sorted(CORPUS_DIR.glob("*.pdf")):
+        with fitz.open(source) as doc:
+            text = " ".join(page.get_text() for page in doc)
+        sentences.extend(s.strip() for s in re.split(r"(?<=[.;:])\s+", " ".join(text.split())) if len(s) > 20)
+    return sentences
+
+
+def populate(engine, documents: int, users: int, words: int, seed: int) -> None:
+    rng = random.Random(seed)
+    sentences = load_sentences()
+
+    with Session(engine) as db:
+        db.add_all(User(email=f"bench{u}@example.com", hashed_password="x") for u in range(users))
+        db.commit()
+        user_ids = [u.id for u in db.query(User.id).all()]
+
+    started = time.perf_counter()
+    batch = 1000
+    for start in range(0, documents, batch):
+        with Session(engine) as db:
+            search_service = SearchService(db)
+            pending = []
+            for _ in range(min(batch, documents - start)):
+                body = []
+                while sum(len(s.split()) for s in body) < words:
+                    body.append(rng.choice(sentences))
+                if rng.random() < 0.02:
+                    body.insert(rng.randrange(len(body)), rng.choice(RARE_PHRASES) + ".")
+                document = Document(
+                    title=f"Contract {start + len(pending)}",
+                    summary=rng.choice(sentences),
+                    red_flags=[rng.choice(sentences)],
+                    clauses=[{"title": "Clause", "content": rng.choice(sentences)}],
+                    user_id=rng.choice(user_ids),
+                )
+                # Search highlights snippets from the stored body, as for uploaded documents.
+                document.body = build_document_content(" ".join(body))
+                db.add(document)
+                pending.append((document, " ".join(body)))
+            db.flush()
+            for document, text in pending:
+                search_service.index_document(document, text)
+            db.commit()
+        print(f"\rindexed {start + batch:>7,} documents ({time.perf_counter() - started:6.1f}s)", end="", flush=True)
+    print()
+
+
+def time_queries(engine, runs: int, seed: int) -> dict[str, dict]:
+    rng = random.Random(seed + 1)
+    results = {}
+    with Session(engine) as db:
+        search_service = SearchService(db)
+        user_ids = [u.id for u in db.query(User.id).all()]
+        for query in QUERIES:
+            timings, hits = [], []
+            for _ in range(runs):
+                user_id = rng.choice(user_ids)
+                started = time.perf_counter()
+                found = search_service.search(user_id, query, limit=20)
+                timings.append((time.perf_counter() - started) * 1000)
+                hits.append(len(found))
+            timings.sort()
+            results[query] = {
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+                "max_ms": round(timings[-1], 2),
+                "avg_hits": round(statistics.mean(hits), 1),
+            }
+            print(f"{query:<26} p50 {results[query]['p50_ms']:7.2f} ms  p95 {results[query]['p95_ms']:7.2f} ms  "
+                  f"max {results[query]['max_ms']:7.2f} ms  hits {results[query]['avg_hits']}")
+    return results
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--documents", type=int, default=100000)
+    arg_parser.add_argument("--users", type=int, default=1000)
+    arg_parser.add_argument("--words", type=int, default=250, help="approximate words of body text per document")
+    arg_parser.add_argument("--runs", type=int, default=200, help="timed searches per query, each for a random user")
+    arg_parser.add_argument("--seed", type=int, default=7)
+    arg_parser.add_argument("--database-url", help="run against this (empty) database instead of a temporary SQLite file")
+    arg_parser.add_argument("--output", help="optional path for JSON results")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.database_url or f"sqlite:///{tmp}/search.sqlite")
+        SQLModel.metadata.create_all(engine)
+        ensure_search_index(engine)
+
+        populate(engine, args.documents, args.users, args.words, args.seed)
+        results = time_queries(engine, args.runs, args.seed)
+        engine.dispose()
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({**vars(args), "results": results}, fh, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+# app.config requires these; tests never reach the provider or a shared database.
+_TEST_ENV = {
+    "ENVIRONMENT": "test",
+    "OPENROUTER_API_KEY": "test",
+    "OPENROUTER_BASE_URL": "http://127.0.0.1:9/v1/chat",
+    "LLM_MODEL": "test-model",
+    "DATABASE_URL": "sqlite:///:memory:",
+    "PASSWORD_MIN_LENGTH": "8",
+    "PASSWORD_REQUIRE_UPPER": "false",
+    "PASSWORD_REQUIRE_LOWER": "false",
+    "PASSWORD_REQUIRE_DIGIT": "false",
+    "PASSWORD_REQUIRE_SPECIAL": "false",
+    "JWT_SECRET_KEY": "test",
+    "JWT_ALGORITHM": "HS256",
+    "JWT_ACCESS_TOKEN_EXPIRES_MINUTES": "30",
+    "JWT_REFRESH_SECRET_KEY": "test-refresh",
+    "JWT_REFRESH_TOKEN_EXPIRES_MINUTES": "600",
+}
+for name, value in _TEST_ENV.items():
+    os.environ.setdefault(name, value)
+
+# Registers every table on SQLModel.metadata; imported after the environment is set, which app.config reads.
+import app.db.session  # noqa: E402,F401
+
+
+@pytest_asyncio.fixture
+async def db_session():
+    """
+    An async session on a fresh in-memory SQLite database with every table created.
+    """
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
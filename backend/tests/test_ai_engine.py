@@ -0,0 +1,33 @@
+from app.services import ai_engine
+from app.services.ai_engine import split_pages_into_chunks
+
+
+def _pages(count: int, words_per_page: int) -> tuple[str, list[int]]:
+    pages = [" ".join(f"w{page}x{word}" for word in range(words_per_page)) + "\n" for page in range(count)]
+    offsets, offset = [], 0
+    for page in pages:
+        offsets.append(offset)
+        offset += len(page)
+    return "".join(pages), offsets
+
+
+def test_chunks_fit_the_token_budget_of_the_tokenizer(monkeypatch):
+    # A tokenizer far denser than the character ratio: one token per word.
+    monkeypatch.setattr(ai_engine, "estimate_tokens", lambda text: len(text.split()))
+    text, offsets = _pages(count=12, words_per_page=40)
+    # One page well over the budget on its own.
+    oversized = " ".join(f"long{word}" for word in range(350)) + "\n"
+    text, offsets = text + oversized, offsets + [len(text)]
+
+    chunks = split_pages_into_chunks(text, offsets, max_tokens=100)
+
+    assert all(len(chunk.split()) <= 100 for chunk in chunks)
+    assert "".join(chunks) == text
+    # Whole pages are grouped while they fit: two 40-word pages per chunk.
+    assert chunks[0] == text[offsets[0]:offsets[2]]
+
+
+def test_small_document_is_one_chunk():
+    text, offsets = _pages(count=3, words_per_page=10)
+
+    assert split_pages_into_chunks(text, offsets, max_tokens=10000) == [text]
@@ -0,0 +1,25 @@
+import uuid
+
+import pytest
+
+from app.services import analysis_cache_service
+from app.services.analysis_cache_service import AnalysisCacheService
+
+_ANALYSIS = {"summary": "A services agreement.", "red_flags": [], "clauses": [{"id": 1, "title": "Term"}]}
+
+
+@pytest.mark.asyncio
+async def test_same_prompt_version_is_a_hit(db_session):
+    content_hash = uuid.uuid4().hex
+    await AnalysisCacheService(db_session).put(content_hash, _ANALYSIS)
+
+    assert await AnalysisCacheService(db_session).get(content_hash) == _ANALYSIS
+
+
+@pytest.mark.asyncio
+async def test_prompt_version_change_is_a_miss(db_session, monkeypatch):
+    content_hash = uuid.uuid4().hex
+    await AnalysisCacheService(db_session).put(content_hash, _ANALYSIS)
+
+    monkeypatch.setattr(analysis_cache_service, "ANALYSIS_PROMPT_VERSION", "next")
+    assert await AnalysisCacheService(db_session).get(content_hash) is None
@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.answer_cache import AnswerCacheEntry
+from app.services import answer_cache_service
+from app.services.answer_cache_service import AnswerCacheService
+
+
+@pytest.fixture
+def content_hash():
+    # The in-memory tier is process-wide, so every test uses content of its own.
+    return uuid.uuid4().hex
+
+
+@pytest.fixture
+def persistent(monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_PERSISTENT", True)
+
+
+@pytest.mark.asyncio
+async def test_repeated_question_is_a_hit(db_session, content_hash):
+    cache = AnswerCacheService(db_session)
+    await cache.put(content_hash, "Is liability capped?", "Yes, at one month of fees.")
+
+    assert await cache.get(content_hash, "is liability  capped") == "Yes, at one month of fees."
+
+
+@pytest.mark.asyncio
+async def test_prompt_version_change_is_a_miss(db_session, content_hash, persistent, monkeypatch):
+    await AnswerCacheService(db_session).put(content_hash, "Is liability capped?", "Yes.")
+
+    monkeypatch.setattr(answer_cache_service, "CHAT_PROMPT_VERSION", "next")
+    assert await AnswerCacheService(db_session).get(content_hash, "Is liability capped?") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_deletes_persistent_rows(db_session, content_hash, persistent):
+    cache = AnswerCacheService(db_session)
+    await cache.put(content_hash, "Who are the parties?", "Acme and Beta.")
+
+    await cache.invalidate(content_hash)
+
+    assert await cache.get(content_hash, "Who are the parties?") is None
+    assert (await db_session.scalars(select(AnswerCacheEntry))).all() == []
+
+
+@pytest.mark.asyncio
+async def test_store_purges_expired_rows_and_caps_the_table(db_session, content_hash, persistent, monkeypatch):
+    monkeypatch.setattr(settings, "ANSWER_CACHE_PERSISTENT_MAX_ENTRIES", 2)
+    db_session.add(AnswerCacheEntry(
+        cache_key="expired", content_hash=content_hash, answer="old",
+        expires_at=datetime.utcnow() - timedelta(seconds=1),
+    ))
+    await db_session.commit()
+    cache = AnswerCacheService(db_session)
+
+    for number in range(3):
+        await cache.put(content_hash, f"Question {number}?", f"Answer {number}")
+
+    rows = (await db_session.scalars(select(AnswerCacheEntry).order_by(AnswerCacheEntry.expires_at))).all()
+    assert [row.answer for row in rows] == ["Answer 1", "Answer 2"]
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.core.exceptions import RefreshTokenExpiredError
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.auth_service import AuthService
+
+
+@pytest_asyncio.fixture
+async def auth_service(db_session):
+    db_session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+    await db_session.commit()
+    return AuthService(db_session, MagicMock())
+
+
+@pytest.mark.asyncio
+async def test_rotated_refresh_token_is_rejected_on_reuse(auth_service):
+    first = await auth_service.create_and_store_refresh_token(1)
+
+    rotated = await auth_service.rotate_refresh_token(first)
+
+    with pytest.raises(RefreshTokenExpiredError):
+        await auth_service.rotate_refresh_token(first)
+    assert (await auth_service.rotate_refresh_token(rotated.refresh_token)).refresh_token
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_only_expired_tokens(auth_service, db_session):
+    now = datetime.utcnow()
+    db_session.add_all([
+        RefreshToken(token_hash=f"expired-{number}", user_id=1, expires_at=now - timedelta(minutes=1))
+        for number in range(3)
+    ] + [
+        RefreshToken(token_hash="live", user_id=1, expires_at=now + timedelta(days=1)),
+        RefreshToken(token_hash="revoked-live", user_id=1, expires_at=now + timedelta(days=1), revoked=True),
+    ])
+    await db_session.commit()
+
+    assert await auth_service.purge_expired_refresh_tokens(batch_size=2) == 3
+
+    remaining = (await db_session.scalars(select(RefreshToken.token_hash).order_by(RefreshToken.token_hash))).all()
+    assert remaining == ["live", "revoked-live"]
@@ -0,0 +1,31 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.document import Document
+from app.models.user import User  # noqa: F401  Registers the mapper Document's relationship refers to.
+from app.services.chat_service import ChatService
+
+
+@pytest.mark.asyncio
+async def test_context_lists_clauses_by_label_and_leaves_their_text_to_retrieval():
+    retrieval = MagicMock(get_relevant_chunks=AsyncMock(return_value=["6. Limitation of Liability. Liability is capped."]))
+    service = ChatService(MagicMock(), MagicMock(), MagicMock(), MagicMock(), retrieval)
+    document = Document(
+        title="msa.pdf",
+        summary="A services agreement.",
+        red_flags=["Liability is capped at one month of fees"],
+        clauses=[
+            {"id": "c1", "number": "1", "title": "Definitions", "content": "Terms used here " * 100},
+            {"id": "c6", "number": "6", "title": "Limitation of Liability", "content": "Liability is capped."},
+            {"title": "Governing Law", "content": "The laws of England apply."},
+        ],
+    )
+
+    context = await service._build_context(document, "Is liability capped?")
+
+    assert "- [c1] 1 Definitions\n- [c6] 6 Limitation of Liability\n- Governing Law\n" in context
+    assert "Terms used here" not in context
+    # Answers are shared between owners of the same content, so their file names stay out.
+    assert "msa.pdf" not in context
+    assert "[Excerpt 1]\n6. Limitation of Liability. Liability is capped." in context
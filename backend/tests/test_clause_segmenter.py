@@ -0,0 +1,143 @@
+from app.services.clause_segmenter import (
+    from_content_positions,
+    mark_clauses,
+    segment_clauses,
+    to_content_positions,
+)
+
+
+def _document(pages: list[list[str]], bold: set[str] = frozenset()) -> tuple[list[list[dict]], str, list[int]]:
+    """
+    Builds the PyMuPDF layout, plain text and page offsets of a document from its page lines.
+    """
+    layout, texts, offsets, offset = [], [], [], 0
+    for lines in pages:
+        layout.append([{"text": line, "size": 10.0, "bold": line in bold} for line in lines])
+        page_text = "\n".join(lines) + "\n"
+        offsets.append(offset)
+        texts.append(page_text)
+        offset += len(page_text)
+    return layout, "".join(texts), offsets
+
+
+_CONTRACT = [
+    [
+        "SERVICES AGREEMENT",
+        "1. Definitions",
+        "Capitalised terms have the meanings given in this clause.",
+        "2. Term",
+        "This Agreement starts on the Effective Date and lasts 12 months.",
+        "2.1 Renewal. It renews for successive terms unless either party gives",
+        "30 days notice before the end of the current term.",
+        "1",
+    ],
+    [
+        "3. Fees",
+        "The Customer pays 1.5% interest on late amounts.",
+        "Page 2 of 2",
+    ],
+]
+
+
+def test_numbered_contract_is_split_at_headings():
+    layout, text, offsets = _document(_CONTRACT)
+
+    clauses = segment_clauses(layout, text, offsets)
+
+    assert [(c["id"], c["number"], c["title"], c["page"]) for c in clauses] == [
+        ("c1", "1", "Definitions", 1),
+        ("c2", "2", "Term", 1),
+        ("c3", "2.1", "Renewal", 1),
+        ("c4", "3", "Fees", 2),
+    ]
+    assert text[clauses[1]["start"]:].startswith("2. Term\n")
+    assert clauses[1]["end"] == clauses[2]["start"]
+    assert clauses[-1]["end"] == len(text)
+    assert clauses[0]["content"] == "Capitalised terms have the meanings given in this clause."
+
+
+def test_page_number_footers_are_not_headings():
+    pages = [["1. Scope", "These terms apply to all orders.", str(page)] for page in range(1, 4)]
+    pages[1] = ["2. Orders", "Orders are binding once confirmed.", "- 2 -"]
+    pages[2] = ["3. Delivery", "Goods are delivered within 10 days.", "Page 3 / 3"]
+    layout, text, offsets = _document(pages)
+
+    clauses = segment_clauses(layout, text, offsets)
+
+    assert [c["number"] for c in clauses] == ["1", "2", "3"]
+
+
+def test_standalone_article_heading_takes_the_next_line_as_title():
+    layout, text, offsets = _document([
+        ["ARTICLE I", "Definitions", "Terms used here are defined below."],
+        ["ARTICLE II", "Payment", "Invoices are due within 30 days."],
+    ])
+
+    clauses = segment_clauses(layout, text, offsets)
+
+    assert [(c["number"], c["title"]) for c in clauses] == [("ARTICLE I", "Definitions"), ("ARTICLE II", "Payment")]
+
+
+def test_styled_headings_are_preferred_over_numbered_lines():
+    pages = [[
+        "1. Confidentiality",
+        "1 The Recipient keeps all information secret.",
+        "2. Term",
+        "2 This obligation survives termination.",
+    ]]
+    layout, text, offsets = _document(pages, bold={"1. Confidentiality", "2. Term"})
+
+    clauses = segment_clauses(layout, text, offsets)
+
+    assert [c["title"] for c in clauses] == ["Confidentiality", "Term"]
+
+
+def test_document_with_fewer_than_two_headings_has_no_clauses():
+    layout, text, offsets = _document([
+        ["NOTICE", "1. Termination", "The lease ends on 31 March 2025.", "2025"],
+        ["Signed by both parties.", "2"],
+    ])
+
+    assert segment_clauses(layout, text, offsets) == []
+
+
+def test_mark_clauses_prefixes_headings_and_shifts_page_offsets():
+    layout, text, offsets = _document(_CONTRACT)
+    clauses = segment_clauses(layout, text, offsets)
+
+    marked, marked_offsets = mark_clauses(text, offsets, clauses)
+
+    assert "[c1] 1. Definitions\n" in marked
+    assert "[c3] 2.1 Renewal." in marked
+    assert marked.replace("[c1] ", "").replace("[c2] ", "").replace("[c3] ", "").replace("[c4] ", "") == text
+    # Page 2 starts with clause c4, whose marker belongs to that page.
+    assert marked[marked_offsets[1]:].startswith("[c4] 3. Fees")
+    assert marked_offsets[0] == 0
+
+
+def test_mark_clauses_without_clauses_returns_the_text_unchanged():
+    layout, text, offsets = _document(_CONTRACT)
+
+    assert mark_clauses(text, offsets, []) == (text, offsets)
+
+
+def test_content_positions_survive_whitespace_differences():
+    layout, text, offsets = _document(_CONTRACT)
+    clauses = segment_clauses(layout, text, offsets)
+    cached = to_content_positions(text, clauses)
+    # The same document extracted with different spacing and line breaks.
+    other = "  " + text.replace("\n", " \n\n").replace(". ", ".  ")
+
+    restored = from_content_positions(other, cached)
+
+    for clause, original in zip(restored, clauses):
+        assert " ".join(other[clause["start"]:clause["end"]].split()) == " ".join(text[original["start"]:original["end"]].split())
+    assert restored[-1]["end"] == len(other)
+    assert from_content_positions(text, cached) == clauses
+
+
+def test_content_positions_leave_clauses_without_offsets_alone():
+    clauses = [{"title": "Term", "content": "One year."}, "Confidentiality"]
+
+    assert to_content_positions("text", clauses) == clauses
+    assert from_content_positions("text", clauses) == clauses
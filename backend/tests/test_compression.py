@@ -0,0 +1,27 @@
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+
+_PAYLOAD = {"clauses": ["The Supplier shall deliver the Services on each business day."] * 50}
+
+
+def _client() -> TestClient:
+    app = Starlette(routes=[Route("/", lambda request: JSONResponse(_PAYLOAD))])
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+    return TestClient(app)
+
+
+def test_brotli_is_preferred_over_gzip_when_accepted():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+    assert choose_encoding("identity") is None
+
+
+def test_json_responses_are_served_with_brotli():
+    response = _client().get("/", headers={"Accept-Encoding": "br"})
+
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == _PAYLOAD
@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+
+from app.api.deps import get_current_user_id, get_read_document_service
+from app.config import settings
+from app.models.user import User
+from app.services.jwt import jwt_service
+from app.services.user_service import UserService
+
+
+@pytest.mark.asyncio
+async def test_user_deleted_by_another_process_is_rejected_once_uncached(db_session, monkeypatch):
+    # Nothing is cached, as once USER_CACHE_TTL_SECONDS has passed since another process deleted the user.
+    monkeypatch.setattr(settings, "USER_CACHE_TTL_SECONDS", 0)
+    user = User(email="owner@example.com", hashed_password="x")
+    db_session.add(user)
+    await db_session.commit()
+    token = jwt_service.create_access_token({"sub": str(user.id)})
+    user_service = UserService(db_session)
+
+    assert await get_current_user_id(token, user_service) == user.id
+
+    await db_session.execute(delete(User).where(User.id == user.id))
+    await db_session.commit()
+    db_session.expunge_all()
+
+    with pytest.raises(HTTPException) as excinfo:
+        await get_current_user_id(token, user_service)
+    assert excinfo.value.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_read_document_service_uses_only_the_read_session(db_session):
+    service = await get_read_document_service(db_session, pdf_parser_service=None, ai_engine_service=None)
+
+    assert service.db is db_session
+    assert service.analysis_cache_service.db is db_session
+    assert service.answer_cache_service.db is db_session
@@ -0,0 +1,66 @@
+import tracemalloc
+from unittest.mock import AsyncMock, MagicMock
+
+import fitz
+import pytest
+
+from app.config import settings
+from app.models.user import User  # noqa: F401  Registers the mapper Document's relationship refers to.
+from app.services.document_service import DocumentService
+from app.services.pdf_parser import PDFParserService
+from app.services.prompt_budget import estimate_tokens
+
+_PAGES = 200
+_LINES_PER_PAGE = 45
+
+
+def _write_contract(path) -> int:
+    """
+    Writes a long text-only PDF to `path` and returns the number of characters laid out on it.
+    """
+    characters = 0
+    with fitz.open() as doc:
+        for page_number in range(_PAGES):
+            page = doc.new_page()
+            heading = f"{page_number + 1}. Services Schedule {page_number + 1}"
+            page.insert_text((50, 40), heading, fontsize=12)
+            characters += len(heading) + 1
+            for line in range(_LINES_PER_PAGE):
+                text = f"The Supplier shall deliver the Services described in Schedule {line} on each business day."
+                page.insert_text((50, 60 + line * 16), text, fontsize=9)
+                characters += len(text) + 1
+        doc.save(path)
+    return characters
+
+
+def _document_service() -> DocumentService:
+    db = MagicMock()
+    db.commit, db.flush, db.refresh, db.rollback = AsyncMock(), AsyncMock(), AsyncMock(), AsyncMock()
+    analysis_cache = MagicMock(get=AsyncMock(return_value=None), put=AsyncMock())
+    ai_engine = MagicMock(analyze_pages=AsyncMock(return_value={"summary": "s", "red_flags": [], "clauses": []}))
+    search = MagicMock(index_document=AsyncMock())
+    return DocumentService(db, PDFParserService(), ai_engine, analysis_cache, MagicMock(), search)
+
+
+@pytest.mark.asyncio
+async def test_spooled_pdf_upload_memory_is_bounded_by_text_size(tmp_path, monkeypatch):
+    # Extract in this process so the measurement sees every allocation.
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", _PAGES + 1)
+    path = tmp_path / "contract.pdf"
+    characters = _write_contract(str(path))
+    service = _document_service()
+    # Loads the tokenizer, if any, before measuring; that happens once per process, not per upload.
+    estimate_tokens("")
+
+    tracemalloc.start()
+    try:
+        document = await service.create_document_from_pdf(str(path), "contract.pdf", user_id=1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert document.content_hash
+    # The spooled PDF is read from disk, never copied into memory; what remains is the
+    # text, one transient copy at a time (marking, compaction) and the chunk index.
+    assert path.stat().st_size > characters
+    assert peak < 8 * characters, f"peak {peak} bytes for {characters} characters of text"
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.document import Document
+from app.models.user import User
+from app.services.document_service import DocumentService
+
+_PAGES = [
+    ["1. Definitions", "Terms used here have these meanings.", "2. Term", "This Agreement lasts one year."],
+    ["3. Fees", "Fees are due monthly in advance."],
+]
+
+
+class _FakeAnalysisCache:
+    """
+    Stores analyses as JSON, as the database does, so nothing is shared between uploads.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, content_hash):
+        entry = self.entries.get(content_hash)
+        return json.loads(entry) if entry else None
+
+    async def put(self, content_hash, analysis):
+        self.entries[content_hash] = json.dumps(analysis)
+
+
+def _parser(separator: str) -> MagicMock:
+    parser = MagicMock()
+    parser.extract_text.side_effect = lambda source: iter([separator.join(lines) + "\n" for lines in _PAGES])
+    parser.extract_layout.side_effect = lambda source: iter(
+        [[{"text": line, "size": 10.0, "bold": False} for line in lines] for lines in _PAGES]
+    )
+    return parser
+
+
+def _service(parser: MagicMock, cache: _FakeAnalysisCache, ai_engine: MagicMock) -> DocumentService:
+    db = MagicMock()
+    db.commit, db.flush, db.refresh, db.rollback = AsyncMock(), AsyncMock(), AsyncMock(), AsyncMock()
+    return DocumentService(db, parser, ai_engine, cache, MagicMock(), MagicMock(index_document=AsyncMock()))
+
+
+@pytest.mark.asyncio
+async def test_cached_clause_offsets_match_a_copy_with_different_whitespace():
+    cache = _FakeAnalysisCache()
+    ai_engine = MagicMock()
+    ai_engine.analyze_pages = AsyncMock(side_effect=lambda text, offsets, tokens, clauses: {
+        "summary": "A services agreement.", "red_flags": [], "clauses": clauses,
+    })
+
+    first = await _service(_parser("\n"), cache, ai_engine).create_document_from_pdf("a.pdf", "a.pdf", user_id=1)
+    second = await _service(_parser("\n\n   "), cache, ai_engine).create_document_from_pdf("b.pdf", "b.pdf", user_id=1)
+
+    assert ai_engine.analyze_pages.await_count == 1
+    second_text = "".join("\n\n   ".join(lines) + "\n" for lines in _PAGES)
+    assert [second_text[c["start"]:c["end"]].split("\n")[0] for c in second.clauses] == [
+        "1. Definitions", "2. Term", "3. Fees",
+    ]
+    assert [c["title"] for c in second.clauses] == [c["title"] for c in first.clauses]
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_split_documents_with_equal_created_at(db_session):
+    created_at = datetime(2024, 1, 1, 12, 0, 0)
+    db_session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+    db_session.add_all([
+        Document(title=f"Contract {number}", summary="", user_id=1, created_at=created_at) for number in range(5)
+    ])
+    await db_session.commit()
+    service = DocumentService(db_session, MagicMock(), MagicMock(), MagicMock(), MagicMock(), MagicMock())
+
+    for order, expected in (("desc", [5, 4, 3, 2, 1]), ("asc", [1, 2, 3, 4, 5])):
+        listed, cursor = [], None
+        while True:
+            rows, cursor = await service.list_documents_for_user(1, limit=2, cursor=cursor, order=order)
+            listed.append([row.id for row in rows])
+            if cursor is None:
+                break
+        assert listed == [expected[0:2], expected[2:4], expected[4:5]]
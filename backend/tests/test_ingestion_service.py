@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.models.ingestion_job import IngestionJob, IngestionJobStatus
+from app.models.user import User
+from app.services.ingestion_service import IngestionService
+
+
+async def _job(db, status: IngestionJobStatus, updated_seconds_ago: float = 0) -> IngestionJob:
+    user = User(email=f"{status.value}{updated_seconds_ago}@example.com", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    job = IngestionJob(
+        user_id=user.id, filename="a.pdf", file_path="a.pdf", status=status,
+        updated_at=datetime.utcnow() - timedelta(seconds=updated_seconds_ago),
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+
+@pytest.mark.asyncio
+async def test_a_queued_job_is_claimed_once(db_session):
+    job = await _job(db_session, IngestionJobStatus.QUEUED)
+    first, second = IngestionService(db_session), IngestionService(db_session)
+
+    assert await first.claim_job(job.id) is True
+    assert await second.claim_job(job.id) is False
+    await db_session.refresh(job)
+    assert job.status == IngestionJobStatus.RUNNING
+
+
+@pytest.mark.asyncio
+async def test_startup_requeues_only_running_jobs_with_an_expired_lease(db_session):
+    lease = settings.INGESTION_LEASE_SECONDS
+    queued = await _job(db_session, IngestionJobStatus.QUEUED)
+    abandoned = await _job(db_session, IngestionJobStatus.RUNNING, updated_seconds_ago=lease + 60)
+    live = await _job(db_session, IngestionJobStatus.RUNNING, updated_seconds_ago=5)
+
+    pending = await IngestionService(db_session).list_pending_jobs()
+
+    assert {job_id for job_id, _ in pending} == {queued.id, abandoned.id}
+    await db_session.refresh(live)
+    assert live.status == IngestionJobStatus.RUNNING
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_renews_the_lease_of_a_running_job(db_session):
+    job = await _job(db_session, IngestionJobStatus.RUNNING, updated_seconds_ago=settings.INGESTION_LEASE_SECONDS + 60)
+
+    await IngestionService(db_session).heartbeat_job(job.id)
+
+    assert await IngestionService(db_session).list_pending_jobs() == []
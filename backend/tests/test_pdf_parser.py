@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fitz
+import pytest
+
+from app.config import settings
+from app.services import pdf_parser
+from app.services.pdf_parser import PDFParserService, shutdown_extraction_pool
+
+_PAGES = 12
+
+
+@pytest.fixture
+def contract(tmp_path):
+    path = tmp_path / "contract.pdf"
+    with fitz.open() as doc:
+        for number in range(1, _PAGES + 1):
+            page = doc.new_page()
+            page.insert_text((50, 50), f"{number}. Clause {number}", fontsize=14)
+            page.insert_text((50, 80), f"Body of clause {number}.", fontsize=10)
+        doc.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def parallel_extraction(monkeypatch):
+    monkeypatch.setattr(settings, "PDF_EXTRACT_WORKERS", 2)
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", 4)
+    monkeypatch.setattr(settings, "PDF_PAGES_PER_TASK", 5)
+    yield
+    shutdown_extraction_pool()
+
+
+def test_layout_is_extracted_across_the_pool_in_page_order(contract, monkeypatch, parallel_extraction):
+    parser = PDFParserService()
+    parallel = list(parser.extract_layout(contract))
+    assert pdf_parser._extraction_pool is not None
+    monkeypatch.setattr(settings, "PDF_PARALLEL_MIN_PAGES", _PAGES + 1)
+    serial = list(parser.extract_layout(contract))
+
+    assert parallel == serial
+    assert [page[0]["text"] for page in parallel] == [f"{number}. Clause {number}" for number in range(1, _PAGES + 1)]
+    assert parallel[0][0]["size"] > parallel[0][1]["size"]
+
+
+def test_concurrent_first_callers_share_one_extraction_pool(parallel_extraction):
+    barrier = threading.Barrier(8)
+
+    def first_use():
+        barrier.wait()
+        return pdf_parser.get_extraction_pool()
+
+    with ThreadPoolExecutor(max_workers=8) as threads:
+        pools = list(threads.map(lambda _: first_use(), range(8)))
+
+    assert all(pool is pools[0] for pool in pools)
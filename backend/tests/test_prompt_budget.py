@@ -0,0 +1,35 @@
+from app.services.prompt_budget import compact_document
+
+
+def _pages(pages: list[list[str]]) -> tuple[str, list[int]]:
+    texts = ["\n".join(lines) + "\n" for lines in pages]
+    offsets, offset = [], 0
+    for page_text in texts:
+        offsets.append(offset)
+        offset += len(page_text)
+    return "".join(texts), offsets
+
+
+def test_compaction_drops_running_headers_and_page_numbers():
+    text, offsets = _pages([
+        ["ACME SERVICES AGREEMENT", f"Body text of page {page} goes here.", "More body text.", "Closing line.", str(page)]
+        for page in range(1, 5)
+    ])
+
+    compacted = compact_document(text, offsets)
+
+    assert "ACME" not in compacted["text"]
+    assert "Body text of page 3 goes here.\n" in compacted["text"]
+    assert compacted["tokens_after"] < compacted["tokens_before"]
+
+
+def test_compaction_keeps_marked_clause_headings_repeated_on_every_page():
+    text, offsets = _pages([
+        [f"[c{page}] {page}. Schedule {page}", f"Body text of page {page} goes here.", "More body text.", "Closing line."]
+        for page in range(1, 5)
+    ])
+
+    compacted = compact_document(text, offsets)
+
+    for page in range(1, 5):
+        assert f"[c{page}] {page}. Schedule {page}\n" in compacted["text"]
@@ -1,5 +1,5 @@
 import { useEffect, useState, useRef } from 'react';
-import { apiFetch } from '../lib/apiFetch';
+import { apiStream } from '../lib/apiFetch';
 import { HiX } from "react-icons/hi";
 import toast from 'react-hot-toast';
 
@@ -19,7 +19,7 @@ type Message = {
  * DocumentChatPanel component
  * Features:
  * - Chat interface that lets users ask questions about a specific document
- * - AI responses fetched via API using provided context
+ * - AI responses streamed token by token from the API using provided context
  * - Clean UI with loading state and message rendering
  */
 export default function DocumentChatPanel({ documentId, onClose }: Props) {
@@ -38,32 +38,49 @@ export default function DocumentChatPanel({ documentId, onClose }: Props) {
     ]);
   }, []);
 
-  // Send question to AI API and get a response
+  // Replaces the text of the AI reply at `index`, or appends to it
+  const updateReply = (index: number, text: string, append = false) => {
+    setMessages((prev) =>
+      prev.map((msg, i) => (i === index ? { ...msg, text: append ? msg.text + text : text } : msg))
+    );
+  };
+
+  // Send question to the AI and stream the answer into the chat as it is generated
   const askAI = async () => {
     if (!input.trim()) return;
 
     const question = input.trim();
-    setMessages((prev) => [...prev, { from: 'user', text: question }]);
+    const replyIndex = messages.length + 1;
+    setMessages((prev) => [...prev, { from: 'user', text: question }, { from: 'ai', text: '' }]);
     setInput('');
     setLoading(true);
 
+    const failed = (text: string) => {
+      updateReply(replyIndex, text);
+      toast.error('Failed to get a response from the AI.');
+    };
+
     try {
-      const res = await apiFetch({
-        method: 'post',
-        url: '/ai/chat/',
-        data: { 
-          document_id: documentId,
-          message: question
-        },
-      });
-      const reply = res.data.response;
-      setMessages((prev) => [...prev, { from: 'ai', text: reply }]);
+      let finished = false;
+      await apiStream(
+        '/ai/chat/stream',
+        { document_id: documentId, message: question },
+        ({ event, data }) => {
+          if (event === 'error') {
+            finished = true;
+            failed(JSON.parse(data).detail || "Sorry, I couldn't process your question at this time. Please try again later.");
+          } else if (event === 'done') {
+            finished = true;
+          } else {
+            updateReply(replyIndex, JSON.parse(data).token, true);
+          }
+        }
+      );
+      if (!finished) {
+        failed("The answer was interrupted. Please try again.");
+      }
     } catch (err) {
-      setMessages((prev) => [
-        ...prev,
-        { from: 'ai', text: "Sorry, I couldn't process your question at this time. Please try again later." }
-      ]);
-      toast.error('Failed to get a response from the AI.');
+      failed("Sorry, I couldn't process your question at this time. Please try again later.");
     } finally {
       setLoading(false);
     }
@@ -89,7 +106,7 @@ export default function DocumentChatPanel({ documentId, onClose }: Props) {
 
       {/* Chat message history */}
       <div className="flex-1 overflow-y-auto p-4 space-y-4 text-sm bg-transparent custom-scrollbar">
-        {messages.map((msg, idx) => (
+        {messages.map((msg, idx) => msg.text && (
           <div
             key={idx}
             className={`flex ${msg.from === 'user' ? 'justify-end' : 'justify-start'}`}
@@ -111,7 +128,7 @@ export default function DocumentChatPanel({ documentId, onClose }: Props) {
             </div>
           </div>
         ))}
-        {loading && (
+        {loading && !messages[messages.length - 1]?.text && (
           <div className="flex justify-start">
             <div className="bg-white border border-blue-100 text-blue-400 px-4 py-2 rounded-2xl shadow animate-pulse">
               Thinking…
@@ -16,6 +16,26 @@ type Props = {
   onComplete: (docId: string) => void;
 };
 
+type IngestionJob = {
+  id: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  document_id: number | null;
+  error: string | null;
+};
+
+const JOB_POLL_INTERVAL_MS = 1500;
+
+// Poll the ingestion job until the backend finishes parsing and analyzing the upload
+const waitForJob = async (jobId: string): Promise<IngestionJob> => {
+  for (;;) {
+    const { data } = await apiFetch.get<IngestionJob>(`/documents/jobs/${jobId}`);
+    if (data.status === 'done' || data.status === 'failed') {
+      return data;
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
+
 /**
  * UploadModal component for uploading PDF documents.
  * Features:
@@ -75,15 +95,25 @@ export default function UploadModal({ onClose, onComplete }: Props) {
         headers: { 'Content-Type': 'multipart/form-data' },
       });
       
-      const docId = res.data?.id;
+      const jobId = res.data?.id;
+      if (!jobId) {
+        throw new Error('Could not retrieve upload job ID from response.');
+      }
+
+      const job = await waitForJob(jobId);
+      if (job.status === 'failed') {
+        throw new Error(job.error || 'Error analyzing document.');
+      }
+
+      const docId = job.document_id;
       if (docId) {
         toast.success('Document uploaded successfully!');
-        onComplete(docId); // Trigger parent callback
+        onComplete(String(docId)); // Trigger parent callback
       } else {
         throw new Error('Could not retrieve document ID from response.');
       }
     } catch (err: any) {
-      const errorMessage = err.response?.data?.detail || 'Error uploading document. Please try again.';
+      const errorMessage = err.response?.data?.detail || err.message || 'Error uploading document. Please try again.';
       toast.error(errorMessage);
     } finally {
       setLoading(false);
@@ -34,8 +34,11 @@ export default function DocumentDetail() {
   const { data: doc, isLoading, error } = useQuery<Document>({
     queryKey: ['document', docId],
     queryFn: async () => {
-      // Use the centralized apiFetch to make the authenticated request
-      const response = await apiFetch.get(`/documents/${docId}`);
+      // Use the centralized apiFetch to make the authenticated request.
+      // The full text is only returned when asked for explicitly.
+      const response = await apiFetch.get(`/documents/${docId}`, {
+        params: { include: "content" },
+      });
       return response.data; // Axios returns the data in the .data property
     },
     enabled: !!docId,
@@ -1,6 +1,6 @@
 import { useState, useMemo } from "react";
 import { useNavigate, Link } from "react-router-dom";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery } from "@tanstack/react-query";
 import {
   HiDocumentText,
   HiOutlineTrash
@@ -11,6 +11,13 @@ import { useDeleteDocument } from "../../hooks/useDeleteDocument";
 import { apiFetch } from "../../lib/apiFetch";
 import UploadDocumentModal from "../../components/UploadDocumentModal";
 
+const PAGE_SIZE = 50;
+
+type DocumentPage = {
+  items: Document[];
+  nextCursor: string | null;
+};
+
 /**
  * DocumentList component
  * Displays a searchable list of uploaded documents with delete and upload functionality.
@@ -23,22 +30,36 @@ export default function DocumentList() {
   // Re-use the custom hook for document deletion
   const { deleteDocument, isDeleting } = useDeleteDocument();
 
-  // Fetch documents using TanStack Query for caching and state management
+  // Fetch documents page by page using TanStack Query for caching and state management
   const {
-    data: documents,
+    data,
     isLoading,
     isError,
-  } = useQuery<Document[]>({
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["documents"],
-    queryFn: async () => {
+    initialPageParam: null as string | null,
+    queryFn: async ({ pageParam }): Promise<DocumentPage> => {
       // Use the streamlined apiFetch.get() to leverage the centralized configuration
-      const { data } = await apiFetch.get("/documents");
-      return data;
+      const response = await apiFetch.get<Document[]>("/documents", {
+        params: { limit: PAGE_SIZE, ...(pageParam ? { cursor: pageParam } : {}) },
+      });
+      return {
+        items: response.data,
+        nextCursor: (response.headers["x-next-cursor"] as string | undefined) ?? null,
+      };
     },
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
   });
 
+  const documents = useMemo(
+    () => data?.pages.flatMap((page) => page.items) ?? [],
+    [data]
+  );
+
   const filteredDocuments = useMemo(() => {
-    if (!documents) return [];
     const term = search.toLowerCase();
     return documents.filter(
       (doc) =>
@@ -127,6 +148,19 @@ export default function DocumentList() {
         </ul>
       )}
 
+      {/* Load the next page of documents */}
+      {hasNextPage && (
+        <div className="flex justify-center">
+          <button
+            onClick={() => fetchNextPage()}
+            disabled={isFetchingNextPage}
+            className="px-5 py-2 rounded-full border border-blue-200 bg-white text-blue-700 shadow hover:bg-blue-50 transition font-semibold text-base disabled:opacity-50"
+          >
+            {isFetchingNextPage ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
+
       {/* Upload modal */}
       {showModal && (
         <UploadDocumentModal
@@ -22,6 +22,36 @@ api.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// Refresh tokens are single-use, so concurrent 401s must share one refresh call.
+let refreshInFlight: Promise<string> | null = null;
+
+const refreshAccessToken = (): Promise<string> => {
+  if (!refreshInFlight) {
+    refreshInFlight = (async () => {
+      const refreshToken = localStorage.getItem('refresh_token');
+      if (!refreshToken) {
+        throw new Error('Refresh token not found');
+      }
+
+      const response = await axios.post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken });
+      const { access_token, refresh_token } = response.data;
+
+      localStorage.setItem('access_token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
+      return access_token as string;
+    })().finally(() => {
+      refreshInFlight = null;
+    });
+  }
+  return refreshInFlight;
+};
+
+const endSession = () => {
+  toast.error('You session has expired. Please log in again.');
+  localStorage.clear();
+  window.location.href = '/login';
+};
+
 api.interceptors.response.use(
   (response) => response,
   async (error) => {
@@ -31,22 +61,12 @@ api.interceptors.response.use(
       originalRequest._retry = true;
       
       try {
-        const refreshToken = localStorage.getItem('refresh_token');
-        if (!refreshToken) {
-          throw new Error('Refresh token not found');
-        }
-
-        const response = await axios.post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken });
-        const { access_token } = response.data;
-
-        localStorage.setItem('access_token', access_token);
+        const access_token = await refreshAccessToken();
         originalRequest.headers.Authorization = `Bearer ${access_token}`;
         
         return api(originalRequest);
       } catch (refreshError) {
-        toast.error('You session has expired. Please log in again.');
-        localStorage.clear();
-        window.location.href = '/login';
+        endSession();
         return Promise.reject(refreshError);
       }
     }
@@ -55,4 +75,68 @@ api.interceptors.response.use(
   }
 );
 
-export const apiFetch = api;
\ No newline at end of file
+export const apiFetch = api;
+
+export type StreamEvent = { event: string; data: string };
+
+/**
+ * POSTs JSON and calls onEvent for every server-sent event in the response as it arrives.
+ * axios cannot read a response body incrementally in the browser, so this uses fetch
+ * and shares the token refresh with the axios client.
+ */
+export async function apiStream(
+  url: string,
+  body: unknown,
+  onEvent: (event: StreamEvent) => void,
+  signal?: AbortSignal,
+): Promise<void> {
+  const send = (token: string | null) =>
+    fetch(`${API_URL}${url}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: 'text/event-stream',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      body: JSON.stringify(body),
+      signal,
+    });
+
+  let response = await send(localStorage.getItem('access_token'));
+  if (response.status === 401) {
+    let accessToken: string;
+    try {
+      accessToken = await refreshAccessToken();
+    } catch (refreshError) {
+      endSession();
+      throw refreshError;
+    }
+    response = await send(accessToken);
+  }
+  if (!response.ok || !response.body) {
+    throw new Error(`Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value.replace(/\r\n/g, '\n');
+
+    // Events are separated by a blank line; an incomplete one stays in the buffer.
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      const data: string[] = [];
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trimStart());
+      }
+      if (data.length) onEvent({ event, data: data.join('\n') });
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+}
\ No newline at end of file
@@ -2,7 +2,7 @@ export interface Document {
   id: number;
   title: string;
   summary: string;
-  content: string;
+  content?: string | null;
   clauses: { title: string; content: string }[];
   red_flags: string[];
 }
\ No newline at end of file